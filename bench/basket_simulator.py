@@ -0,0 +1,66 @@
+"""Throughput benchmark for the model portfolio basket simulator.
+
+Run from the repo root:
+
+    python -m bench.basket_simulator [--holdings 1000] [--years 20] [--repeats 5]
+
+Builds a synthetic basket and times `_build_buy_and_hold_basket` for each
+rebalance period.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.reports import model_portfolio
+
+
+REBALANCE_PERIODS = ("none", "quarterly", "monthly", "weekly", "daily")
+
+
+def _synthetic_basket(holdings: int, years: int):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2000-01-03", periods=years * 252)
+    symbols = [f"T{number:04d}" for number in range(holdings)]
+    asset_returns = pd.DataFrame(
+        rng.normal(0.0003, 0.02, (len(index), holdings)),
+        index=index,
+        columns=symbols,
+    )
+    prices = (1.0 + asset_returns).cumprod() * 100.0
+    weights = rng.uniform(0.5, 1.5, holdings)
+    basket_holdings = [
+        {"ticker": ticker, "weight": weight}
+        for ticker, weight in zip(symbols, weights / weights.sum())
+    ]
+    return prices, asset_returns, basket_holdings, index[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdings", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    prices, asset_returns, holdings, start_date = _synthetic_basket(args.holdings, args.years)
+    print(f"{args.holdings} holdings x {len(prices)} trading days")
+    for period in REBALANCE_PERIODS:
+        timings = []
+        for _ in range(args.repeats):
+            started_at = time.perf_counter()
+            model_portfolio._build_buy_and_hold_basket(
+                prices,
+                holdings,
+                asset_returns,
+                start_date,
+                rebalance_period=period,
+            )
+            timings.append((time.perf_counter() - started_at) * 1000)
+        print(f"  {period:<10} median {statistics.median(timings):8.1f} ms   best {min(timings):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency benchmark for the embedded QuantStats report route.
+
+Run from the repo root:
+
+    python -m bench.embedded_report [--size-mb 5] [--requests 50]
+
+Times a cold rewrite (cache cleared before every request), a warm cache hit,
+and a conditional revalidation that ends in a 304.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src import server
+
+
+def _synthetic_report_html(size_mb: float) -> str:
+    path = " ".join(f"L{i % 997}.5,{(i * 7) % 613}.25" for i in range(400))
+    figure = f'<svg viewBox="0 0 800 400"><path d="M0,0 {path}"/></svg>\n'
+    figure_count = max(1, int(size_mb * 1024 * 1024 / len(figure)))
+    return (
+        "<!doctype html>\n<html>\n<head><title>Portfolio Analysis</title></head>\n"
+        '<body onload="save()"><div class="container"><div id="left">\n'
+        + figure * figure_count
+        + "</div></div></body>\n</html>\n"
+    )
+
+
+def _time_requests(client, url: str, count: int, headers: dict | None = None, before=None) -> list[float]:
+    timings = []
+    for _ in range(count):
+        if before is not None:
+            before()
+        started_at = time.perf_counter()
+        response = client.get(url, headers=headers or {})
+        response.get_data()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def _summary(label: str, timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{label:<14} median {statistics.median(ordered):8.2f} ms   p95 {p95:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        (out_dir / "report_0.html").write_text(_synthetic_report_html(args.size_mb), encoding="utf-8")
+        server.OUT_DIR = out_dir
+        client = server.app.test_client()
+        url = "/reports/report_0.html?embed=1&mode=dark"
+
+        cold = _time_requests(client, url, args.requests, before=server._cached_embedded_report.cache_clear)
+        client.get(url)
+        warm = _time_requests(client, url, args.requests)
+        etag = client.get(url).headers["ETag"]
+        not_modified = _time_requests(client, url, args.requests, headers={"If-None-Match": etag})
+
+    print(f"Embedded report: {args.size_mb:.1f} MB, {args.requests} requests each")
+    print(_summary("cold rewrite", cold))
+    print(_summary("warm cache", warm))
+    print(_summary("304 revalidate", not_modified))
+
+
+if __name__ == "__main__":
+    main()
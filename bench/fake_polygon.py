@@ -0,0 +1,575 @@
+"""Local stand-in for the Polygon REST and WebSocket APIs.
+
+Run from the repo root:
+
+    python -m bench.fake_polygon [--port 8765] [--ws-port 8766] [--fixture market.json]
+        [--latency-ms 0] [--jitter-ms 0] [--rate-limit 0] [--error-rate 0]
+
+then point the app at it with the environment variables it prints
+(`POLYGON_BASE_URL`, `POLYGON_REALTIME_STOCKS_WS_URL`, ...).
+
+Serves daily and minute aggregates, grouped daily bars, ticker snapshots,
+reference splits, dividends and tickers (paginated through `next_url` like the
+real API), and a `T.*` trade stream. Prices come from a `market.json` fixture
+written by `bench.synthetic_statements` when one is given; any other ticker gets
+a deterministic synthetic history seeded from its symbol, so screens over
+arbitrary tickers work too.
+
+Knobs (all also settable at runtime with `POST /_fake/config`):
+
+    latency_ms, jitter_ms       delay added to every REST response
+    rate_limit, burst           token bucket in requests/second; 0 disables it, and
+                                requests over the limit get Polygon's 429 body
+    error_rate, error_status    fraction of REST requests failed with `error_status`
+    trade_interval_ms           gap between trade batches on the stream
+    ws_drop_after_seconds       close each stream connection after this long; 0 never
+    ws_error_rate               fraction of trade batches replaced by an error status
+    ws_auth_fail                reject every stream `auth` message
+
+`GET /_fake/stats` returns request counts per route and the number of 429s,
+injected errors, and stream connections.
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve as serve_websocket
+from werkzeug.serving import make_server
+
+from bench.synthetic_statements import synthetic_market
+from src.reports.polygon import future_split_factors
+
+
+ET = "America/New_York"
+SYNTHETIC_HISTORY_YEARS = 10
+MAX_PAGE_LIMIT = 1000
+MAX_STREAM_TICKERS = 50
+RATE_LIMIT_MESSAGE = (
+    "You've exceeded the maximum requests per minute, please wait or upgrade your "
+    "subscription to continue. https://polygon.io/pricing"
+)
+DEFAULT_KNOBS = {
+    "latency_ms": 0.0,
+    "jitter_ms": 0.0,
+    "rate_limit": 0.0,
+    "burst": 0.0,
+    "error_rate": 0.0,
+    "error_status": 500,
+    "trade_interval_ms": 250.0,
+    "ws_drop_after_seconds": 0.0,
+    "ws_error_rate": 0.0,
+    "ws_auth_fail": False,
+    "seed": 0,
+}
+
+
+class FakeMarket:
+    """Daily bars, splits, and dividends per ticker, plus a drifting live price."""
+
+    def __init__(self, market: dict | None = None, end=None, years: int = SYNTHETIC_HISTORY_YEARS):
+        self.end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end).normalize()
+        self.start = (self.end - pd.DateOffset(years=years)).normalize()
+        self._lock = threading.Lock()
+        self._bars: dict[str, pd.DataFrame] = {}
+        self._splits: dict[str, list[dict]] = {}
+        self._dividends: dict[str, list[dict]] = {}
+        self._live: dict[str, float] = {}
+        if market is not None:
+            self._add_market(market)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "FakeMarket":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")), **kwargs)
+
+    def _add_market(self, market: dict, only: set[str] | None = None):
+        dates = pd.DatetimeIndex(market["dates"])
+        timestamps = dates.tz_localize(ET).asi8 // 1_000_000
+        for symbol, raw_close in market["raw_close"].items():
+            if only is not None and symbol not in only:
+                continue
+            close = np.asarray(raw_close, dtype=float)
+            previous = np.concatenate(([close[0]] if len(close) else [], close[:-1]))
+            rng = np.random.default_rng(zlib.crc32(symbol.encode("utf-8")))
+            self._bars[symbol] = pd.DataFrame(
+                {
+                    "t": timestamps,
+                    "o": np.round(previous, 4),
+                    "h": np.round(np.maximum(previous, close) * 1.004, 4),
+                    "l": np.round(np.minimum(previous, close) * 0.996, 4),
+                    "c": close,
+                    "v": rng.integers(100_000, 5_000_000, len(close)),
+                },
+                index=dates,
+            )
+            self._splits[symbol] = list(market["splits"].get(symbol, []))
+            self._dividends[symbol] = list(market["dividends"].get(symbol, []))
+
+    def _ensure(self, symbol: str):
+        if symbol in self._bars:
+            return
+        with self._lock:
+            if symbol in self._bars:
+                return
+            market = synthetic_market(
+                [symbol],
+                self.start,
+                self.end,
+                seed=zlib.crc32(symbol.encode("utf-8")),
+                splits_per_year=0.05,
+            )
+            self._add_market(market, only={symbol})
+
+    def symbols(self) -> list[str]:
+        return sorted(self._bars)
+
+    def bars(self, symbol: str, adjusted: bool = True) -> pd.DataFrame:
+        self._ensure(symbol)
+        bars = self._bars[symbol]
+        if not adjusted or not self._splits[symbol]:
+            return bars
+        factors = future_split_factors(self._splits[symbol], bars.index)
+        adjusted_bars = bars.copy()
+        for column in ("o", "h", "l", "c"):
+            adjusted_bars[column] = np.round(bars[column].to_numpy() / factors, 4)
+        adjusted_bars["v"] = np.round(bars["v"].to_numpy() * factors).astype(np.int64)
+        return adjusted_bars
+
+    def splits(self, symbol: str) -> list[dict]:
+        self._ensure(symbol)
+        return self._splits[symbol]
+
+    def dividends(self, symbol: str) -> list[dict]:
+        self._ensure(symbol)
+        return self._dividends[symbol]
+
+    def minute_bars(self, symbol: str, day: pd.Timestamp) -> list[dict]:
+        bars = self.bars(symbol)
+        if day not in bars.index:
+            return []
+        daily = bars.loc[day]
+        rng = np.random.default_rng(zlib.crc32(f"{symbol}:{day.date()}".encode("utf-8")))
+        path = np.linspace(daily["o"], daily["c"], 390) * (1.0 + rng.normal(0.0, 0.0005, 390))
+        path[-1] = daily["c"]
+        opened_at = (day + pd.Timedelta(hours=9, minutes=30)).tz_localize(ET).value // 1_000_000
+        return [
+            {
+                "t": int(opened_at + minute * 60_000),
+                "o": round(float(path[max(minute - 1, 0)]), 4),
+                "h": round(float(max(path[max(minute - 1, 0)], price)), 4),
+                "l": round(float(min(path[max(minute - 1, 0)], price)), 4),
+                "c": round(float(price), 4),
+                "v": int(rng.integers(100, 20_000)),
+            }
+            for minute, price in enumerate(path)
+        ]
+
+    def live_price(self, symbol: str, rng: random.Random | None = None) -> float:
+        """Last trade price; each call with `rng` takes one random-walk step."""
+        bars = self.bars(symbol)
+        with self._lock:
+            price = self._live.get(symbol, float(bars["c"].iloc[-1]))
+            if rng is not None:
+                price = round(price * (1.0 + rng.gauss(0.0, 0.0005)), 4)
+                self._live[symbol] = price
+        return price
+
+
+class _TokenBucket:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+
+    def take(self, rate: float, burst: float) -> bool:
+        capacity = max(burst, rate, 1.0)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(capacity, self._tokens + (now - self._updated_at) * rate)
+            self._updated_at = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def reset(self, rate: float, burst: float):
+        with self._lock:
+            self._tokens = max(burst, rate, 1.0)
+            self._updated_at = time.monotonic()
+
+
+def _encode_cursor(values: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+
+
+def _day_range(start: str, end: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    def parse(value: str) -> pd.Timestamp:
+        # Aggregates accept either dates or millisecond timestamps.
+        if value.isdigit():
+            return pd.Timestamp(int(value), unit="ms", tz="UTC").tz_convert(ET).tz_localize(None).normalize()
+        return pd.Timestamp(value).normalize()
+
+    return parse(start), parse(end)
+
+
+class FakePolygon:
+    """The Flask app and stream handler behind `FakePolygonServer`."""
+
+    def __init__(self, market: FakeMarket | None = None, **knobs):
+        self.market = market or FakeMarket()
+        self.knobs = dict(DEFAULT_KNOBS)
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._bucket = _TokenBucket()
+        self.configure(**knobs)
+        self.app = self._create_app()
+
+    def configure(self, **knobs):
+        unknown = set(knobs) - set(DEFAULT_KNOBS)
+        if unknown:
+            raise ValueError(f"Unknown fake Polygon knobs: {', '.join(sorted(unknown))}")
+        self.knobs.update(knobs)
+        self._rng = random.Random(self.knobs["seed"])
+        self._bucket.reset(float(self.knobs["rate_limit"]), float(self.knobs["burst"]))
+
+    def _count(self, key: str) -> int:
+        with self._stats_lock:
+            self.stats[key] += 1
+            return self.stats[key]
+
+    def _random(self) -> float:
+        with self._stats_lock:
+            return self._rng.random()
+
+    def _page(self, route: str, results: list, limit: int, offset: int, cursor_values: dict):
+        page = results[offset:offset + limit]
+        payload = {"status": "OK", "request_id": f"fake-{offset}", "results": page}
+        if offset + limit < len(results):
+            cursor = _encode_cursor({**cursor_values, "offset": offset + limit, "limit": limit})
+            payload["next_url"] = f"{request.host_url.rstrip('/')}{route}?cursor={cursor}"
+        return jsonify(payload)
+
+    def _reference_events(self, route: str, events_for, date_field: str):
+        args = _decode_cursor(request.args["cursor"]) if "cursor" in request.args else dict(request.args)
+        ticker = str(args.get("ticker") or "").upper()
+        if not ticker:
+            return jsonify({"status": "ERROR", "error": "ticker is required by the fake server"}), 400
+        events = [
+            event
+            for event in events_for(ticker)
+            if str(args.get(f"{date_field}.gte") or "") <= event[date_field] <= str(args.get(f"{date_field}.lte") or "9999")
+        ]
+        events.sort(key=lambda event: event[date_field], reverse=args.get("order") == "desc")
+        limit = min(int(args.get("limit") or 10), MAX_PAGE_LIMIT)
+        cursor_values = {key: value for key, value in args.items() if key not in {"apiKey", "offset", "limit"}}
+        return self._page(route, events, limit, int(args.get("offset") or 0), cursor_values)
+
+    def _ticker_overview(self, ticker: str) -> dict:
+        seed = zlib.crc32(ticker.encode("utf-8"))
+        is_etf = ticker == "VT" or seed % 5 == 0
+        close = float(self.market.bars(ticker)["c"].iloc[-1])
+        shares = 50_000_000 + seed % 2_000_000_000
+        return {
+            "ticker": ticker,
+            "name": f"Synthetic {ticker} {'ETF' if is_etf else 'Inc'}",
+            "market": "stocks",
+            "locale": "us",
+            "primary_exchange": "ARCX" if is_etf else ("XNAS" if seed % 2 else "XNYS"),
+            "type": "ETF" if is_etf else "CS",
+            "active": True,
+            "currency_name": "usd",
+            "share_class_shares_outstanding": shares,
+            "market_cap": None if is_etf else round(close * shares, 2),
+        }
+
+    def _snapshot_item(self, ticker: str) -> dict | None:
+        bars = self.market.bars(ticker)
+        if bars.empty:
+            return None
+        day = bars.iloc[-1]
+        previous = bars.iloc[-2] if len(bars) > 1 else day
+        now_ns = time.time_ns()
+        price = self.market.live_price(ticker)
+        return {
+            "ticker": ticker,
+            "day": {key: float(day[key]) for key in ("o", "h", "l", "c", "v")},
+            "prevDay": {key: float(previous[key]) for key in ("o", "h", "l", "c", "v")},
+            "min": {"c": price, "t": now_ns // 1_000_000},
+            "lastTrade": {"p": price, "s": 100, "t": now_ns},
+            "todaysChange": round(price - float(previous["c"]), 4),
+            "todaysChangePerc": round((price / float(previous["c"]) - 1.0) * 100, 4),
+            "updated": now_ns,
+        }
+
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+        market = self.market
+
+        @app.before_request
+        def apply_knobs():
+            if request.path.startswith("/_fake/"):
+                return None
+            self._count(f"route:{request.url_rule.rule if request.url_rule else request.path}")
+            delay_ms = float(self.knobs["latency_ms"]) + float(self.knobs["jitter_ms"]) * self._random()
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000)
+            if not request.args.get("apiKey"):
+                return jsonify({"status": "ERROR", "error": "API Key was not provided"}), 401
+            rate = float(self.knobs["rate_limit"])
+            if rate > 0 and not self._bucket.take(rate, float(self.knobs["burst"])):
+                self._count("rate_limited")
+                return jsonify({"status": "ERROR", "request_id": "fake-429", "error": RATE_LIMIT_MESSAGE}), 429
+            if float(self.knobs["error_rate"]) > 0 and self._random() < float(self.knobs["error_rate"]):
+                self._count("injected_errors")
+                return jsonify({"status": "ERROR", "error": "Injected failure"}), int(self.knobs["error_status"])
+            return None
+
+        @app.get("/v2/aggs/ticker/<ticker>/range/<int:multiplier>/<timespan>/<start>/<end>")
+        def aggs(ticker, multiplier, timespan, start, end):
+            ticker = ticker.upper()
+            start_day, end_day = _day_range(start, end)
+            if timespan == "minute":
+                results = [
+                    bar
+                    for day in pd.bdate_range(start_day, end_day)
+                    for bar in market.minute_bars(ticker, day)
+                ][::multiplier]
+            elif timespan == "day":
+                bars = market.bars(ticker, adjusted=request.args.get("adjusted", "true") != "false")
+                window = bars.loc[start_day:end_day].iloc[::multiplier]
+                results = window.to_dict("records")
+            else:
+                return jsonify({"status": "ERROR", "error": f"Unsupported timespan {timespan}"}), 400
+            if request.args.get("sort") == "desc":
+                results = results[::-1]
+            results = results[: int(request.args.get("limit") or 5000)]
+            return jsonify({
+                "ticker": ticker,
+                "status": "OK",
+                "adjusted": request.args.get("adjusted", "true") != "false",
+                "queryCount": len(results),
+                "resultsCount": len(results),
+                "results": [{key: (int(value) if key in {"t", "v"} else float(value)) for key, value in bar.items()} for bar in results],
+            })
+
+        @app.get("/v2/aggs/grouped/locale/us/market/stocks/<day>")
+        def grouped_daily(day):
+            day = pd.Timestamp(day).normalize()
+            adjusted = request.args.get("adjusted", "true") != "false"
+            results = []
+            for ticker in market.symbols():
+                bars = market.bars(ticker, adjusted=adjusted)
+                if day in bars.index:
+                    bar = bars.loc[day]
+                    results.append({"T": ticker, **{key: float(bar[key]) for key in ("o", "h", "l", "c")}, "v": int(bar["v"]), "t": int(bar["t"])})
+            return jsonify({"status": "OK", "adjusted": adjusted, "queryCount": len(results), "resultsCount": len(results), "results": results})
+
+        @app.get("/v2/snapshot/locale/us/markets/stocks/tickers")
+        def snapshot():
+            tickers = [ticker.strip().upper() for ticker in request.args.get("tickers", "").split(",") if ticker.strip()]
+            items = [self._snapshot_item(ticker) for ticker in (tickers or market.symbols())]
+            items = [item for item in items if item is not None]
+            return jsonify({"status": "OK", "count": len(items), "tickers": items})
+
+        @app.get("/v3/reference/splits")
+        def reference_splits():
+            return self._reference_events("/v3/reference/splits", market.splits, "execution_date")
+
+        @app.get("/v3/reference/dividends")
+        def reference_dividends():
+            return self._reference_events("/v3/reference/dividends", market.dividends, "ex_dividend_date")
+
+        @app.get("/v3/reference/tickers")
+        def reference_tickers():
+            args = _decode_cursor(request.args["cursor"]) if "cursor" in request.args else dict(request.args)
+            search = str(args.get("search") or "").upper()
+            ticker = str(args.get("ticker") or "").upper()
+            tickers = [ticker] if ticker else [symbol for symbol in market.symbols() if search in symbol]
+            overviews = [self._ticker_overview(symbol) for symbol in tickers]
+            limit = min(int(args.get("limit") or 100), MAX_PAGE_LIMIT)
+            cursor_values = {key: value for key, value in args.items() if key not in {"apiKey", "offset", "limit"}}
+            return self._page("/v3/reference/tickers", overviews, limit, int(args.get("offset") or 0), cursor_values)
+
+        @app.get("/v3/reference/tickers/<ticker>")
+        def reference_ticker(ticker):
+            return jsonify({"status": "OK", "request_id": "fake", "results": self._ticker_overview(ticker.upper())})
+
+        @app.get("/_fake/stats")
+        def fake_stats():
+            with self._stats_lock:
+                return jsonify(dict(self.stats))
+
+        @app.post("/_fake/config")
+        def fake_config():
+            try:
+                self.configure(**(request.get_json(silent=True) or {}))
+            except (TypeError, ValueError) as exc:
+                return jsonify({"error": str(exc)}), 400
+            return jsonify(self.knobs)
+
+        return app
+
+    def handle_stream(self, websocket):
+        """Speak enough of Polygon's stocks cluster protocol for `T.*` subscriptions."""
+        connection_number = self._count("ws_connections")
+        rng = random.Random(f"{self.knobs['seed']}:{connection_number}")
+        websocket.send(json.dumps([{"ev": "status", "status": "connected", "message": "Connected Successfully"}]))
+        authenticated = False
+        subscribed: set[str] = set()
+        drop_after = float(self.knobs["ws_drop_after_seconds"])
+        opened_at = time.monotonic()
+
+        try:
+            while True:
+                if drop_after > 0 and time.monotonic() - opened_at >= drop_after:
+                    self._count("ws_dropped")
+                    websocket.close(1011, "fake server drop")
+                    return
+                try:
+                    raw = websocket.recv(timeout=float(self.knobs["trade_interval_ms"]) / 1000)
+                except TimeoutError:
+                    raw = None
+
+                if raw is not None:
+                    message = json.loads(raw)
+                    action = message.get("action")
+                    params = [item.strip() for item in str(message.get("params") or "").split(",") if item.strip()]
+                    if action == "auth":
+                        if self.knobs["ws_auth_fail"] or not message.get("params"):
+                            websocket.send(json.dumps([{"ev": "status", "status": "auth_failed", "message": "authentication failed"}]))
+                            websocket.close()
+                            return
+                        authenticated = True
+                        websocket.send(json.dumps([{"ev": "status", "status": "auth_success", "message": "authenticated"}]))
+                    elif action in {"subscribe", "unsubscribe"} and authenticated:
+                        channels = {item.split(".", 1)[1].upper() for item in params if item.startswith("T.")}
+                        if action == "subscribe":
+                            subscribed |= channels
+                        else:
+                            subscribed -= channels
+                        websocket.send(json.dumps([
+                            {"ev": "status", "status": "success", "message": f"{action}d to: {item}"}
+                            for item in params
+                        ]))
+                    continue
+
+                if not subscribed:
+                    continue
+                if float(self.knobs["ws_error_rate"]) > 0 and rng.random() < float(self.knobs["ws_error_rate"]):
+                    self._count("ws_injected_errors")
+                    websocket.send(json.dumps([{"ev": "status", "status": "error", "message": "Injected stream error"}]))
+                    continue
+                tickers = sorted(subscribed - {"*"})
+                if "*" in subscribed:
+                    tickers = self.market.symbols()[:MAX_STREAM_TICKERS]
+                now_ms = int(time.time() * 1000)
+                trades = [
+                    {
+                        "ev": "T",
+                        "sym": ticker,
+                        "i": str(rng.getrandbits(32)),
+                        "x": rng.choice((4, 10, 11, 12)),
+                        "p": self.market.live_price(ticker, rng),
+                        "s": rng.choice((1, 5, 10, 100, 200)),
+                        "c": [],
+                        "t": now_ms,
+                        "q": rng.getrandbits(24),
+                    }
+                    for ticker in tickers
+                ]
+                self._count("ws_trades")
+                websocket.send(json.dumps(trades))
+        except ConnectionClosed:
+            return
+
+
+class FakePolygonServer:
+    """Runs `FakePolygon` over HTTP and WebSocket on background threads."""
+
+    def __init__(self, market: FakeMarket | None = None, host: str = "127.0.0.1", port: int = 0, ws_port: int = 0, **knobs):
+        self.fake = FakePolygon(market, **knobs)
+        self.host = host
+        self._http = make_server(host, port, self.fake.app, threaded=True)
+        self._ws = serve_websocket(self.fake.handle_stream, host, ws_port)
+        self._threads = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._http.server_port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self._ws.socket.getsockname()[1]}/stocks"
+
+    @property
+    def delayed_ws_url(self) -> str:
+        return f"ws://{self.host}:{self._ws.socket.getsockname()[1]}/delayed/stocks"
+
+    def environment(self) -> dict[str, str]:
+        return {
+            "POLYGON_API_KEY": "fake",
+            "POLYGON_BASE_URL": self.base_url,
+            "POLYGON_REALTIME_STOCKS_WS_URL": self.ws_url,
+            "POLYGON_DELAYED_STOCKS_WS_URL": self.delayed_ws_url,
+        }
+
+    def start(self) -> "FakePolygonServer":
+        for target in (self._http.serve_forever, self._ws.serve_forever):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._http.shutdown()
+        self._ws.shutdown()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def __enter__(self) -> "FakePolygonServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws-port", type=int, default=8766)
+    parser.add_argument("--fixture", type=Path, help="market.json written by bench.synthetic_statements")
+    for knob, default in DEFAULT_KNOBS.items():
+        if isinstance(default, bool):
+            parser.add_argument(f"--{knob.replace('_', '-')}", dest=knob, action="store_true")
+        else:
+            parser.add_argument(f"--{knob.replace('_', '-')}", dest=knob, type=type(default), default=default)
+    args = parser.parse_args()
+
+    knobs = {knob: getattr(args, knob) for knob in DEFAULT_KNOBS}
+    market = FakeMarket.load(args.fixture) if args.fixture else FakeMarket()
+    server = FakePolygonServer(market, host=args.host, port=args.port, ws_port=args.ws_port, **knobs).start()
+    for name, value in server.environment().items():
+        print(f"export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
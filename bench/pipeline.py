@@ -0,0 +1,245 @@
+"""End-to-end benchmark for statement merging and report generation.
+
+Run from the repo root:
+
+    python -m bench.pipeline [--accounts 2] [--years 5] [--symbols 8]
+        [--trades-per-month 6] [--repeats 3] [--threshold 0.25] [--save]
+
+Each repeat generates a fresh synthetic history in a temporary directory (see
+`bench.synthetic_statements`) and times every stage against the local market
+fixture, with no network access:
+
+    generate       write the statement CSVs and the market fixture
+    merge          `merge_statements` for every account
+    parse_trades   read `combined.csv` and build the trade frame
+    lot_book       split-adjust the trades and rebuild the tax-lot book
+    analyze_cold   `analyze_fidelity.main()` with empty report and figure caches
+    analyze_warm   `analyze_fidelity.main()` again, reusing the QuantStats HTML
+
+Before every repeat a fixed pandas/Python calibration workload is timed as
+well, and its best time is stored with the baseline. Checked-in milliseconds come
+from whatever machine recorded them, so each baseline stage is first rescaled by
+this run's calibration over the baseline's, and the gate compares best-of-repeats
+times against those rescaled references. This compares how each stage performs
+relative to the machine, not raw wall-clock time.
+
+The run exits non-zero if any stage is slower than its rescaled baseline by more
+than `--threshold` and also by more than a noise floor: `--min-delta-ms`, or
+`--noise-factor` times the larger median-to-best spread of the baseline and of
+this run. Baselines recorded without a calibration, or with a different
+configuration, skip the check. `--save` records this run as the new baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from bench.synthetic_statements import MarketFixture, generate_history
+from src.reports import analyze_fidelity, figures
+from src.reports.watch import merge_statements
+
+
+RESULTS_PATH = Path(__file__).parent / "results" / "pipeline.json"
+STAGES = ("generate", "merge", "parse_trades", "lot_book", "analyze_cold", "analyze_warm")
+
+
+@contextlib.contextmanager
+def _pipeline_environment(root: Path, fixture: MarketFixture):
+    """Point analyze_fidelity at `root` and serve prices from the fixture."""
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(analyze_fidelity, "BASE_DIR", root))
+        stack.enter_context(mock.patch.object(analyze_fidelity, "ACCOUNTS_FILE", root / "data" / "accounts.json"))
+        stack.enter_context(mock.patch.object(figures, "FIGURE_CACHE_DIR", root / "out" / ".quantstats" / "figures"))
+        for name in ("get_polygon_prices", "get_polygon_splits", "get_polygon_dividends", "get_polygon_session_prices"):
+            stack.enter_context(mock.patch.object(analyze_fidelity, name, getattr(fixture, name)))
+        stack.enter_context(mock.patch.dict(os.environ, {"POLYGON_API_KEY": "fixture"}))
+        stack.enter_context(mock.patch.object(sys, "argv", ["analyze_fidelity"]))
+        yield
+
+
+def _calibration_ms() -> float:
+    """Time a fixed workload mixing the CSV, groupby and Python-loop work the stages do."""
+    rng = np.random.default_rng(0)
+    started_at = time.perf_counter()
+    frame = pd.DataFrame({"key": rng.integers(0, 64, 50_000), "value": rng.normal(size=50_000)})
+    frame = pd.read_csv(io.StringIO(frame.to_csv(index=False)))
+    frame.groupby("key")["value"].agg(["sum", "std", "last"])
+    total = 0.0
+    for key, value in zip(frame["key"].tolist(), frame["value"].tolist()):
+        total += key * value
+    return (time.perf_counter() - started_at) * 1000
+
+
+class _Timer:
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        started_at = time.perf_counter()
+        # The pipeline narrates every step; keep the benchmark output readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+        self.timings[name] = (time.perf_counter() - started_at) * 1000
+
+
+def _run_once(config: dict) -> dict[str, float]:
+    timer = _Timer()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        with timer.stage("generate"):
+            summary = generate_history(root, **config)
+        account_dirs = [root / "data" / account_id for account_id in summary["accounts"]]
+
+        with timer.stage("merge"):
+            for account_dir in account_dirs:
+                merge_statements(account_dir)
+
+        fixture = MarketFixture.load(summary["fixture"])
+        with timer.stage("parse_trades"):
+            parsed = []
+            for account_dir in account_dirs:
+                df = pd.read_csv(account_dir / "combined.csv")
+                df["Run Date"] = pd.to_datetime(df["Run Date"])
+                trades, _, _ = analyze_fidelity._build_position_trade_frame(df.sort_values("Run Date"))
+                parsed.append(trades)
+
+        with timer.stage("lot_book"):
+            for trades in parsed:
+                symbols = trades["symbol"].unique().tolist()
+                splits = fixture.get_polygon_splits(symbols, "1900-01-01", "2999-12-31")
+                adjusted = analyze_fidelity._apply_future_split_adjustments(trades, splits)
+                analyze_fidelity.build_remaining_lot_book(adjusted, symbols)
+
+        with _pipeline_environment(root, fixture):
+            with timer.stage("analyze_cold"):
+                analyze_fidelity.main()
+            with timer.stage("analyze_warm"):
+                analyze_fidelity.main()
+    return timer.timings
+
+
+def _load_baseline() -> dict | None:
+    if not RESULTS_PATH.exists():
+        return None
+    return json.loads(RESULTS_PATH.read_text(encoding="utf-8"))
+
+
+def _regressions(
+    stages: dict,
+    calibration_ms: float,
+    baseline: dict,
+    threshold: float,
+    min_delta_ms: float,
+    noise_factor: float,
+) -> list[str]:
+    scale = calibration_ms / baseline["calibration_ms"]
+    failures = []
+    for name, result in stages.items():
+        reference = baseline["stages"].get(name)
+        if reference is None:
+            continue
+        expected_ms = reference["best_ms"] * scale
+        delta = result["best_ms"] - expected_ms
+        spread = max((reference["median_ms"] - reference["best_ms"]) * scale, result["median_ms"] - result["best_ms"])
+        noise_floor = max(min_delta_ms, noise_factor * spread)
+        if delta > noise_floor and delta > expected_ms * threshold:
+            failures.append(
+                f"{name}: {result['best_ms']:.1f} ms vs rescaled baseline {expected_ms:.1f} ms "
+                f"(+{delta / expected_ms:.0%})"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--trades-per-month", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=5.0)
+    parser.add_argument("--noise-factor", type=float, default=2.0)
+    parser.add_argument("--save", action="store_true", help="record this run as the new baseline")
+    args = parser.parse_args()
+
+    config = {
+        "accounts": args.accounts,
+        "years": args.years,
+        "symbols": args.symbols,
+        "trades_per_month": args.trades_per_month,
+        "seed": args.seed,
+    }
+    runs = []
+    calibrations = []
+    for _ in range(args.repeats):
+        calibrations.append(_calibration_ms())
+        runs.append(_run_once(config))
+    calibration_ms = round(min(calibrations), 1)
+    stages = {
+        name: {
+            "median_ms": round(statistics.median(run[name] for run in runs), 1),
+            "best_ms": round(min(run[name] for run in runs), 1),
+        }
+        for name in STAGES
+    }
+
+    print(f"{args.accounts} accounts x {args.years} years, {args.symbols} symbols, {args.trades_per_month:g} trades/month")
+    for name, result in stages.items():
+        print(f"  {name:<13} median {result['median_ms']:9.1f} ms   best {result['best_ms']:9.1f} ms")
+    print(f"  {'calibration':<13} best {calibration_ms:9.1f} ms")
+
+    baseline = _load_baseline()
+    failures = []
+    if baseline is None:
+        print(f"No baseline at {RESULTS_PATH}; run with --save to record one.")
+    elif baseline.get("config") != config:
+        print("Baseline was recorded with a different configuration; skipping the regression check.")
+    elif "calibration_ms" not in baseline:
+        print("Baseline has no calibration timing; re-record it with --save to enable the regression check.")
+    else:
+        print(f"Machine scale vs baseline: {calibration_ms / baseline['calibration_ms']:.2f}x")
+        failures = _regressions(
+            stages, calibration_ms, baseline, args.threshold, args.min_delta_ms, args.noise_factor
+        )
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if not failures:
+            print(f"Within {args.threshold:.0%} of the rescaled baseline.")
+
+    if args.save:
+        RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        RESULTS_PATH.write_text(
+            json.dumps(
+                {
+                    "config": config,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "calibration_ms": calibration_ms,
+                    "stages": stages,
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"Baseline saved to {RESULTS_PATH}")
+    elif failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
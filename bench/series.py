@@ -0,0 +1,106 @@
+"""Microbenchmark for zero-filling returns and serializing chart series.
+
+Run from the repo root:
+
+    python -m bench.series [--years 30] [--repeats 7]
+
+Builds a sparse daily returns series (every session, with a share of days
+missing) and times `add_missing_zeros` and the chart-payload `_series_to_pairs`
+and `_frame_to_stacked_list` helpers. The "per-day" column is the previous
+implementation (dict lookup per day, `strftime` per point), kept here as the
+reference the new code is measured against.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.reports.analyze_fidelity import add_missing_zeros
+from src.reports.model_portfolio import _frame_to_stacked_list, _series_to_pairs
+from src.reports.trading_calendar import sessions_between
+
+
+def _synthetic_returns(years: int, missing: float = 0.1) -> pd.Series:
+    rng = np.random.default_rng(0)
+    end = pd.Timestamp("2025-12-31")
+    sessions = sessions_between(end - pd.DateOffset(years=years), end)
+    kept = sessions[rng.random(len(sessions)) >= missing]
+    return pd.Series(rng.normal(0.0004, 0.01, len(kept)), index=kept)
+
+
+def _synthetic_weights(index: pd.DatetimeIndex, columns: int = 10) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    weights = rng.random((len(index), columns))
+    weights[rng.random(weights.shape) < 0.3] = 0.0
+    return pd.DataFrame(weights, index=index, columns=[f"S{i}" for i in range(columns)])
+
+
+def _per_day_missing_zeros(returns: pd.Series) -> pd.Series:
+    full_range = sessions_between(returns.index.min(), returns.index.max()).union(returns.index)
+    r_map = returns.to_dict()
+    return pd.Series([r_map.get(day, 0.0) for day in full_range], index=full_range, name="Date")
+
+
+def _per_day_series_to_pairs(series: pd.Series) -> list[dict]:
+    series = series.dropna()
+    return [{"t": date.strftime("%Y-%m-%d"), "v": float(value)} for date, value in series.items()]
+
+
+def _per_day_frame_to_stacked_list(frame: pd.DataFrame) -> list[dict]:
+    out = []
+    for column in frame.columns:
+        series = frame[column].dropna().copy()
+        series[series.abs() < 1e-6] = None
+        if series.isna().all():
+            continue
+        points = [
+            {"t": date.strftime("%Y-%m-%d"), "v": (None if pd.isna(value) else float(value))}
+            for date, value in series.items()
+        ]
+        out.append({"name": column, "points": points})
+    return out
+
+
+def _time(fn, repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+
+    returns = _synthetic_returns(args.years)
+    filled = add_missing_zeros(returns)
+    weights = _synthetic_weights(filled.index)
+    assert filled.equals(_per_day_missing_zeros(returns))
+    assert _series_to_pairs(filled) == _per_day_series_to_pairs(filled)
+    assert _frame_to_stacked_list(weights) == _per_day_frame_to_stacked_list(weights)
+
+    cases = [
+        ("add_missing_zeros", lambda: add_missing_zeros(returns), lambda: _per_day_missing_zeros(returns)),
+        ("series_to_pairs", lambda: _series_to_pairs(filled), lambda: _per_day_series_to_pairs(filled)),
+        (
+            "frame_to_stacked",
+            lambda: _frame_to_stacked_list(weights),
+            lambda: _per_day_frame_to_stacked_list(weights),
+        ),
+    ]
+    print(f"{args.years} years, {len(returns)} returns, {len(filled)} sessions, {weights.shape[1]} weight columns")
+    print(f"  {'':18}{'median':>10}{'per-day':>10}{'speedup':>9}")
+    for name, current, per_day in cases:
+        current_ms = statistics.median(_time(current, args.repeats))
+        per_day_ms = statistics.median(_time(per_day, args.repeats))
+        print(f"  {name:18}{current_ms:8.1f}ms{per_day_ms:8.1f}ms{per_day_ms / current_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
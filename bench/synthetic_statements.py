@@ -0,0 +1,425 @@
+"""Deterministic Fidelity- and Schwab-format brokerage history for benchmarks.
+
+Run from the repo root:
+
+    python -m bench.synthetic_statements OUTPUT_DIR [--accounts 2] [--years 5]
+        [--symbols 8] [--trades-per-month 6] [--splits-per-year 0.1]
+        [--wash-sale-rate 0.3] [--no-reinvest] [--seed 0]
+
+Writes `OUTPUT_DIR/data/<account>/statements/*.csv` and `OUTPUT_DIR/data/accounts.json`
+in the layout `watch.py` expects, plus `OUTPUT_DIR/fixtures/market.json`: the raw
+closes, splits, and dividends the statements were generated from. `MarketFixture`
+serves that file through the same signatures as the `get_polygon_*` helpers, so a
+pipeline run against the generated data needs no network.
+
+Statements are split into yearly exports that overlap by a month, like repeated
+downloads from the brokerage site, so merging also exercises deduplication.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.reports.polygon import future_split_factors
+
+
+BENCHMARK = "VT"
+FIDELITY_COLUMNS = [
+    "Run Date",
+    "Action",
+    "Symbol",
+    "Description",
+    "Type",
+    "Exchange Quantity",
+    "Exchange Currency",
+    "Quantity",
+    "Currency",
+    "Price ($)",
+    "Exchange Rate",
+    "Commission ($)",
+    "Fees ($)",
+    "Accrued Interest ($)",
+    "Amount ($)",
+    "Cash Balance ($)",
+    "Settlement Date",
+]
+SCHWAB_COLUMNS = ["Date", "Action", "Symbol", "Description", "Quantity", "Price", "Fees & Comm", "Amount"]
+STATEMENT_DATE_FORMAT = "%m/%d/%Y"
+SPLIT_RATIOS = (2, 3, 4)
+
+
+def _ticker(number: int) -> str:
+    return "SY" + chr(ord("A") + number // 26 % 26) + chr(ord("A") + number % 26)
+
+
+def _description(symbol: str) -> str:
+    return f"SYNTHETIC {symbol} HOLDINGS INC COM"
+
+
+def synthetic_market(symbols: list[str], start, end, seed: int = 0, splits_per_year: float = 0.1) -> dict:
+    """Raw (unadjusted) daily closes with splits and quarterly dividends.
+
+    Closes drop by the split ratio on each execution date, the way an unadjusted
+    series does, and dividend amounts are per pre-split share.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    years = max(len(dates) / 252, 1 / 252)
+    raw_close = {}
+    splits = {}
+    dividends = {}
+
+    for symbol in [*symbols, BENCHMARK]:
+        drift = rng.normal(0.0003, 0.0002)
+        volatility = 0.008 if symbol == BENCHMARK else rng.uniform(0.012, 0.03)
+        growth = np.exp(np.cumsum(rng.normal(drift, volatility, len(dates))))
+        close = rng.uniform(20.0, 200.0) * growth
+
+        events = []
+        if symbol != BENCHMARK and len(dates) > 2:
+            split_count = rng.poisson(splits_per_year * years)
+            for position in np.sort(rng.choice(np.arange(1, len(dates)), size=min(split_count, len(dates) - 1), replace=False)):
+                ratio = int(rng.choice(SPLIT_RATIOS))
+                close[position:] /= ratio
+                events.append({
+                    "ticker": symbol,
+                    "execution_date": dates[position].strftime("%Y-%m-%d"),
+                    "split_from": 1,
+                    "split_to": ratio,
+                })
+        raw_close[symbol] = np.round(close, 4)
+        splits[symbol] = events
+
+        dividend_yield = 0.02 if symbol == BENCHMARK else rng.choice([0.0, 0.01, 0.025])
+        dividends[symbol] = [
+            {
+                "ticker": symbol,
+                "ex_dividend_date": day.strftime("%Y-%m-%d"),
+                "cash_amount": round(float(raw_close[symbol][position]) * dividend_yield / 4, 4),
+            }
+            for position, day in enumerate(dates)
+            if dividend_yield and day.month in (3, 6, 9, 12) and (position + 1 == len(dates) or dates[position + 1].month != day.month)
+        ]
+
+    return {
+        "dates": [day.strftime("%Y-%m-%d") for day in dates],
+        "raw_close": {symbol: close.tolist() for symbol, close in raw_close.items()},
+        "splits": splits,
+        "dividends": dividends,
+    }
+
+
+def synthetic_account_events(
+    market: dict,
+    symbols: list[str],
+    seed: int,
+    trades_per_month: float = 6.0,
+    reinvest: bool = True,
+    wash_sale_rate: float = 0.3,
+) -> list[dict]:
+    """Trades, dividends, reinvestments, and split distributions for one account.
+
+    Sells never exceed the shares held. A sale below the average cost is followed,
+    with probability `wash_sale_rate`, by a rebuy of the same symbol within the
+    30-day wash-sale window.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(market["dates"])
+    raw_close = {symbol: np.asarray(market["raw_close"][symbol]) for symbol in symbols}
+    splits_by_day = {
+        (event["execution_date"], symbol): event["split_to"] / event["split_from"]
+        for symbol in symbols
+        for event in market["splits"].get(symbol, [])
+    }
+    dividends_by_day = {
+        (event["ex_dividend_date"], symbol): event["cash_amount"]
+        for symbol in symbols
+        for event in market["dividends"].get(symbol, [])
+    }
+    holdings = dict.fromkeys(symbols, 0.0)
+    average_cost = dict.fromkeys(symbols, 0.0)
+    rebuys: dict[int, list[tuple[str, float]]] = {}
+    trade_probability = min(1.0, trades_per_month / 21)
+    events = []
+
+    def record(kind, day, symbol, quantity, price, amount):
+        events.append({
+            "kind": kind,
+            "date": day,
+            "symbol": symbol,
+            "quantity": round(float(quantity), 4),
+            "price": round(float(price), 4),
+            "amount": round(float(amount), 2),
+        })
+
+    def buy(kind, day, symbol, quantity, price):
+        quantity = round(float(quantity), 4)
+        if quantity <= 0:
+            return
+        cost = average_cost[symbol] * holdings[symbol] + quantity * price
+        holdings[symbol] += quantity
+        average_cost[symbol] = cost / holdings[symbol]
+        record(kind, day, symbol, quantity, price, -quantity * price)
+
+    for position, day in enumerate(dates):
+        day_key = day.strftime("%Y-%m-%d")
+        for symbol in symbols:
+            ratio = splits_by_day.get((day_key, symbol))
+            if ratio and holdings[symbol] > 0:
+                extra = round(holdings[symbol] * (ratio - 1), 4)
+                holdings[symbol] += extra
+                average_cost[symbol] /= ratio
+                record("split", day, symbol, extra, 0.0, 0.0)
+
+            cash_amount = dividends_by_day.get((day_key, symbol))
+            if cash_amount and holdings[symbol] > 0:
+                amount = round(holdings[symbol] * cash_amount, 2)
+                record("dividend", day, symbol, 0.0, 0.0, amount)
+                if reinvest:
+                    price = raw_close[symbol][position]
+                    buy("reinvest", day, symbol, amount / price, price)
+
+        for symbol, quantity in rebuys.pop(position, []):
+            buy("buy", day, symbol, quantity, raw_close[symbol][position])
+
+        if rng.random() >= trade_probability:
+            continue
+        symbol = symbols[int(rng.integers(len(symbols)))]
+        price = raw_close[symbol][position]
+        if holdings[symbol] > 0 and rng.random() < 0.35:
+            quantity = round(holdings[symbol] * rng.uniform(0.2, 1.0), 4)
+            quantity = min(quantity, holdings[symbol])
+            if quantity <= 0:
+                continue
+            holdings[symbol] = max(0.0, holdings[symbol] - quantity)
+            record("sell", day, symbol, quantity, price, quantity * price)
+            if price < average_cost[symbol] and rng.random() < wash_sale_rate:
+                rebuy_position = position + int(rng.integers(1, 21))
+                if rebuy_position < len(dates):
+                    rebuys.setdefault(rebuy_position, []).append((symbol, quantity * rng.uniform(0.3, 1.0)))
+        else:
+            buy("buy", day, symbol, rng.uniform(500.0, 5000.0) / price, price)
+
+    return events
+
+
+def _fidelity_row(event: dict) -> dict:
+    symbol = event["symbol"]
+    security = f"{_description(symbol)} ({symbol})"
+    day = event["date"]
+    row = dict.fromkeys(FIDELITY_COLUMNS, "")
+    row.update({
+        "Run Date": day.strftime(STATEMENT_DATE_FORMAT),
+        "Symbol": symbol,
+        "Description": _description(symbol),
+        "Type": "Cash",
+        "Exchange Quantity": 0,
+        "Currency": "USD",
+        "Exchange Rate": 0,
+        "Quantity": event["quantity"],
+        "Price ($)": event["price"] or "",
+        "Amount ($)": event["amount"],
+        "Settlement Date": (day + pd.offsets.BDay(1)).strftime(STATEMENT_DATE_FORMAT),
+    })
+    kind = event["kind"]
+    if kind == "buy":
+        row["Action"] = f"YOU BOUGHT {security} (Cash)"
+    elif kind == "sell":
+        row["Action"] = f"YOU SOLD {security} (Cash)"
+        row["Quantity"] = -event["quantity"]
+    elif kind == "dividend":
+        row["Action"] = f"DIVIDEND RECEIVED {security} (Cash)"
+    elif kind == "reinvest":
+        row["Action"] = f"REINVESTMENT {security} (Cash)"
+    elif kind == "split":
+        row["Action"] = f"DISTRIBUTION {security} (Shares)"
+        row["Type"] = "Shares"
+        row["Settlement Date"] = ""
+    return row
+
+
+def _schwab_money(value: float) -> str:
+    return f"-${abs(value):,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+def _schwab_row(event: dict) -> dict:
+    kind = event["kind"]
+    return {
+        "Date": event["date"].strftime(STATEMENT_DATE_FORMAT),
+        "Action": {
+            "buy": "Buy",
+            "sell": "Sell",
+            "dividend": "Cash Dividend",
+            "reinvest": "Reinvest Shares",
+            "split": "Stock Split",
+        }[kind],
+        "Symbol": event["symbol"],
+        "Description": _description(event["symbol"]),
+        "Quantity": "" if kind == "dividend" else event["quantity"],
+        "Price": f"${event['price']:,.4f}" if event["price"] else "",
+        "Fees & Comm": "",
+        "Amount": "" if kind == "split" else _schwab_money(event["amount"]),
+    }
+
+
+def write_statements(statements_dir: Path, account_id: str, events: list[dict], broker: str) -> list[Path]:
+    """Write one newest-first export per calendar year, each overlapping the next by a month."""
+    statements_dir.mkdir(parents=True, exist_ok=True)
+    if not events:
+        return []
+
+    to_row = _schwab_row if broker == "schwab" else _fidelity_row
+    columns = SCHWAB_COLUMNS if broker == "schwab" else FIDELITY_COLUMNS
+    frame = pd.DataFrame([to_row(event) for event in events], columns=columns)
+    event_dates = pd.DatetimeIndex([event["date"] for event in events])
+    paths = []
+
+    for number, year in enumerate(sorted(set(event_dates.year))):
+        window = (event_dates >= pd.Timestamp(year, 1, 1)) & (event_dates < pd.Timestamp(year + 1, 2, 1))
+        if broker == "schwab":
+            name = f"{account_id}_Transactions_{year}0201-000000.csv"
+        else:
+            name = f"History_for_Account_{account_id}{f' ({number})' if number else ''}.csv"
+        path = statements_dir / name
+        frame[window].iloc[::-1].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def generate_history(
+    root: Path,
+    *,
+    accounts: int = 2,
+    years: int = 5,
+    symbols: int = 8,
+    trades_per_month: float = 6.0,
+    splits_per_year: float = 0.1,
+    reinvest: bool = True,
+    wash_sale_rate: float = 0.3,
+    seed: int = 0,
+    end=None,
+) -> dict:
+    """Write statements for `accounts` accounts plus the market fixture under `root`.
+
+    Even-numbered accounts are exported in Fidelity format and odd-numbered ones
+    in Schwab format. Returns the account ids and event counts.
+    """
+    root = Path(root)
+    end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end).normalize()
+    start = (end - pd.DateOffset(years=years)).normalize()
+    universe = [_ticker(number) for number in range(symbols)]
+    market = synthetic_market(universe, start, end, seed=seed, splits_per_year=splits_per_year)
+
+    data_dir = root / "data"
+    rng = np.random.default_rng(seed + 1)
+    account_entries = []
+    event_counts = {}
+    for number in range(accounts):
+        account_id = f"SYN{number:03d}"
+        size = min(len(universe), max(3, int(rng.integers(len(universe) // 2, len(universe) + 1))))
+        account_symbols = sorted(rng.choice(universe, size=size, replace=False).tolist())
+        events = synthetic_account_events(
+            market,
+            account_symbols,
+            seed=seed * 1000 + number,
+            trades_per_month=trades_per_month,
+            reinvest=reinvest,
+            wash_sale_rate=wash_sale_rate,
+        )
+        broker = "schwab" if number % 2 else "fidelity"
+        write_statements(data_dir / account_id / "statements", account_id, events, broker)
+        account_entries.append({"id": account_id, "name": f"Synthetic {broker.title()} {number}", "about": None})
+        event_counts[account_id] = len(events)
+
+    (data_dir / "accounts.json").write_text(json.dumps(account_entries, indent=2), encoding="utf-8")
+    fixture_path = root / "fixtures" / "market.json"
+    fixture_path.parent.mkdir(parents=True, exist_ok=True)
+    fixture_path.write_text(json.dumps(market), encoding="utf-8")
+    return {"accounts": [entry["id"] for entry in account_entries], "events": event_counts, "fixture": fixture_path}
+
+
+class MarketFixture:
+    """Serves a `market.json` fixture through the `get_polygon_*` signatures."""
+
+    def __init__(self, market: dict):
+        dates = pd.DatetimeIndex(market["dates"])
+        self.splits = market["splits"]
+        self.raw_dividends = market["dividends"]
+        self.prices = pd.DataFrame(
+            {
+                symbol: np.asarray(close) / future_split_factors(self.splits.get(symbol, []), dates)
+                for symbol, close in market["raw_close"].items()
+            },
+            index=dates,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "MarketFixture":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def get_polygon_prices(self, symbols, start, end):
+        window = self.prices.loc[pd.Timestamp(start):pd.Timestamp(end)]
+        return window.reindex(columns=[symbol for symbol in symbols if symbol in window.columns])
+
+    def get_polygon_splits(self, symbols, start, end):
+        return {
+            symbol: [event for event in self.splits.get(symbol, []) if start <= event["execution_date"] <= end]
+            for symbol in symbols
+        }
+
+    def get_polygon_dividends(self, symbols, start, end):
+        series_by_symbol = {}
+        for symbol in symbols:
+            events = [event for event in self.raw_dividends.get(symbol, []) if start <= event["ex_dividend_date"] <= end]
+            ex_index = pd.DatetimeIndex([event["ex_dividend_date"] for event in events])
+            amounts = np.asarray([event["cash_amount"] for event in events], dtype=float)
+            series_by_symbol[symbol] = pd.Series(
+                amounts / future_split_factors(self.splits.get(symbol, []), ex_index),
+                index=ex_index,
+                dtype=float,
+            )
+        return pd.DataFrame(series_by_symbol).sort_index().reindex(columns=symbols)
+
+    def get_polygon_session_prices(self, symbols, date_like):
+        day = pd.Timestamp(date_like).normalize()
+        out = {}
+        for symbol in symbols:
+            price = self.prices[symbol].get(day) if symbol in self.prices.columns else None
+            price = None if price is None or pd.isna(price) else float(price)
+            out[symbol] = {"current": price, "open": price}
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--trades-per-month", type=float, default=6.0)
+    parser.add_argument("--splits-per-year", type=float, default=0.1)
+    parser.add_argument("--wash-sale-rate", type=float, default=0.3)
+    parser.add_argument("--no-reinvest", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_history(
+        args.output_dir,
+        accounts=args.accounts,
+        years=args.years,
+        symbols=args.symbols,
+        trades_per_month=args.trades_per_month,
+        splits_per_year=args.splits_per_year,
+        reinvest=not args.no_reinvest,
+        wash_sale_rate=args.wash_sale_rate,
+        seed=args.seed,
+    )
+    for account_id in summary["accounts"]:
+        print(f"{account_id}: {summary['events'][account_id]} events")
+    print(f"Market fixture: {summary['fixture']}")
+
+
+if __name__ == "__main__":
+    main()
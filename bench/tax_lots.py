@@ -0,0 +1,50 @@
+"""Throughput benchmark for the tax-lot engine.
+
+Run from the repo root:
+
+    python -m bench.tax_lots [--trades 5000] [--repeats 3]
+
+Builds an active trading history in one ticker (mostly small buys, with sells
+that rarely close the position) and times `build_remaining_lot_book`.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.reports.analyze_fidelity import build_remaining_lot_book
+
+
+def _synthetic_trades(count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2010-01-04") + pd.to_timedelta(np.sort(rng.integers(0, 15 * 365, count)), unit="D")
+    prices = np.round(50.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, count))), 2)
+    quantities = np.where(rng.random(count) < 0.3, -rng.uniform(1.0, 5.0, count), rng.uniform(1.0, 10.0, count))
+    return pd.DataFrame({
+        "Run Date": dates,
+        "symbol": "AAA",
+        "quantity": np.round(quantities, 4),
+        "price": prices,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trades", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    trades = _synthetic_trades(args.trades)
+    timings = []
+    for _ in range(args.repeats):
+        started_at = time.perf_counter()
+        lot_book = build_remaining_lot_book(trades, ["AAA"])
+        timings.append((time.perf_counter() - started_at) * 1000)
+    print(f"{args.trades} trades, {len(lot_book['AAA'])} open lots")
+    print(f"  median {statistics.median(timings):8.1f} ms   best {min(timings):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
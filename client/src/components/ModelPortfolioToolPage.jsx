@@ -20,7 +20,7 @@ import {
     Typography,
 } from "@mui/material";
 import AccountTabs from "./AccountTabs.jsx";
-import { SourcePicker, formatPercent, normalizeTicker, postJson } from "./toolsShared.jsx";
+import { SourcePicker, formatPercent, normalizeTicker, postJson, runToolJob } from "./toolsShared.jsx";
 import { serializeHoldings, serializeQuery, serializeTickerList, trackToolEvent } from "../umami.js";
 
 const rollWeekendBack = (date) => {
@@ -299,6 +299,7 @@ export default function ModelPortfolioToolPage({ accounts }) {
     const [loadingPortfolioSource, setLoadingPortfolioSource] = useState(false);
     const [loadingBenchmarkSource, setLoadingBenchmarkSource] = useState(false);
     const [loadingReport, setLoadingReport] = useState(false);
+    const [progressMessage, setProgressMessage] = useState("");
     const [warnings, setWarnings] = useState([]);
     const [error, setError] = useState("");
     const [viewerAccount, setViewerAccount] = useState(null);
@@ -723,6 +724,7 @@ export default function ModelPortfolioToolPage({ accounts }) {
         };
 
         setLoadingReport(true);
+        setProgressMessage("");
         setError("");
         setWarnings([]);
         setViewerAccount(null);
@@ -731,7 +733,7 @@ export default function ModelPortfolioToolPage({ accounts }) {
         trackToolEvent(TOOL_EVENT_NAME, "run_started", runEventData);
 
         try {
-            const payload = await postJson("/api/tools/model-portfolio-report", requestBody);
+            const payload = await runToolJob("/api/tools/model-portfolio-report", requestBody, setProgressMessage);
             setWarnings(payload.warnings || []);
             setViewerAccount(payload.account || null);
             setRangeInfo(payload.rangeInfo || null);
@@ -976,6 +978,11 @@ export default function ModelPortfolioToolPage({ accounts }) {
                 </Stack>
 
                 {loadingReport && <LinearProgress sx={{ mt: 2 }} />}
+                {loadingReport && progressMessage && (
+                    <Typography variant="body2" color="text.secondary" sx={{ mt: 1 }}>
+                        {progressMessage}
+                    </Typography>
+                )}
             </Paper>
 
             {error && <Alert severity="error" sx={{ mb: 2 }}>{error}</Alert>}
@@ -17,7 +17,7 @@ import {
     TextField,
     Typography,
 } from "@mui/material";
-import { SourcePicker, formatPercent, postJson, splitTickers } from "./toolsShared.jsx";
+import { SourcePicker, formatPercent, postJson, runToolJob, splitTickers } from "./toolsShared.jsx";
 import { serializeQuery, serializeTickerList, trackToolEvent } from "../umami.js";
 
 const todayString = () => new Date().toISOString().slice(0, 10);
@@ -358,6 +358,7 @@ export default function StockToolsPage({ tool, accounts }) {
     const [error, setError] = useState("");
     const [loadingSource, setLoadingSource] = useState(false);
     const [loadingResults, setLoadingResults] = useState(false);
+    const [progressMessage, setProgressMessage] = useState("");
     const [marketCapData, setMarketCapData] = useState(null);
     const [earningsData, setEarningsData] = useState(null);
     const [startDate, setStartDate] = useState(todayString());
@@ -444,6 +445,7 @@ export default function StockToolsPage({ tool, accounts }) {
         setError("");
         setWarnings([]);
         setLoadingResults(true);
+        setProgressMessage("");
         const toolQuery = buildToolQuery();
         const baseEventData = buildToolEventData(toolQuery);
 
@@ -453,7 +455,7 @@ export default function StockToolsPage({ tool, accounts }) {
 
         try {
             if (isEarnings) {
-                const payload = await postJson("/api/tools/earnings-calendar", toolQuery);
+                const payload = await runToolJob("/api/tools/earnings-calendar", toolQuery, setProgressMessage);
                 setEarningsData(payload);
                 setWarnings(payload.warnings || []);
                 trackToolEvent(toolEventName, "run_completed", {
@@ -462,7 +464,7 @@ export default function StockToolsPage({ tool, accounts }) {
                     warnings_count: (payload.warnings || []).length,
                 });
             } else {
-                const payload = await postJson("/api/tools/market-cap-weights", toolQuery);
+                const payload = await runToolJob("/api/tools/market-cap-weights", toolQuery, setProgressMessage);
                 setMarketCapData(payload);
                 setWarnings(payload.warnings || []);
                 trackToolEvent(toolEventName, "run_completed", {
@@ -563,7 +565,12 @@ export default function StockToolsPage({ tool, accounts }) {
             ))}
 
             <Paper sx={{ p: { xs: 1.5, sm: 2 }, borderRadius: 2, overflowX: "auto" }}>
-                {loadingResults && <LinearProgress sx={{ mb: 2 }} />}
+                {loadingResults && <LinearProgress sx={{ mb: progressMessage ? 1 : 2 }} />}
+                {loadingResults && progressMessage && (
+                    <Typography variant="body2" color="text.secondary" sx={{ mb: 2 }}>
+                        {progressMessage}
+                    </Typography>
+                )}
                 {!marketCapData && !earningsData && !loadingResults && (
                     <Typography variant="body2" color="text.secondary">
                         Results will appear here.
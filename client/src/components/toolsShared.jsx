@@ -38,6 +38,44 @@ export async function postJson(url, body) {
     return payload;
 }
 
+const JOB_POLL_INTERVAL_MS = 1000;
+
+const waitForJobEvents = (eventsUrl, onProgress) =>
+    new Promise((resolve) => {
+        const events = new EventSource(eventsUrl);
+        const finish = () => {
+            events.close();
+            resolve();
+        };
+        events.addEventListener("progress", (event) => {
+            const update = JSON.parse(event.data);
+            onProgress?.(update.message || update.stage);
+        });
+        events.addEventListener("done", finish);
+        // Polling below picks up the result if the stream drops early.
+        events.onerror = finish;
+    });
+
+export async function runToolJob(url, body, onProgress) {
+    const submitted = await postJson(`${url}/jobs`, body);
+    await waitForJobEvents(submitted.eventsUrl, onProgress);
+
+    while (true) {
+        const response = await fetch(submitted.statusUrl);
+        const job = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            throw new Error(job.error || "Request failed");
+        }
+        if (job.status === "succeeded") {
+            return job.result;
+        }
+        if (job.status === "failed") {
+            throw new Error(job.error || "Request failed");
+        }
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+}
+
 export function SourcePicker({
     accounts,
     accountId,
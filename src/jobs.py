@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from src.tools import ToolDataError
+
+
+TOOL_JOB_WORKERS = int(os.environ.get("TOOL_JOB_WORKERS", "2"))
+TOOL_JOB_MAX_PENDING = int(os.environ.get("TOOL_JOB_MAX_PENDING", "32"))
+TOOL_JOB_RESULT_TTL_SECONDS = int(os.environ.get("TOOL_JOB_RESULT_TTL_SECONDS", "900"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = {JOB_SUCCEEDED, JOB_FAILED}
+
+
+class JobCapacityError(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, tool: str, dedupe_key: str):
+        self.id = uuid4().hex
+        self.tool = tool
+        self.dedupe_key = dedupe_key
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.status_code = None
+        self.events = []
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def _append_event(self, event: dict):
+        with self._condition:
+            self.events.append({**event, "seq": len(self.events)})
+            self._condition.notify_all()
+
+    def progress(self, stage: str, message: str | None = None):
+        self._append_event({"type": "progress", "stage": stage, "message": message})
+
+    def _finish(self, status: str, *, result=None, error: str | None = None, status_code: int = 200):
+        with self._condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.status_code = status_code
+            self.finished_at = time.time()
+            self._append_event({"type": "done", "status": status})
+
+    def wait_for_events(self, after: int, timeout: float) -> list[dict]:
+        """Return events with seq >= after, waiting up to `timeout` for new ones."""
+        with self._condition:
+            if len(self.events) <= after and not self.finished:
+                self._condition.wait(timeout)
+            return self.events[after:]
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        latest = next((event for event in reversed(self.events) if event["type"] == "progress"), None)
+        payload = {
+            "id": self.id,
+            "tool": self.tool,
+            "status": self.status,
+            "progress": latest,
+            "createdAt": self.created_at,
+            "finishedAt": self.finished_at,
+        }
+        if self.status == JOB_FAILED:
+            payload["error"] = self.error
+            payload["statusCode"] = self.status_code
+        if include_result and self.status == JOB_SUCCEEDED:
+            payload["result"] = self.result
+        return payload
+
+
+class JobManager:
+    """Runs long tool requests on a bounded pool and keeps their results for a while.
+
+    Submitting a request identical to one still queued or running returns the
+    existing job instead of starting another.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = TOOL_JOB_WORKERS,
+        max_pending: int = TOOL_JOB_MAX_PENDING,
+        result_ttl_seconds: int = TOOL_JOB_RESULT_TTL_SECONDS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.result_ttl_seconds = result_ttl_seconds
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._inflight: dict[str, Job] = {}
+        self._executor = None
+
+    def submit(self, tool: str, body: dict, run) -> tuple[Job, bool]:
+        """Queue `run(progress)` for `tool`; returns (job, created)."""
+        dedupe_key = f"{tool}:{json.dumps(body, sort_keys=True, default=str)}"
+        with self._lock:
+            self._purge_expired()
+            existing = self._inflight.get(dedupe_key)
+            if existing is not None:
+                return existing, False
+            if len(self._inflight) >= self.max_pending:
+                raise JobCapacityError("Too many tool jobs are already queued")
+
+            job = Job(tool, dedupe_key)
+            self._jobs[job.id] = job
+            self._inflight[dedupe_key] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-job")
+            executor = self._executor
+        executor.submit(self._run, job, run)
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "queued": statuses.count(JOB_QUEUED),
+            "running": statuses.count(JOB_RUNNING),
+            "finished": sum(1 for status in statuses if status in FINISHED_STATUSES),
+        }
+
+    def _run(self, job: Job, run):
+        job.status = JOB_RUNNING
+        job.progress("started")
+        try:
+            result = run(job.progress)
+        except ToolDataError as exc:
+            job._finish(JOB_FAILED, error=str(exc), status_code=exc.status_code)
+        except Exception as exc:
+            job._finish(JOB_FAILED, error=f"Tool job failed: {exc.__class__.__name__}", status_code=500)
+        else:
+            job._finish(JOB_SUCCEEDED, result=result)
+        finally:
+            with self._lock:
+                if self._inflight.get(job.dedupe_key) is job:
+                    del self._inflight[job.dedupe_key]
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def job_event_stream(job: Job, keepalive_seconds: float = 15):
+    """Yield SSE frames for a job's progress until it finishes."""
+    yield "retry: 3000\n\n"
+    sent = 0
+    while True:
+        events = job.wait_for_events(sent, keepalive_seconds)
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        for event in events:
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        sent += len(events)
+        if events[-1]["type"] == "done":
+            return
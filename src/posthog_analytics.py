@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+import atexit
 import json
 import math
 import os
+import queue
 import threading
-from collections.abc import Mapping, Sequence
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import datetime, timezone
 from urllib.parse import urlparse
 
 import requests
 
 POSTHOG_PROXY_PATH = "/api/posthog"
-POSTHOG_CAPTURE_PATH = "/i/v0/e/"
+POSTHOG_BATCH_PATH = "/batch/"
+POSTHOG_BATCH_SIZE = int(os.environ.get("POSTHOG_BATCH_SIZE", "50"))
+POSTHOG_FLUSH_INTERVAL_MS = int(os.environ.get("POSTHOG_FLUSH_INTERVAL_MS", "1000"))
+POSTHOG_QUEUE_SIZE = int(os.environ.get("POSTHOG_QUEUE_SIZE", "1000"))
+POSTHOG_SHUTDOWN_TIMEOUT_SECONDS = 5
+POSTHOG_PROXY_MAX_CONCURRENCY = int(os.environ.get("POSTHOG_PROXY_MAX_CONCURRENCY", "8"))
+POSTHOG_PROXY_TIMEOUT = (5, 30)
+POSTHOG_PROXY_CHUNK_BYTES = 64 * 1024
 
 _FORWARDED_REQUEST_HEADERS = (
     "Accept",
@@ -72,14 +83,79 @@ def build_posthog_public_config() -> dict[str, object]:
     }
 
 
+class PostHogProxyBusyError(Exception):
+    """Raised when every proxy slot is already waiting on PostHog."""
+
+
+_session_lock = threading.Lock()
+_session: requests.Session | None = None
+_proxy_slots = threading.BoundedSemaphore(max(1, POSTHOG_PROXY_MAX_CONCURRENCY))
+
+
+def _http_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(10, POSTHOG_PROXY_MAX_CONCURRENCY + 1),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _iter_request_body(body) -> Iterator[bytes]:
+    if isinstance(body, (bytes, bytearray)):
+        yield bytes(body)
+        return
+    read = getattr(body, "read", None)
+    if read is None:
+        yield from body
+        return
+    while True:
+        chunk = read(POSTHOG_PROXY_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _StreamedUpstreamBody:
+    """Response iterable that hands the upstream connection and proxy slot back on close."""
+
+    def __init__(self, response):
+        self._response = response
+        self._closed = False
+
+    def __iter__(self):
+        yield from self._response.iter_content(chunk_size=POSTHOG_PROXY_CHUNK_BYTES)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._response.close()
+        finally:
+            _proxy_slots.release()
+
+
 def forward_posthog_request(
     path: str,
     *,
     method: str,
     query_params: Sequence[tuple[str, str]],
-    body: bytes | None,
+    body,
     headers: Mapping[str, str],
-) -> tuple[bytes, int, dict[str, str]]:
+) -> tuple[Iterable[bytes], int, dict[str, str]]:
+    """Proxy one request to PostHog, streaming both bodies through a pooled session.
+
+    `body` may be bytes, an iterable of chunks, or a readable stream. The returned
+    iterable must be closed (WSGI servers do this) to free the connection and the
+    concurrency slot; PostHogProxyBusyError is raised when no slot is free.
+    """
     if not posthog_enabled():
         raise RuntimeError("PostHog is not configured")
 
@@ -89,21 +165,30 @@ def forward_posthog_request(
         for key, value in headers.items()
         if key in _FORWARDED_REQUEST_HEADERS and value
     }
-    response = requests.request(
-        method=method.upper(),
-        url=upstream_url,
-        params=list(query_params),
-        data=body or None,
-        headers=forwarded_headers,
-        allow_redirects=False,
-        timeout=(5, 30),
-    )
+    if not _proxy_slots.acquire(blocking=False):
+        raise PostHogProxyBusyError("Too many PostHog requests in flight")
+
+    try:
+        response = _http_session().request(
+            method=method.upper(),
+            url=upstream_url,
+            params=list(query_params),
+            data=_iter_request_body(body) if body else None,
+            headers=forwarded_headers,
+            allow_redirects=False,
+            stream=True,
+            timeout=POSTHOG_PROXY_TIMEOUT,
+        )
+    except BaseException:
+        _proxy_slots.release()
+        raise
+
     response_headers = {
         key: value
         for key, value in response.headers.items()
         if key in _FORWARDED_RESPONSE_HEADERS and value
     }
-    return response.content, response.status_code, response_headers
+    return _StreamedUpstreamBody(response), response.status_code, response_headers
 
 
 def _clean_property_value(value):
@@ -161,20 +246,135 @@ def build_backend_capture_payload(
     }
 
 
-def _post_capture_payload(payload: Mapping[str, object]) -> None:
-    try:
-        requests.post(
-            f"{posthog_host()}{POSTHOG_CAPTURE_PATH}",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-            timeout=5,
-        )
-    except requests.RequestException:
-        # Analytics should never affect request handling.
-        return
+# Queued by close() so a worker waiting out the flush interval wakes immediately.
+_STOP = object()
+
+
+class BackendEventSender:
+    """Single background worker that ships captured events through PostHog's batch API.
+
+    Events wait in a bounded queue and are flushed every `batch_size` events or
+    `flush_interval_ms`, whichever comes first. When the queue is full new events
+    are dropped and counted rather than blocking request handling.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = POSTHOG_BATCH_SIZE,
+        flush_interval_ms: int = POSTHOG_FLUSH_INTERVAL_MS,
+        max_queue_size: int = POSTHOG_QUEUE_SIZE,
+        session: requests.Session | None = None,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._session = session
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stop_requested = False
+        self._counts = {"enqueued": 0, "sent": 0, "dropped": 0, "failed": 0}
+
+    def enqueue(self, payload: Mapping[str, object]) -> bool:
+        event = dict(payload)
+        event.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("enqueued")
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._counts, "queue_depth": self._queue.qsize()}
+
+    def close(self, timeout: float = POSTHOG_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Stop the worker after it has sent everything already queued."""
+        with self._lock:
+            worker = self._worker
+            self._stop_requested = True
+        if worker is None or not worker.is_alive():
+            return
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            # A full queue never blocks the worker, and it sees the flag between events.
+            pass
+        worker.join(timeout)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += amount
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop_requested = False
+            self._worker = threading.Thread(target=self._run, name="posthog-sender", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+            elif self._stop_requested:
+                return
+
+    def _next_batch(self) -> list[dict]:
+        # Block briefly for the first event so close() is noticed promptly,
+        # then keep collecting until the batch fills or the interval elapses.
+        # Once stopping, drain what is queued without waiting.
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                if not batch:
+                    event = self._queue.get(timeout=0.1)
+                    deadline = time.monotonic() + self.flush_interval
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._stop_requested:
+                        event = self._queue.get_nowait()
+                    else:
+                        event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is not _STOP:
+                batch.append(event)
+        return batch
+
+    def _send(self, batch: list[dict]) -> None:
+        by_api_key: dict[object, list[dict]] = {}
+        for event in batch:
+            event = dict(event)
+            by_api_key.setdefault(event.pop("api_key", None), []).append(event)
+
+        session = self._session or _http_session()
+        for api_key, events in by_api_key.items():
+            try:
+                response = session.post(
+                    f"{posthog_host()}{POSTHOG_BATCH_PATH}",
+                    headers={"Content-Type": "application/json"},
+                    data=json.dumps({"api_key": api_key, "batch": events}),
+                    timeout=5,
+                )
+            except requests.RequestException:
+                # Analytics should never affect request handling.
+                self._count("failed", len(events))
+                continue
+            self._count("sent" if response.ok else "failed", len(events))
+
+
+backend_event_sender = BackendEventSender()
+atexit.register(backend_event_sender.close)
 
 
 def capture_backend_event_async(payload: Mapping[str, object] | None) -> None:
     if not payload:
         return
-    threading.Thread(target=_post_capture_payload, args=(payload,), daemon=True).start()
+    backend_event_sender.enqueue(payload)
@@ -0,0 +1,88 @@
+import gzip
+import os
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {".html", ".json", ".csv"}
+MIN_COMPRESS_BYTES = 1024
+ON_THE_FLY_CACHE_SIZE = int(os.environ.get("ON_THE_FLY_COMPRESSION_CACHE_SIZE", "64"))
+
+_ENCODING_SUFFIXES = {
+    "br": ".br",
+    "gzip": ".gz",
+}
+
+
+def supported_encodings() -> list[str]:
+    """Content-Encodings we can produce, best first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def is_compressible(path: Path) -> bool:
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def compress_bytes(data: bytes, encoding: str, *, best: bool = False) -> bytes:
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("brotli is not installed")
+        return brotli.compress(data, quality=11 if best else 5)
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-identical for identical input.
+        return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def sibling_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + _ENCODING_SUFFIXES[encoding])
+
+
+def write_precompressed_siblings(path: Path) -> list[Path]:
+    """Write .br/.gz copies next to a freshly written artifact.
+
+    Siblings are written after the source, so a sibling whose mtime is older
+    than its source was left behind by an in-place rewrite and is ignored.
+    """
+    path = Path(path)
+    if not is_compressible(path) or not path.exists():
+        return []
+
+    data = path.read_bytes()
+    written = []
+    for encoding in supported_encodings():
+        target = sibling_path(path, encoding)
+        if len(data) < MIN_COMPRESS_BYTES:
+            target.unlink(missing_ok=True)
+            continue
+        tmp_path = target.with_name(target.name + ".tmp")
+        tmp_path.write_bytes(compress_bytes(data, encoding, best=True))
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def fresh_sibling(path: Path, encoding: str) -> Path | None:
+    """Return the precompressed sibling if it is at least as new as the source."""
+    target = sibling_path(path, encoding)
+    try:
+        return target if target.stat().st_mtime_ns >= path.stat().st_mtime_ns else None
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=ON_THE_FLY_CACHE_SIZE)
+def _compressed_file_bytes(path: str, mtime_ns: int, size: int, encoding: str) -> bytes:
+    with open(path, "rb") as f:
+        return compress_bytes(f.read(), encoding)
+
+
+def compressed_file_bytes(path: Path, encoding: str) -> tuple[bytes, os.stat_result]:
+    """Compress a file on the fly, reusing the result until the file changes."""
+    stat = path.stat()
+    return _compressed_file_bytes(str(path), stat.st_mtime_ns, stat.st_size, encoding), stat
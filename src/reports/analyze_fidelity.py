@@ -1,7 +1,9 @@
 import json
 import os
 import re
+import shutil
 import sys
+import time
 import pandas as pd
 import pytz
 import requests
@@ -14,27 +16,42 @@ import quantstats as qs
 import pandas as pd
 import numpy as np
 
+from src.reports.figures import render_quantstats_report
+from src.reports.metrics import RISK_FREE_RATE, performance_summary
 from src.reports.polygon import (
     compute_total_return_returns,
-    future_split_factor_for_date,
+    future_split_factors,
     get_polygon_dividends,
     get_polygon_prices,
     get_polygon_session_prices,
     get_polygon_splits,
 )
+from src.reports.stage_timing import StageTimer, append_run_log, format_summary_table
+from src.reports.tax_lots import build_lot_book
+from src.reports.trading_calendar import count_sessions, iso_dates, previous_session, sessions_between
+from src.precompressed import write_precompressed_siblings
 from src.util import BASE_DIR
 
 qs.extend_pandas()
 
 ny_tz = pytz.timezone("America/New_York")
 SHARE_EPSILON = 1e-6
+# Rendering QuantStats HTML dominates a rebuild, so the full report is only
+# re-rendered when the account's statements change, when it is older than this,
+# or when `--quantstats` is passed. The interactive JSON metrics are always fresh.
+QUANTSTATS_HTML_MAX_AGE_SECONDS = int(os.environ.get("QUANTSTATS_HTML_MAX_AGE_SECONDS", str(24 * 60 * 60)))
+QUANTSTATS_CACHE_DIR_NAME = ".quantstats"
+# Part of the cached render's file name; bump when the returns fed to QuantStats change.
+QUANTSTATS_CACHE_VERSION = 3
+RUN_LOG_DIR_NAME = ".runs"
+RUN_LOG_FILE_NAME = "pipeline.jsonl"
 
 def add_missing_zeros(returns: pd.Series) -> pd.Series:
     """
-    For all days between min and max date:
+    For every NYSE session between min and max date:
       - If day exists in returns, keep its value.
       - If missing, insert 0.0.
-    No assumptions about weekends or holidays.
+    Dates in returns that are not sessions are kept as-is.
     """
     r = returns.copy()
     r.index = pd.to_datetime(r.index).normalize()
@@ -43,21 +60,33 @@ def add_missing_zeros(returns: pd.Series) -> pd.Series:
     if r.empty:
         return r
 
-    start, end = r.index.min(), r.index.max()
-    full_range = pd.date_range(start, end, freq="D")
+    sessions = sessions_between(r.index[0], r.index[-1])
+    if r.index.tz is not None:
+        # Sessions are naive wall dates; match the input's zone so the union lines up.
+        sessions = sessions.tz_localize(r.index.tz)
+    full_range = sessions.union(r.index)
+    return r.reindex(full_range, fill_value=0.0).rename("Date")
 
-    # Build dict for fast lookup
-    r_map = r.to_dict()
 
-    out_vals = [r_map.get(day, 0.0) for day in full_range]
-    return pd.Series(out_vals, index=full_range, name="Date")
+def report_metrics(returns: pd.Series, benchmark_returns: pd.Series) -> dict:
+    """Headline stats for the interactive report JSON, shared by account and model reports.
+
+    Computed on the trading-day series, before `add_missing_zeros` pads the session
+    calendar, so the same returns produce the same numbers in either report.
+    """
+    def _by_day(series: pd.Series) -> pd.Series:
+        s = series.copy()
+        s.index = pd.to_datetime(s.index).normalize()
+        return s[~s.index.duplicated()].sort_index().astype(float)
+
+    return performance_summary(_by_day(returns), _by_day(benchmark_returns), rf=RISK_FREE_RATE)
 
 
 def _expand_fetch_start_for_short_report_window(start_date: pd.Timestamp, end_date: pd.Timestamp) -> pd.Timestamp:
     start_day = pd.Timestamp(start_date).normalize()
     end_day = pd.Timestamp(end_date).normalize()
-    if len(pd.date_range(start_day, end_day, freq="B")) < 2:
-        return (start_day - pd.offsets.BDay(1)).normalize()
+    if count_sessions(start_day, end_day) < 2:
+        return previous_session(start_day)
     return start_day
 
 
@@ -83,7 +112,7 @@ def _fetch_polygon_prices_with_minimum_history(
         if prices.empty or len(prices.index.unique()) >= minimum_rows:
             break
 
-        next_fetch_start_date = (fetch_start_date - pd.offsets.BDay(1)).normalize()
+        next_fetch_start_date = previous_session(fetch_start_date)
         if next_fetch_start_date >= fetch_start_date:
             break
         fetch_start_date = next_fetch_start_date
@@ -359,12 +388,12 @@ def _write_quantstats_report(
         return False
 
     try:
-        qs.reports.html(
+        render_quantstats_report(
             returns,
-            rf=rf,
-            benchmark=benchmark,
-            output=output_path,
+            benchmark,
+            output_path,
             title=title,
+            rf=rf,
         )
         return True
     except np.linalg.LinAlgError:
@@ -372,6 +401,15 @@ def _write_quantstats_report(
         return False
 
 
+def _quantstats_report_is_fresh(report_path: Path, source_path: Path, max_age_seconds: int) -> bool:
+    if not report_path.exists():
+        return False
+    report_mtime = report_path.stat().st_mtime
+    if source_path.exists() and source_path.stat().st_mtime > report_mtime:
+        return False
+    return time.time() - report_mtime < max_age_seconds
+
+
 def _regression_beta(portfolio_returns: pd.Series, benchmark_returns: pd.Series) -> float:
     aligned = pd.concat(
         [
@@ -504,180 +542,18 @@ def _apply_future_split_adjustments(trades: pd.DataFrame, split_events_by_symbol
 
     adjusted = trades.copy()
     adjusted["display_price"] = adjusted["price"]
-    adjusted["split_adjustment"] = adjusted.apply(
-        lambda row: future_split_factor_for_date(split_events_by_symbol.get(row["symbol"], []), row["Run Date"]),
-        axis=1,
-    )
+    adjusted["split_adjustment"] = 1.0
+    for symbol, rows in adjusted.groupby("symbol", sort=False).groups.items():
+        split_events = split_events_by_symbol.get(symbol)
+        if split_events:
+            adjusted.loc[rows, "split_adjustment"] = future_split_factors(split_events, adjusted.loc[rows, "Run Date"])
     adjusted["quantity"] = adjusted["quantity"] * adjusted["split_adjustment"]
     adjusted["price"] = adjusted["price"] / adjusted["split_adjustment"].replace(0, 1.0)
     return adjusted
 
 
-def _lot_holding_start(lot: dict) -> pd.Timestamp:
-    return pd.Timestamp(lot.get("tax_date", lot["date"])).normalize()
-
-
-def _is_long_term_lot(lot: dict, sale_date: pd.Timestamp) -> bool:
-    sale_day = pd.Timestamp(sale_date).normalize()
-    return sale_day > _lot_holding_start(lot) + pd.DateOffset(years=1)
-
-
-def _lot_sale_priority(lot: dict, sale_date: pd.Timestamp, sale_price: float) -> tuple[int, float, pd.Timestamp]:
-    realized_gain_per_share = sale_price - float(lot["price"])
-    return (
-        0 if _is_long_term_lot(lot, sale_date) else 1,
-        realized_gain_per_share,
-        lot["date"],
-    )
-
-
-def _apply_wash_adjustment_to_existing_lots(
-    lots: list[dict],
-    sale_date: pd.Timestamp,
-    loss_qty: float,
-    loss_per_share: float,
-    sold_tax_date: pd.Timestamp,
-    eps: float,
-) -> float:
-    if loss_qty <= eps or loss_per_share <= eps:
-        return 0.0
-
-    remaining = loss_qty
-    window_start = pd.Timestamp(sale_date).normalize() - pd.Timedelta(days=30)
-    sale_day = pd.Timestamp(sale_date).normalize()
-    updated_lots = []
-
-    for lot in lots:
-        lot_day = pd.Timestamp(lot["date"]).normalize()
-        if (
-            remaining > eps
-            and lot["qty"] > eps
-            and window_start <= lot_day <= sale_day
-        ):
-            matched = min(remaining, lot["qty"])
-            adjusted_lot = lot.copy()
-            adjusted_lot["qty"] = matched
-            adjusted_lot["price"] = float(lot["price"]) + loss_per_share
-            adjusted_lot["tax_date"] = min(_lot_holding_start(lot), pd.Timestamp(sold_tax_date).normalize())
-            updated_lots.append(adjusted_lot)
-
-            leftover_qty = lot["qty"] - matched
-            if leftover_qty > eps:
-                remaining_lot = lot.copy()
-                remaining_lot["qty"] = leftover_qty
-                updated_lots.append(remaining_lot)
-
-            remaining -= matched
-            continue
-
-        updated_lots.append(lot)
-
-    lots[:] = updated_lots
-    return remaining
-
-
 def build_remaining_lot_book(trades: pd.DataFrame, symbols: list[str]) -> dict[str, list[dict]]:
-    lot_book = {sym: [] for sym in symbols}
-    pending_washes = {sym: [] for sym in symbols}
-    eps = SHARE_EPSILON
-    ordered_trades = (
-        trades.reset_index()
-        .rename(columns={"index": "_trade_order"})
-        .sort_values(["Run Date", "_trade_order"], kind="stable")
-    )
-
-    for _, row in ordered_trades.iterrows():
-        sym = row["symbol"]
-        trade_date = row["Run Date"]
-        qty = float(row["quantity"])
-        price = float(row["price"])
-
-        if sym not in lot_book or abs(qty) <= eps:
-            continue
-
-        pending_washes[sym] = [
-            pending
-            for pending in pending_washes[sym]
-            if pending["qty"] > eps and pd.Timestamp(trade_date).normalize() <= pending["expires"]
-        ]
-
-        if qty > 0:
-            remaining_qty = qty
-            buy_lots = []
-
-            for pending in pending_washes[sym]:
-                if remaining_qty <= eps:
-                    break
-
-                matched = min(remaining_qty, pending["qty"])
-                if matched <= eps:
-                    continue
-
-                buy_lots.append({
-                    "date": trade_date,
-                    "tax_date": min(pd.Timestamp(trade_date).normalize(), pending["tax_date"]),
-                    "qty": matched,
-                    "price": price + pending["loss_per_share"],
-                })
-                pending["qty"] -= matched
-                remaining_qty -= matched
-
-            if remaining_qty > eps:
-                buy_lots.append({
-                    "date": trade_date,
-                    "tax_date": pd.Timestamp(trade_date).normalize(),
-                    "qty": remaining_qty,
-                    "price": price,
-                })
-
-            lot_book[sym].extend(buy_lots)
-            pending_washes[sym] = [pending for pending in pending_washes[sym] if pending["qty"] > eps]
-            continue
-
-        sell_qty = -qty
-        lots = lot_book[sym]
-        prioritized_lots = sorted(
-            lots,
-            key=lambda lot: _lot_sale_priority(lot, trade_date, price),
-        )
-        sold_lots = []
-
-        for lot in prioritized_lots:
-            if sell_qty <= eps:
-                break
-            matched = min(sell_qty, lot["qty"])
-            lot["qty"] -= matched
-            sell_qty -= matched
-            sold_lots.append({
-                "qty": matched,
-                "price": float(lot["price"]),
-                "tax_date": _lot_holding_start(lot),
-            })
-
-        lot_book[sym] = [lot for lot in lots if lot["qty"] > eps]
-        lots = lot_book[sym]
-
-        for sold_lot in sold_lots:
-            if sold_lot["price"] <= price + eps:
-                continue
-
-            unmatched_loss_qty = _apply_wash_adjustment_to_existing_lots(
-                lots,
-                trade_date,
-                sold_lot["qty"],
-                sold_lot["price"] - price,
-                sold_lot["tax_date"],
-                eps,
-            )
-            if unmatched_loss_qty > eps:
-                pending_washes[sym].append({
-                    "expires": pd.Timestamp(trade_date).normalize() + pd.Timedelta(days=30),
-                    "loss_per_share": sold_lot["price"] - price,
-                    "qty": unmatched_loss_qty,
-                    "tax_date": sold_lot["tax_date"],
-                })
-
-    return lot_book
+    return build_lot_book(trades, symbols, SHARE_EPSILON)
 
 
 ACCOUNTS_FILE = BASE_DIR / "data" / "accounts.json"  # or just Path("accounts.json")
@@ -733,6 +609,32 @@ def _write_generated_accounts_index(index_path: Path, accounts_list: list[dict])
     os.replace(tmp_path, index_path)
 
 
+def _write_run_log(
+    run_dir: Path,
+    run_id: str,
+    started_at: datetime,
+    flags: list[str],
+    full_rebuild: bool,
+    timers: list[StageTimer],
+) -> None:
+    accounts = []
+    for timer in timers:
+        record = timer.to_dict()
+        profile_paths = timer.write_profile(run_dir / "profiles" / f"{run_id}_{timer.label}")
+        if profile_paths:
+            record["profile"] = [path.name for path in profile_paths]
+        accounts.append(record)
+
+    append_run_log(run_dir / RUN_LOG_FILE_NAME, {
+        "runId": run_id,
+        "startedAt": started_at.isoformat(),
+        "wallSeconds": round((datetime.now(timezone.utc) - started_at).total_seconds(), 4),
+        "flags": flags,
+        "fullRebuild": full_rebuild,
+        "accounts": accounts,
+    })
+
+
 def main():
     # ============================================================
     #  1. Configuration
@@ -752,9 +654,14 @@ def main():
 
     # You can override with command-line arguments like:
     # python analyze_portfolio.py REDACTED REDACTED
-    full_rebuild = len(sys.argv) == 1
-    if len(sys.argv) > 1:
-        account_ids = sys.argv[1:]
+    # Pass --quantstats to re-render every QuantStats HTML report regardless of age,
+    # and --profile to write a cProfile dump per account next to the run log.
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    account_ids = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    force_quantstats = "--quantstats" in flags
+    profile = "--profile" in flags
+    full_rebuild = not account_ids
+    if account_ids:
         accounts = [a for a in accounts if a["id"] in account_ids]
 
     out_dir = BASE_DIR / "out"
@@ -762,6 +669,10 @@ def main():
     index_path = out_dir / "accounts.json"
     accounts_list = _load_generated_accounts_index(index_path, full_rebuild)
     generated_any_accounts = False
+    run_dir = out_dir / RUN_LOG_DIR_NAME
+    run_started_at = datetime.now(timezone.utc)
+    run_id = run_started_at.strftime("%Y%m%dT%H%M%SZ")
+    timers = []
 
     # ============================================================
     #  Process each account
@@ -779,6 +690,9 @@ def main():
         print(f"Processing {account_id} → {report_name}")
         print(f"===============================")
 
+        timer = StageTimer(account_id, profile=profile)
+        timers.append(timer)
+        timer.begin("load")
         df = pd.read_csv(merged_csv)
         df = df[pd.to_datetime(df["Run Date"], errors="coerce").notna()].copy()
         df["Run Date"] = pd.to_datetime(df["Run Date"])
@@ -788,6 +702,7 @@ def main():
         #  2. Parse trades
         # ============================================================
 
+        timer.begin("parse_trades")
         trades, reinvestment_count, distribution_count = _build_position_trade_frame(df)
         if reinvestment_count:
             print(f"Detected {reinvestment_count} reinvestments.")
@@ -801,6 +716,7 @@ def main():
         # ============================================================
         #  3. Get daily prices from Polygon.io or cache
         # ============================================================
+        timer.begin("prices")
         start_date = df["Run Date"].min().normalize()
         end_date = pd.Timestamp(datetime.now().date()).normalize()
         all_symbols = list(dict.fromkeys([*symbols, BENCHMARK]))
@@ -813,12 +729,14 @@ def main():
         prices = all_prices.reindex(columns=symbols)
         if prices.empty:
             print(f"⚠️ No pricing data for {account_id}, skipping.")
+            timer.finish(skipped="no pricing data")
             continue
 
         # ============================================================
         #  4. Portfolio reconstruction and returns
         # ============================================================
 
+        timer.begin("reference_data")
         split_events_by_symbol = get_polygon_splits(
             symbols,
             fetch_start_date.strftime("%Y-%m-%d"),
@@ -832,6 +750,7 @@ def main():
         statement_cash_income = _statement_cash_income_series(df, prices.index)
         trades = _apply_future_split_adjustments(trades, split_events_by_symbol)
 
+        timer.begin("positions")
         position_df = pd.DataFrame(0.0, index=prices.index, columns=symbols)
         valid_trades = []
 
@@ -857,8 +776,10 @@ def main():
             valid_trades.append(row)
 
         trades = pd.DataFrame(valid_trades)
+        timer.begin("lot_book")
         lot_book = build_remaining_lot_book(trades, symbols)
 
+        timer.begin("returns")
         position_df = position_df.ffill().fillna(0)
         position_df[(position_df.abs() < SHARE_EPSILON)] = 0.0
         value_df = position_df * prices
@@ -867,36 +788,53 @@ def main():
         cash_income_returns = statement_cash_income.div(value_df.sum(axis=1).shift(1).replace(0, np.nan)).fillna(0)
         returns = (returns + cash_income_returns).fillna(0)
         returns = _apply_inception_day_return_override(returns, value_df, lot_book, prices)
+        trading_returns = returns
         returns = add_missing_zeros(returns)
 
         # ============================================================
         #  5. QuantStats report generation
         # ============================================================
 
+        timer.begin("quantstats")
         out_path = out_dir / f"report_{i}.html"
+        quantstats_path = out_dir / QUANTSTATS_CACHE_DIR_NAME / f"report_{i}_v{QUANTSTATS_CACHE_VERSION}.html"
+        quantstats_path.parent.mkdir(exist_ok=True)
 
         spy_df = all_prices[[BENCHMARK]]
         spy_returns = compute_total_return_returns(spy_df, benchmark_dividends)[BENCHMARK].fillna(0)
 
-        report_generated = _write_quantstats_report(
-            returns,
-            spy_returns,
-            out_path,
-            title=f"Portfolio Analysis - {report_name}",
-            rf=0.0396,
-            short_history_message=(
-                "Not enough return history is available for a full QuantStats report yet. "
-                "For newly opened portfolios, today's performance is estimated from trade basis when available, "
-                "and otherwise falls back to today's open."
-            ),
-        )
-
-        if report_generated:
-            print(f"✅ Report generated for {account_id}")
+        if not force_quantstats and _quantstats_report_is_fresh(
+            quantstats_path,
+            merged_csv,
+            QUANTSTATS_HTML_MAX_AGE_SECONDS,
+        ):
+            report_generated = True
+            print(f"✅ Reusing QuantStats report for {account_id}")
         else:
-            print(f"✅ Short-history report generated for {account_id}")
+            report_generated = _write_quantstats_report(
+                returns,
+                spy_returns,
+                quantstats_path,
+                title=f"Portfolio Analysis - {report_name}",
+                rf=RISK_FREE_RATE,
+                short_history_message=(
+                    "Not enough return history is available for a full QuantStats report yet. "
+                    "For newly opened portfolios, today's performance is estimated from trade basis when available, "
+                    "and otherwise falls back to today's open."
+                ),
+            )
+
+            if report_generated:
+                print(f"✅ Report generated for {account_id}")
+            else:
+                print(f"✅ Short-history report generated for {account_id}")
+        shutil.copyfile(quantstats_path, out_path)
+        if not report_generated:
+            # Short-history placeholders are cheap; retry the full report next run.
+            quantstats_path.unlink()
 
         # =====================  A) Prep series for charts  =====================
+        timer.begin("chart_payload")
         # Normalize both to midnight (no time component) for exact matching
         returns.index = pd.to_datetime(returns.index).normalize()
         spy_returns.index = pd.to_datetime(spy_returns.index).normalize()
@@ -924,7 +862,7 @@ def main():
         # Export a single dict for JSON-less inline embedding (we’ll embed arrays directly)
         def _series_to_pairs(s: pd.Series):
             s = s.dropna()
-            return [{"t": d.strftime("%Y-%m-%d"), "v": float(v)} for d, v in s.items()]
+            return [{"t": d, "v": v} for d, v in zip(iso_dates(s.index), s.astype(float).tolist())]
 
         def _frame_to_stacked_list(df: pd.DataFrame):
             out = []
@@ -934,7 +872,7 @@ def main():
                 s[s.abs() < SHARE_EPSILON] = None
                 if s.isna().all():
                     continue
-                pts = [{"t": d.strftime("%Y-%m-%d"), "v": (None if pd.isna(v) else float(v))} for d, v in s.items()]
+                pts = [{"t": d, "v": (None if v != v else v)} for d, v in zip(iso_dates(s.index), s.astype(float).tolist())]
                 out.append({"name": col, "points": pts})
             return out
 
@@ -958,12 +896,14 @@ def main():
                 "cumulative": _series_to_pairs(cum_alpha),
             },
             "weights": _frame_to_stacked_list(weights_top),
+            "metrics": report_metrics(trading_returns, spy_returns),
         }
 
         # ============================================================
         #  6. Write weights/trades CSVs + index
         # ============================================================
 
+        timer.begin("holdings")
         latest_date = weights.index[-1]
         current_weights = weights.loc[latest_date]
         current_weights = current_weights[current_weights.abs() > SHARE_EPSILON]
@@ -1011,6 +951,7 @@ def main():
             current_lot_basis.reindex(current_weights.index).get
         ).map(lambda x: "" if pd.isna(x) else f"{float(x):.10f}")
 
+        timer.begin("trade_sizes")
         portfolio_value = value_df.sum(axis=1)
         trades_pct = trades.copy()
         trade_values = []
@@ -1026,6 +967,7 @@ def main():
 
         trades_pct["Trade Size (% of Account)"] = [f"{round(x, 2)}%" for x in trade_values]
 
+        timer.begin("csv")
         weights_csv_path = out_dir / f"weights_{i}.csv"
         trades_csv_path = out_dir / f"trades_{i}.csv"
 
@@ -1057,6 +999,7 @@ def main():
         #  7. Append weights + trades to the QuantStats report
         # ============================================================
 
+        timer.begin("html_append")
         current_weights_df = current_weights_df.rename(columns={
             "Symbol": "Ticker",
             "Weight": "Portfolio Weight (%)"
@@ -1103,6 +1046,7 @@ def main():
         print(f"✅ Report modified: {out_path}")
 
         # =====================  B) Emit self-contained Plotly JSON =====================
+        timer.begin("json")
         interactive_json_path = out_dir / f"report_{i}_interactive.json"
         interactive_json_path.write_text(
             json.dumps(chart_payload, indent=2),
@@ -1110,8 +1054,18 @@ def main():
         )
         print(f"✅ Interactive JSON written: {interactive_json_path}")
 
+        timer.begin("compress")
+        for artifact_path in (out_path, weights_csv_path, trades_csv_path, interactive_json_path):
+            write_precompressed_siblings(artifact_path)
+        timer.finish()
+
     if generated_any_accounts:
         _write_generated_accounts_index(index_path, accounts_list)
 
+    if timers:
+        _write_run_log(run_dir, run_id, run_started_at, sorted(flags), full_rebuild, timers)
+        print(f"\nStage timings (wall seconds), run log: {run_dir / RUN_LOG_FILE_NAME}")
+        print(format_summary_table(timers))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,208 @@
+"""Parallel, cached figure rendering for QuantStats HTML reports.
+
+`qs.reports.html` draws its ~15 figures one after another in the calling
+process. `render_quantstats_report` lets QuantStats lay out the page with
+placeholders in place of the figures, then renders the figures in a process
+pool and caches each SVG under a hash of its inputs.
+"""
+import matplotlib
+
+matplotlib.use("Agg")
+
+import atexit
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from uuid import uuid4
+
+import pandas as pd
+import quantstats as qs
+
+from src.util import BASE_DIR
+
+
+FIGURE_CACHE_DIR = BASE_DIR / "out" / ".quantstats" / "figures"
+FIGURE_CACHE_MAX_AGE_SECONDS = int(os.environ.get("QUANTSTATS_FIGURE_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60)))
+QUANTSTATS_RENDER_WORKERS = int(os.environ.get("QUANTSTATS_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+FIGURE_FORMAT = "svg"
+# Bump when rendering changes so stale cached SVGs stop matching.
+FIGURE_CACHE_VERSION = 2
+# Fixed so SVG element ids depend only on the figure, not on the process that drew it.
+SVG_HASH_SALT = "quantstats-figures"
+
+# qs.reports looks its plots module up as a global, and qs.utils keeps a
+# process-wide prepared-returns cache; both are swapped under this lock.
+_record_lock = threading.Lock()
+_pool_lock = threading.Lock()
+_pool = None
+
+
+class _DeferredPlots:
+    """Stands in for quantstats.plots while qs.reports.html lays out a page."""
+
+    def __init__(self, plots_module):
+        self._plots = plots_module
+        self._token = uuid4().hex
+        self.calls = []
+
+    def __getattr__(self, name):
+        target = getattr(self._plots, name)
+        if not callable(target):
+            return target
+
+        def record(*args, savefig=None, **kwargs):
+            if not isinstance(savefig, dict) or savefig.get("format", FIGURE_FORMAT) != FIGURE_FORMAT:
+                return target(*args, savefig=savefig, **kwargs)
+            placeholder = f"<!-- quantstats-figure {self._token} {len(self.calls)} -->"
+            self.calls.append((name, args, kwargs, placeholder))
+            savefig["fname"].write(placeholder.encode("utf-8"))
+            return None
+
+        return record
+
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        digest.update(repr((type(value).__name__, getattr(value, "name", None), list(getattr(value, "columns", [])))).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}".encode("utf-8"))
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode("utf-8"))
+
+
+def _figure_cache_key(name: str, args: tuple, kwargs: dict) -> str:
+    digest = hashlib.sha256(
+        f"{FIGURE_CACHE_VERSION}|{qs.__version__}|{matplotlib.__version__}|{name}|{FIGURE_FORMAT}".encode("utf-8")
+    )
+    _update_digest(digest, args)
+    _update_digest(digest, sorted(kwargs.items()))
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def _empty_prepare_returns_cache():
+    # qs.utils keys prepared returns by values alone, so a plot can get back an
+    # equal series cached under another name (the metrics table's "benchmark")
+    # and label its line with it. An empty cache makes every figure independent
+    # of what the process drew before, in a pool worker or inline.
+    with _record_lock:
+        original = qs.utils._PREPARE_RETURNS_CACHE
+        qs.utils._PREPARE_RETURNS_CACHE = {}
+        try:
+            yield
+        finally:
+            qs.utils._PREPARE_RETURNS_CACHE = original
+
+
+def _render_figure(name: str, args: tuple, kwargs: dict) -> bytes:
+    stream = BytesIO()
+    savefig = {"fname": stream, "format": FIGURE_FORMAT, "metadata": {"Date": None}}
+    with _empty_prepare_returns_cache(), matplotlib.rc_context({"svg.hashsalt": SVG_HASH_SALT}):
+        getattr(qs.plots, name)(*args, savefig=savefig, **kwargs)
+    return stream.getvalue()
+
+
+def _render_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if QUANTSTATS_RENDER_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking the server's threads mid-flight.
+            _pool = ProcessPoolExecutor(
+                max_workers=QUANTSTATS_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_render_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_reset_render_pool)
+
+
+def _render_missing_figures(calls: list[tuple]) -> list[bytes]:
+    pool = _render_pool() if len(calls) > 1 else None
+    if pool is not None:
+        try:
+            futures = [pool.submit(_render_figure, name, args, kwargs) for name, args, kwargs, _ in calls]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            _reset_render_pool()
+    return [_render_figure(name, args, kwargs) for name, args, kwargs, _ in calls]
+
+
+def _write_cached_figure(path: Path, figure: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    tmp_path.write_bytes(figure)
+    os.replace(tmp_path, path)
+
+
+def _prune_figure_cache(cache_dir: Path, max_age_seconds: int):
+    cutoff = time.time() - max_age_seconds
+    for path in cache_dir.glob(f"*.{FIGURE_FORMAT}"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+
+
+def render_figures(calls: list[tuple], cache_dir: Path | None = None) -> list[str]:
+    """Render recorded plot calls, reusing cached SVGs for identical inputs."""
+    cache_dir = FIGURE_CACHE_DIR if cache_dir is None else cache_dir
+    figures = [None] * len(calls)
+    missing = []
+    for index, call in enumerate(calls):
+        path = cache_dir / f"{_figure_cache_key(*call[:3])}.{FIGURE_FORMAT}"
+        try:
+            figures[index] = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            missing.append((index, path, call))
+
+    rendered = _render_missing_figures([call for _, _, call in missing])
+    for (index, path, _), figure in zip(missing, rendered):
+        _write_cached_figure(path, figure)
+        figures[index] = figure
+
+    if missing:
+        _prune_figure_cache(cache_dir, FIGURE_CACHE_MAX_AGE_SECONDS)
+    return [figure.decode("utf-8") for figure in figures]
+
+
+def render_quantstats_report(returns, benchmark, output: Path, *, title: str, rf: float, cache_dir: Path | None = None):
+    """Drop-in for `qs.reports.html(..., output=output)` with parallel, cached figures."""
+    deferred = _DeferredPlots(qs.plots)
+    with _record_lock:
+        original_plots = qs.reports._plots
+        qs.reports._plots = deferred
+        try:
+            qs.reports.html(returns, rf=rf, benchmark=benchmark, output=output, title=title)
+        finally:
+            qs.reports._plots = original_plots
+
+    if not deferred.calls:
+        return
+    figures = render_figures(deferred.calls, cache_dir)
+    html = Path(output).read_text(encoding="utf-8")
+    for (_, _, _, placeholder), figure in zip(deferred.calls, figures):
+        html = html.replace(placeholder, figure, 1)
+    Path(output).write_text(html, encoding="utf-8")
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+TRADING_DAYS_PER_YEAR = 252
+RISK_FREE_RATE = 0.0396
+
+
+def summary_metrics(
+    returns: np.ndarray,
+    dates: pd.DatetimeIndex,
+    rf: float = RISK_FREE_RATE,
+) -> dict[str, np.ndarray]:
+    """Headline performance stats for each column of a (days x series) return matrix.
+
+    Leading and trailing NaNs mark series that start after `dates[0]` or end
+    before `dates[-1]`. Volatility, Sharpe, Sortino, and max drawdown follow the
+    QuantStats definitions. CAGR is measured over calendar years of 365 days
+    rather than row counts, so zero-filled non-trading days do not stretch the
+    period.
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    dates = pd.DatetimeIndex(dates)
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+
+    equity = np.cumprod(1.0 + filled, axis=0)
+    total_return = equity[-1] - 1.0 if len(equity) else np.full(returns.shape[1], np.nan)
+
+    first_valid = np.argmax(valid, axis=0)
+    last_valid = len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+    has_data = valid.any(axis=0)
+    day_numbers = dates.values.astype("datetime64[D]").astype(np.int64)
+    span_days = np.where(has_data, day_numbers[last_valid] - day_numbers[first_valid], 0) if len(dates) else np.zeros(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(span_days > 0, np.power(1.0 + total_return, 365.0 / span_days) - 1.0, np.nan)
+
+    daily_rf = np.power(1.0 + rf, 1.0 / TRADING_DAYS_PER_YEAR) - 1.0
+    excess = returns - daily_rf
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        # Series with fewer than two returns have no defined volatility; leave them NaN.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sharpe = (
+            np.nanmean(excess, axis=0)
+            / np.nanstd(excess, axis=0, ddof=1)
+            * np.sqrt(TRADING_DAYS_PER_YEAR)
+        )
+        downside = np.sqrt(
+            np.nansum(np.square(np.minimum(excess, 0.0)), axis=0) / valid.sum(axis=0)
+        )
+        sortino = np.nanmean(excess, axis=0) / downside * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    peaks = np.maximum.accumulate(equity, axis=0)
+    max_drawdown = (equity / peaks - 1.0).min(axis=0) if len(equity) else np.full(returns.shape[1], np.nan)
+
+    return {
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": max_drawdown,
+    }
+
+
+def _json_number(value) -> float | None:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _series_points(series: pd.Series) -> list[dict]:
+    series = series.dropna()
+    dates = series.index.strftime("%Y-%m-%d")
+    return [{"t": date, "v": float(value)} for date, value in zip(dates, series.to_numpy(dtype=float))]
+
+
+def drawdown_summary(returns: pd.Series) -> dict:
+    """Max, current, and longest drawdown of a daily return series.
+
+    Durations are calendar days from the peak to the recovery close, or to the
+    last date for a drawdown that has not recovered yet.
+    """
+    returns = pd.Series(returns, dtype=float).fillna(0.0)
+    if returns.empty:
+        return {"maxDrawdown": None, "maxDrawdownDate": None, "currentDrawdown": None, "longestDrawdownDays": 0}
+
+    equity = np.cumprod(1.0 + returns.to_numpy())
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    day_numbers = returns.index.values.astype("datetime64[D]").astype(np.int64)
+
+    underwater = np.concatenate(([False], drawdown < 0, [False])).astype(np.int8)
+    edges = np.diff(underwater)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    longest = 0
+    if len(starts):
+        # A drawdown starting on day 0 has no earlier peak; measure it from day 0.
+        peaks = day_numbers[np.maximum(starts - 1, 0)]
+        recoveries = day_numbers[np.minimum(ends, len(day_numbers) - 1)]
+        longest = int((recoveries - peaks).max())
+
+    trough = int(np.argmin(drawdown))
+    return {
+        "maxDrawdown": _json_number(drawdown[trough]),
+        "maxDrawdownDate": returns.index[trough].strftime("%Y-%m-%d"),
+        "currentDrawdown": _json_number(drawdown[-1]),
+        "longestDrawdownDays": longest,
+    }
+
+
+def rolling_beta(returns: pd.Series, benchmark: pd.Series, window: int) -> pd.Series:
+    returns = pd.Series(returns, dtype=float)
+    benchmark = pd.Series(benchmark, dtype=float)
+    variance = benchmark.rolling(window).var()
+    return returns.rolling(window).cov(benchmark).div(variance.where(variance > 0))
+
+
+def monthly_returns_table(returns: pd.Series) -> list[dict]:
+    """Compounded returns per calendar month, one row per year with its full-year total."""
+    returns = pd.Series(returns, dtype=float).dropna()
+    if returns.empty:
+        return []
+
+    growth = np.log1p(returns)
+    monthly = np.expm1(growth.groupby([returns.index.year, returns.index.month]).sum())
+    yearly = np.expm1(growth.groupby(returns.index.year).sum())
+    table = monthly.unstack().reindex(columns=range(1, 13))
+    return [
+        {
+            "year": int(year),
+            "months": [_json_number(value) if pd.notna(value) else None for value in row],
+            "total": _json_number(yearly.loc[year]),
+        }
+        for year, row in zip(table.index, table.to_numpy())
+    ]
+
+
+def _series_stats(returns: pd.Series, rf: float) -> dict:
+    stats = summary_metrics(returns.to_numpy(dtype=float), returns.index, rf=rf)
+    return {
+        "totalReturn": _json_number(stats["total_return"][0]),
+        "cagr": _json_number(stats["cagr"][0]),
+        "volatility": _json_number(stats["volatility"][0]),
+        "sharpe": _json_number(stats["sharpe"][0]),
+        "sortino": _json_number(stats["sortino"][0]),
+        **drawdown_summary(returns),
+    }
+
+
+def performance_summary(
+    returns: pd.Series,
+    benchmark: pd.Series,
+    rf: float = RISK_FREE_RATE,
+) -> dict:
+    """Headline stats for the interactive report JSON, computed without QuantStats.
+
+    `returns` and `benchmark` are daily returns on the same index.
+    """
+    returns = pd.Series(returns, dtype=float)
+    benchmark = pd.Series(benchmark, dtype=float).reindex(returns.index)
+    aligned = pd.concat([returns, benchmark], axis=1).dropna().to_numpy()
+
+    beta = alpha = None
+    if len(aligned) > 1:
+        covariance = np.cov(aligned[:, 0], aligned[:, 1])
+        if covariance[1, 1] > 0:
+            beta = float(covariance[0, 1] / covariance[1, 1])
+            alpha = float(np.mean(aligned[:, 0] - beta * aligned[:, 1]) * TRADING_DAYS_PER_YEAR)
+
+    return {
+        "rf": rf,
+        "portfolio": _series_stats(returns, rf),
+        "benchmark": _series_stats(benchmark.fillna(0.0), rf),
+        "beta": beta,
+        "alpha": alpha,
+        "rollingBeta": {
+            "6m": _series_points(rolling_beta(returns, benchmark, TRADING_DAYS_PER_YEAR // 2)),
+            "12m": _series_points(rolling_beta(returns, benchmark, TRADING_DAYS_PER_YEAR)),
+        },
+        "monthlyReturns": monthly_returns_table(returns),
+    }
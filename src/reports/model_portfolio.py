@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+import os
 import re
+import time
 from datetime import datetime
 from pathlib import Path
 from uuid import uuid4
 
+import numpy as np
 import pandas as pd
 import quantstats as qs
 
@@ -14,14 +18,25 @@ from src.reports.analyze_fidelity import (
     SHARE_EPSILON,
     _regression_beta,
     add_missing_zeros,
+    report_metrics,
 )
+from src.reports.figures import render_quantstats_report
+from src.reports.metrics import RISK_FREE_RATE, summary_metrics
 from src.reports.polygon import compute_total_return_returns, get_polygon_dividends, get_polygon_prices
+from src.reports.trading_calendar import iso_dates
+from src.precompressed import write_precompressed_siblings
 from src.tools import ToolDataError, estimate_market_cap_weights, normalize_tickers
 from src.util import BASE_DIR
 
 qs.extend_pandas()
 
 OUT_DIR = BASE_DIR / "out"
+TOOL_DIR_NAME = "tool-model-portfolios"
+# Bump when report generation changes so stale cached artifacts stop matching.
+RESULT_CACHE_VERSION = 3
+TOOL_CACHE_MAX_BYTES = int(os.environ.get("MODEL_PORTFOLIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+TOOL_CACHE_MAX_AGE_SECONDS = int(os.environ.get("MODEL_PORTFOLIO_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60)))
+MAX_SWEEP_VARIANTS = int(os.environ.get("MODEL_PORTFOLIO_MAX_SWEEP_VARIANTS", "200"))
 
 
 def _to_float(value) -> float | None:
@@ -481,6 +496,150 @@ def _rebalance_close_flags(index: pd.Index, rebalance_period: str) -> pd.Series:
     return flags.fillna(True).astype(bool)
 
 
+def _simulate_rebalanced_values(
+    asset_returns: np.ndarray,
+    basis: np.ndarray,
+    rebalance_flags: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Close-of-day holding values, close totals, and daily basket returns.
+
+    Between rebalances each holding just compounds, so every segment is one
+    cumprod seeded with the segment's opening values; rebalance closes reset the
+    holdings to `basis` scaled by the drifted total. The multiplication order is
+    the same as stepping day by day, so results match a per-day loop bit for bit.
+    Daily rebalancing carries nothing between closes but the total, so only that
+    scalar is stepped, in a scratch row, and the holdings are filled in at the end.
+    """
+    row_count = len(asset_returns)
+    values = np.empty((row_count, len(basis)), dtype=float)
+    if row_count == 0:
+        return values, np.empty(0, dtype=float), np.empty(0, dtype=float)
+
+    if rebalance_flags.all():
+        # Each close holds `basis * pre_rebalance_total`. `growth @ basis` would skip
+        # the loop but rounds differently, so the per-day products are kept.
+        pre_rebalance_totals = np.empty(row_count, dtype=float)
+        pre_rebalance_totals[0] = basis.sum()
+        holdings = np.empty(len(basis), dtype=float)
+        growth = np.empty(len(basis), dtype=float)
+        for row in range(1, row_count):
+            np.add(asset_returns[row], 1.0, out=growth)
+            np.multiply(basis, pre_rebalance_totals[row - 1], out=holdings)
+            holdings *= growth
+            pre_rebalance_totals[row] = holdings.sum()
+        np.multiply(pre_rebalance_totals[:, None], basis, out=values)
+    else:
+        growth = 1.0 + asset_returns
+        pre_rebalance_totals = np.empty(row_count, dtype=float)
+        values[0] = basis
+        pre_rebalance_totals[0] = basis.sum()
+        if rebalance_flags[0]:
+            values[0] = basis * pre_rebalance_totals[0]
+
+        segment_start = 0
+        for segment_end in [*(np.flatnonzero(rebalance_flags[1:]) + 1), row_count - 1]:
+            if segment_end <= segment_start:
+                continue
+            if segment_end == segment_start + 1:
+                np.multiply(values[segment_start], growth[segment_end], out=values[segment_end])
+            else:
+                segment = values[segment_start:segment_end + 1]
+                segment[1:] = growth[segment_start + 1:segment_end + 1]
+                np.multiply.accumulate(segment, axis=0, out=segment)
+            if rebalance_flags[segment_end]:
+                pre_rebalance_totals[segment_end] = values[segment_end].sum()
+                values[segment_end] = basis * pre_rebalance_totals[segment_end]
+            segment_start = segment_end
+
+    close_totals = values.sum(axis=1)
+    pre_rebalance_totals = np.where(rebalance_flags, pre_rebalance_totals, close_totals)
+    daily_returns = np.zeros(row_count, dtype=float)
+    previous_totals = close_totals[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_returns[1:] = np.where(
+            previous_totals == 0,
+            0.0,
+            pre_rebalance_totals[1:] / previous_totals - 1.0,
+        )
+    return values, close_totals, daily_returns
+
+
+def _simulate_basket_returns_batch(
+    asset_returns: np.ndarray,
+    basis_matrix: np.ndarray,
+    rebalance_flags: np.ndarray,
+) -> np.ndarray:
+    """Daily returns for many weight sets that share one return matrix and rebalance schedule.
+
+    `basis_matrix` is (symbols x weight sets). Within a segment every weight set
+    holds `basis * scale * cumulative growth`, so one segmented cumprod and one
+    matrix product cover all of them; only the per-segment scale is chained.
+    Agrees with `_simulate_rebalanced_values` to floating-point rounding.
+    """
+    row_count = len(asset_returns)
+    set_count = basis_matrix.shape[1]
+    daily_returns = np.zeros((row_count, set_count), dtype=float)
+    if row_count == 0:
+        return daily_returns
+
+    basis_totals = basis_matrix.sum(axis=0)
+    segment_growth = 1.0 + asset_returns
+    segment_growth[0] = 1.0
+    boundaries = np.flatnonzero(rebalance_flags[1:]) + 1
+    segment_start = 0
+    for segment_end in [*boundaries, row_count - 1]:
+        if segment_end - segment_start > 1:
+            segment = segment_growth[segment_start + 1:segment_end + 1]
+            np.multiply.accumulate(segment, axis=0, out=segment)
+        segment_start = segment_end
+    relative_totals = segment_growth @ basis_matrix
+
+    # Row t >= 1 belongs to the segment opened by the last rebalance close before it.
+    segment_ids = np.zeros(row_count, dtype=int)
+    segment_ids[1:] = np.cumsum(rebalance_flags[:-1])
+    segment_ids[1:] -= int(rebalance_flags[0])
+    opening_scale = basis_totals if rebalance_flags[0] else np.ones(set_count)
+    scales = np.vstack([opening_scale, opening_scale * np.cumprod(relative_totals[boundaries], axis=0)])
+
+    pre_rebalance_totals = scales[segment_ids] * relative_totals
+    pre_rebalance_totals[0] = basis_totals
+    close_totals = np.where(rebalance_flags[:, None], pre_rebalance_totals * basis_totals, pre_rebalance_totals)
+    close_totals[0] = opening_scale * basis_totals
+
+    previous_totals = close_totals[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_returns[1:] = np.where(previous_totals == 0, 0.0, pre_rebalance_totals[1:] / previous_totals - 1.0)
+    return daily_returns
+
+
+def _aligned_matrix(frame: pd.DataFrame, row_positions: np.ndarray, columns: list[str], fill_value: float) -> np.ndarray:
+    """`frame` rows at `row_positions` (-1 = missing) and `columns` as a fresh float matrix, gaps set to `fill_value`."""
+    column_positions = frame.columns.get_indexer(columns)
+    rows_found = row_positions >= 0
+    columns_found = column_positions >= 0
+    source = frame.to_numpy(dtype=float)
+    if rows_found.all() and columns_found.all():
+        # Rows are usually one contiguous run; slicing them is far cheaper than a 2-D gather.
+        if len(row_positions) and (np.diff(row_positions) == 1).all():
+            return source[row_positions[0]:row_positions[-1] + 1].take(column_positions, axis=1)
+        return source.take(row_positions, axis=0).take(column_positions, axis=1)
+    matrix = np.full((len(row_positions), len(columns)), fill_value, dtype=float)
+    matrix[np.ix_(rows_found, columns_found)] = source[np.ix_(row_positions[rows_found], column_positions[columns_found])]
+    return matrix
+
+
+def _forward_filled(matrix: np.ndarray) -> tuple[np.ndarray, int]:
+    """`matrix` forward-filled down each column, and the first row with no NaN left."""
+    missing = np.isnan(matrix)
+    if not missing.any():
+        return matrix, 0
+    seen = ~missing
+    first_complete = int(seen.argmax(axis=0).max()) if seen.any(axis=0).all() else len(matrix)
+    last_valid = np.where(missing, 0, np.arange(len(matrix))[:, None])
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return matrix[last_valid, np.arange(matrix.shape[1])], first_complete
+
+
 def _build_buy_and_hold_basket(
     prices: pd.DataFrame,
     holdings: list[dict],
@@ -489,56 +648,35 @@ def _build_buy_and_hold_basket(
     rebalance_period: str = "none",
 ) -> dict:
     symbols = [holding["ticker"] for holding in holdings]
-    basket_prices = prices.reindex(columns=symbols)
-    basket_prices = basket_prices[basket_prices.index >= start_date].copy()
-    basket_prices = basket_prices.ffill().dropna(subset=symbols, how="any")
-    if basket_prices.empty:
+    # Same result as reindex/ffill/dropna/reindex/fillna on the frames, but done
+    # once on the raw matrices; the pandas chain copied the full basket five times.
+    price_matrix = _aligned_matrix(prices, np.flatnonzero(prices.index >= start_date), symbols, np.nan)
+    price_matrix, first_complete = _forward_filled(price_matrix)
+    price_matrix = price_matrix[first_complete:]
+    if not len(price_matrix):
         raise ToolDataError("No price history was found after the effective start date", 400)
 
+    index = prices.index[prices.index >= start_date][first_complete:]
+    basket_prices = pd.DataFrame(price_matrix, index=index, columns=symbols)
     entry_prices = basket_prices.loc[start_date, symbols].astype(float)
-    basket_asset_returns = (
-        asset_total_returns
-        .reindex(index=basket_prices.index, columns=symbols)
-        .fillna(0.0)
-        .astype(float)
-    )
-    if len(basket_asset_returns.index):
-        basket_asset_returns.iloc[0] = 0.0
+    return_matrix = _aligned_matrix(asset_total_returns, asset_total_returns.index.get_indexer(index), symbols, 0.0)
+    np.copyto(return_matrix, 0.0, where=np.isnan(return_matrix))
+    return_matrix[0] = 0.0
+    basket_asset_returns = pd.DataFrame(return_matrix, index=index, columns=symbols)
 
     basis = pd.Series({holding["ticker"]: float(holding["weight"]) for holding in holdings}, dtype=float)
-    rebalance_flags = _rebalance_close_flags(basket_asset_returns.index, rebalance_period)
-    current_values = basis.copy()
-    previous_total = float(current_values.sum())
-    value_rows = []
-    weight_rows = []
-    return_rows = []
-
-    for idx, date in enumerate(basket_asset_returns.index):
-        if idx > 0:
-            current_values = current_values * (1.0 + basket_asset_returns.loc[date])
-            pre_rebalance_total = float(current_values.sum())
-            daily_return = 0.0 if previous_total == 0 else pre_rebalance_total / previous_total - 1.0
-        else:
-            pre_rebalance_total = previous_total
-            daily_return = 0.0
-
-        if bool(rebalance_flags.loc[date]):
-            current_values = basis * pre_rebalance_total
-
-        close_total = float(current_values.sum())
-        close_weights = (
-            current_values / close_total
-            if close_total
-            else pd.Series(0.0, index=symbols, dtype=float)
-        )
-        value_rows.append(current_values.copy())
-        weight_rows.append(close_weights)
-        return_rows.append(daily_return)
-        previous_total = close_total
+    rebalance_flags = _rebalance_close_flags(index, rebalance_period)
+    values, close_totals, daily_returns = _simulate_rebalanced_values(
+        return_matrix,
+        basis.to_numpy(dtype=float),
+        rebalance_flags.to_numpy(dtype=bool),
+    )
+    weights = np.zeros_like(values)
+    np.divide(values, close_totals[:, None], out=weights, where=close_totals[:, None] != 0)
 
-    value_df = pd.DataFrame(value_rows, index=basket_asset_returns.index, columns=symbols, dtype=float)
-    weights_df = pd.DataFrame(weight_rows, index=basket_asset_returns.index, columns=symbols, dtype=float)
-    returns = pd.Series(return_rows, index=basket_asset_returns.index, dtype=float)
+    value_df = pd.DataFrame(values, index=index, columns=symbols, dtype=float)
+    weights_df = pd.DataFrame(weights, index=index, columns=symbols, dtype=float)
+    returns = pd.Series(daily_returns, index=index, dtype=float)
 
     return {
         "symbols": symbols,
@@ -608,7 +746,7 @@ def _build_weight_history_basket(
 
 def _series_to_pairs(series: pd.Series) -> list[dict]:
     series = series.dropna()
-    return [{"t": date.strftime("%Y-%m-%d"), "v": float(value)} for date, value in series.items()]
+    return [{"t": date, "v": value} for date, value in zip(iso_dates(series.index), series.astype(float).tolist())]
 
 
 def _frame_to_stacked_list(frame: pd.DataFrame) -> list[dict]:
@@ -622,11 +760,9 @@ def _frame_to_stacked_list(frame: pd.DataFrame) -> list[dict]:
             {
                 "name": column,
                 "points": [
-                    {
-                        "t": date.strftime("%Y-%m-%d"),
-                        "v": (None if pd.isna(value) else float(value)),
-                    }
-                    for date, value in series.items()
+                    # NaN != NaN marks the zeroed-out weights.
+                    {"t": date, "v": (None if value != value else value)}
+                    for date, value in zip(iso_dates(series.index), series.astype(float).tolist())
                 ],
             }
         )
@@ -645,6 +781,8 @@ def _build_chart_payload(
     portfolio_rebalance_period: str,
     benchmark_rebalance_period: str,
 ) -> dict:
+    # Stats use the trading-day series; the charts below use the zero-filled session calendar.
+    metrics = report_metrics(portfolio_returns, benchmark_returns)
     portfolio_returns = add_missing_zeros(portfolio_returns)
     benchmark_returns = add_missing_zeros(benchmark_returns).reindex(portfolio_returns.index, fill_value=0.0)
 
@@ -700,6 +838,7 @@ def _build_chart_payload(
             "cumulative": _series_to_pairs(cumulative_alpha),
         },
         "weights": _frame_to_stacked_list(normalized_weights),
+        "metrics": metrics,
     }
 
 
@@ -818,9 +957,121 @@ def _slug_token(value: str) -> str:
     return token or "MODEL_PORTFOLIO"
 
 
+def _cache_key_value(value):
+    if isinstance(value, pd.DataFrame):
+        return {
+            "index": [_format_date(item) for item in value.index],
+            "columns": [str(column) for column in value.columns],
+            "values": [[_cache_key_value(item) for item in row] for row in value.itertuples(index=False)],
+        }
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, dict):
+        return {str(key): _cache_key_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_cache_key_value(item) for item in value]
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, 12)
+    if hasattr(value, "item"):
+        return _cache_key_value(value.item())
+    return value
+
+
+def _result_cache_key(request: dict) -> str:
+    encoded = json.dumps(_cache_key_value(request), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _result_manifest_path(tool_dir: Path, cache_key: str) -> Path:
+    return tool_dir / f"result_{cache_key[:32]}.json"
+
+
+def _load_cached_result(tool_dir: Path, cache_key: str) -> dict | None:
+    manifest_path = _result_manifest_path(tool_dir, cache_key)
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("key") != cache_key:
+        return None
+    if not all((tool_dir / name).exists() for name in manifest.get("files", [])):
+        return None
+    # The manifest mtime doubles as the last-used time for eviction.
+    os.utime(manifest_path)
+    return manifest.get("result")
+
+
+def _save_cached_result(tool_dir: Path, cache_key: str, files: list[Path], result: dict):
+    manifest_path = _result_manifest_path(tool_dir, cache_key)
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    tmp_path.write_text(
+        json.dumps({"key": cache_key, "files": [path.name for path in files], "result": result}),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, manifest_path)
+
+
+def _evict_tool_artifacts(
+    tool_dir: Path,
+    max_bytes: int | None = None,
+    max_age_seconds: int | None = None,
+    keep: set[str] | None = None,
+) -> list[str]:
+    """Drop cached reports that are too old or push the directory over its size budget.
+
+    Each manifest and the artifacts it lists are evicted together, least recently
+    used first. Files no manifest claims are only removed once they exceed the age limit.
+    """
+    max_bytes = TOOL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age_seconds = TOOL_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    keep = keep or set()
+    files = {path.name: path.stat() for path in tool_dir.iterdir() if path.is_file()}
+
+    groups = []
+    claimed = set()
+    for name in sorted(files):
+        if not (name.startswith("result_") and name.endswith(".json")):
+            continue
+        try:
+            listed = json.loads((tool_dir / name).read_text(encoding="utf-8")).get("files", [])
+        except (OSError, ValueError):
+            listed = []
+        members = [name] + [
+            candidate
+            for listed_name in listed
+            for candidate in (listed_name, f"{listed_name}.gz", f"{listed_name}.br")
+            if candidate in files
+        ]
+        claimed.update(members)
+        groups.append((files[name].st_mtime, members))
+    for name in files:
+        if name not in claimed:
+            groups.append((files[name].st_mtime, [name]))
+
+    now = time.time()
+    total_bytes = sum(stat.st_size for stat in files.values())
+    evicted = []
+    for last_used, members in sorted(groups):
+        if any(name in keep for name in members):
+            continue
+        expired = now - last_used > max_age_seconds
+        is_manifest_group = members[0].startswith("result_")
+        if not expired and (total_bytes <= max_bytes or not is_manifest_group):
+            continue
+        for name in members:
+            try:
+                (tool_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            total_bytes -= files[name].st_size
+            evicted.append(name)
+    return evicted
+
+
 def create_model_portfolio_report(
     body: dict,
     out_dir: Path = OUT_DIR,
+    progress=None,
 ) -> dict:
     report_name = str(body.get("reportName") or "Model Portfolio").strip() or "Model Portfolio"
     requested_start_date = _parse_date(body.get("startDate"), "Start date")
@@ -852,11 +1103,33 @@ def create_model_portfolio_report(
     )
     benchmark_symbols = benchmark_config["symbols"]
 
+    tool_dir = out_dir / TOOL_DIR_NAME
+    cache_key = _result_cache_key({
+        "version": RESULT_CACHE_VERSION,
+        "reportName": report_name,
+        "requestedStartDate": requested_start_date,
+        "requestedEndDate": requested_end_date,
+        "portfolioHistoryWindow": portfolio_history_window,
+        "portfolioWeightHistory": portfolio_weight_history,
+        "portfolioHoldings": portfolio_holdings,
+        "portfolioWeightingMode": portfolio_weighting_mode,
+        "portfolioRebalancePeriod": portfolio_rebalance_period,
+        "benchmark": benchmark_config,
+        "benchmarkRebalancePeriod": benchmark_rebalance_period,
+        # Prices through today can still change, so results only match within a day.
+        "dataAsOf": _today_date(),
+    })
+    cached_result = _load_cached_result(tool_dir, cache_key)
+    if cached_result is not None:
+        return cached_result
+
     symbols = list(
         dict.fromkeys(
             portfolio_symbols + benchmark_symbols
         )
     )
+    if progress is not None:
+        progress("fetching_prices", f"Fetching prices for {len(symbols)} symbols")
     prices = _price_matrix(symbols, requested_start_date, requested_end_date)
     effective_start_date = _first_common_start_date(prices, symbols, requested_start_date)
     effective_end_date = _last_common_end_date(prices, symbols, requested_end_date)
@@ -918,6 +1191,8 @@ def create_model_portfolio_report(
         working_prices.index.min().strftime("%Y-%m-%d"),
         effective_end_date.strftime("%Y-%m-%d"),
     )
+    if progress is not None:
+        progress("computing", "Building portfolio and benchmark returns")
     asset_total_returns = compute_total_return_returns(working_prices, dividends)
 
     if portfolio_weight_history is not None:
@@ -963,10 +1238,9 @@ def create_model_portfolio_report(
     portfolio_returns = portfolio_basket["returns"]
     benchmark_returns = benchmark_basket["returns"]
 
-    tool_dir = out_dir / "tool-model-portfolios"
     tool_dir.mkdir(parents=True, exist_ok=True)
     slug = _slug_token(report_name)
-    file_slug = f"{slug.lower()}_{uuid4().hex[:10]}"
+    file_slug = f"{slug.lower()}_{cache_key[:10]}"
     report_path = tool_dir / f"report_{file_slug}.html"
     interactive_json_path = tool_dir / f"report_{file_slug}_interactive.json"
     weights_csv_path = tool_dir / f"weights_{file_slug}.csv"
@@ -979,12 +1253,14 @@ def create_model_portfolio_report(
         fill_value=0.0,
     ).rename(benchmark_config["label"])
     benchmark_series.index.name = None
-    qs.reports.html(
+    if progress is not None:
+        progress("rendering", "Rendering report")
+    render_quantstats_report(
         portfolio_series,
-        rf=0.0396,
-        benchmark=benchmark_series,
-        output=report_path,
+        benchmark_series,
+        report_path,
         title=f"Portfolio Analysis - {report_name}",
+        rf=RISK_FREE_RATE,
     )
 
     current_weights_df = _current_weights_frame(portfolio_basket)
@@ -1015,6 +1291,8 @@ def create_model_portfolio_report(
         benchmark_rebalance_period,
     )
     interactive_json_path.write_text(json.dumps(chart_payload, indent=2), encoding="utf-8")
+    for artifact_path in (report_path, weights_csv_path, trades_csv_path, interactive_json_path):
+        write_precompressed_siblings(artifact_path)
 
     viewer_account = {
         "id": f"TOOL_MODEL_{uuid4().hex[:12].upper()}",
@@ -1053,7 +1331,7 @@ def create_model_portfolio_report(
         requested_end_date,
     )
 
-    return {
+    result = {
         "account": viewer_account,
         "effectiveStartDate": effective_start_date.strftime("%Y-%m-%d"),
         "effectiveEndDate": effective_end_date.strftime("%Y-%m-%d"),
@@ -1062,3 +1340,152 @@ def create_model_portfolio_report(
         "rangeInfo": range_info,
         "warnings": warnings,
     }
+    _save_cached_result(
+        tool_dir,
+        cache_key,
+        [report_path, interactive_json_path, weights_csv_path, trades_csv_path],
+        result,
+    )
+    _evict_tool_artifacts(tool_dir, keep={_result_manifest_path(tool_dir, cache_key).name})
+    return result
+
+
+def _sweep_weight_sets(body: dict) -> list[dict]:
+    raw_sets = body.get("weightSets")
+    if not isinstance(raw_sets, list) or not raw_sets:
+        raw_sets = [{"label": "Base", "holdings": body.get("holdings")}]
+
+    weight_sets = []
+    for index, raw_set in enumerate(raw_sets, start=1):
+        raw_set = raw_set if isinstance(raw_set, dict) else {}
+        label = str(raw_set.get("label") or f"Weights {index}").strip() or f"Weights {index}"
+        weight_sets.append({
+            "label": label,
+            "holdings": _normalize_weighted_holdings(raw_set.get("holdings"), f"{label} portfolio"),
+        })
+    return weight_sets
+
+
+def _sweep_values(values, fallback) -> list:
+    values = values if isinstance(values, list) and values else [fallback]
+    return list(dict.fromkeys(values))
+
+
+def _metric_value(value: float) -> float | None:
+    return None if value is None or not math.isfinite(value) else round(float(value), 6)
+
+
+def create_model_portfolio_sweep(body: dict, progress=None) -> dict:
+    """Compare many variants of one basket without rendering a report for each.
+
+    The grid is every combination of `weightSets`, `rebalancePeriods`, and
+    `startDates`. Prices and dividends are loaded once for the union of symbols.
+    Each weight set is clipped to the dates its own holdings cover, as a single
+    report would be, and weight sets sharing a window and rebalance period are
+    simulated together.
+    """
+    weight_sets = _sweep_weight_sets(body)
+    rebalance_periods = [
+        _rebalance_period(value, fallback="")
+        for value in _sweep_values(body.get("rebalancePeriods"), body.get("portfolioRebalancePeriod") or "none")
+    ]
+    if "" in rebalance_periods:
+        raise ToolDataError("Rebalance periods must be none, daily, weekly, monthly, or quarterly", 400)
+    start_dates = sorted({
+        _parse_date(value, "Start date")
+        for value in _sweep_values(body.get("startDates"), body.get("startDate"))
+    })
+    requested_end_date = _parse_date(body.get("endDate") or _today_date().strftime("%Y-%m-%d"), "End date")
+    if requested_end_date < start_dates[0]:
+        raise ToolDataError("End date must be on or after the start date", 400)
+    variant_count = len(weight_sets) * len(rebalance_periods) * len(start_dates)
+    if variant_count > MAX_SWEEP_VARIANTS:
+        raise ToolDataError(f"Parameter sweeps are limited to {MAX_SWEEP_VARIANTS} variants per request", 400)
+
+    symbols = list(dict.fromkeys(
+        holding["ticker"]
+        for weight_set in weight_sets
+        for holding in weight_set["holdings"]
+    ))
+    if progress is not None:
+        progress("fetching_prices", f"Fetching prices for {len(symbols)} symbols")
+    prices = _price_matrix(symbols, start_dates[0], requested_end_date)
+    set_symbols = [[holding["ticker"] for holding in weight_set["holdings"]] for weight_set in weight_sets]
+    set_end_dates = [_last_common_end_date(prices, tickers, requested_end_date) for tickers in set_symbols]
+    effective_end_date = max(set_end_dates)
+    working_prices = prices[prices.index <= effective_end_date].ffill()
+    dividends = get_polygon_dividends(
+        symbols,
+        working_prices.index.min().strftime("%Y-%m-%d"),
+        effective_end_date.strftime("%Y-%m-%d"),
+    )
+    asset_total_returns = (
+        compute_total_return_returns(working_prices, dividends)
+        .reindex(index=working_prices.index, columns=symbols)
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+    basis_matrix = np.array(
+        [
+            [next((holding["weight"] for holding in weight_set["holdings"] if holding["ticker"] == symbol), 0.0)
+             for weight_set in weight_sets]
+            for symbol in symbols
+        ],
+        dtype=float,
+    )
+
+    if progress is not None:
+        progress("simulating", f"Simulating {variant_count} variants")
+    variants = []
+    return_columns = []
+    for start_date in start_dates:
+        windows = {}
+        for set_index, tickers in enumerate(set_symbols):
+            effective_start_date = _first_common_start_date(prices, tickers, start_date)
+            if set_end_dates[set_index] < effective_start_date:
+                raise ToolDataError("No common date range was found between the selected start and end dates", 400)
+            windows.setdefault((effective_start_date, set_end_dates[set_index]), []).append(set_index)
+
+        for rebalance_period in rebalance_periods:
+            columns = [None] * len(weight_sets)
+            for (window_start, window_end), set_indexes in windows.items():
+                first_row = int(working_prices.index.searchsorted(window_start))
+                end_row = int(working_prices.index.searchsorted(window_end, side="right"))
+                window_returns = asset_total_returns[first_row:end_row].copy()
+                window_returns[0] = 0.0
+                flags = _rebalance_close_flags(working_prices.index[first_row:end_row], rebalance_period)
+                daily_returns = _simulate_basket_returns_batch(
+                    window_returns,
+                    basis_matrix[:, set_indexes],
+                    flags.to_numpy(dtype=bool),
+                )
+                for position, set_index in enumerate(set_indexes):
+                    column = np.full(len(working_prices.index), np.nan)
+                    column[first_row:end_row] = daily_returns[:, position]
+                    columns[set_index] = (column, window_start, window_end)
+            for weight_set, (column, window_start, window_end) in zip(weight_sets, columns):
+                return_columns.append(column)
+                variants.append({
+                    "weightSet": weight_set["label"],
+                    "rebalancePeriod": rebalance_period,
+                    "startDate": start_date.strftime("%Y-%m-%d"),
+                    "effectiveStartDate": window_start.strftime("%Y-%m-%d"),
+                    "effectiveEndDate": window_end.strftime("%Y-%m-%d"),
+                })
+
+    metrics = summary_metrics(np.column_stack(return_columns), working_prices.index)
+    for index, variant in enumerate(variants):
+        variant.update({
+            "totalReturn": _metric_value(metrics["total_return"][index]),
+            "cagr": _metric_value(metrics["cagr"][index]),
+            "volatility": _metric_value(metrics["volatility"][index]),
+            "sharpe": _metric_value(metrics["sharpe"][index]),
+            "sortino": _metric_value(metrics["sortino"][index]),
+            "maxDrawdown": _metric_value(metrics["max_drawdown"][index]),
+        })
+
+    return {
+        "effectiveEndDate": effective_end_date.strftime("%Y-%m-%d"),
+        "weightSets": weight_sets,
+        "variants": variants,
+    }
@@ -1,16 +1,20 @@
 import json
 import os
+import time
 
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytz
 import requests
 
+from src import telemetry
 from src.util import BASE_DIR
 from src.yfinance_cache import YFINANCE_CACHE_DIR, YFINANCE_HISTORY_CACHE_DIR, yf
 
 ET = pytz.timezone("America/New_York")
+POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
 BASE_CACHE_DIR = BASE_DIR / "data" / ".cache"
 CACHE_DIR = BASE_CACHE_DIR / "polygon"
 REFERENCE_CACHE_DIR = BASE_CACHE_DIR / "polygon-reference"
@@ -148,6 +152,17 @@ def _split_adjusted_close(history: pd.DataFrame):
     return close / future_splits
 
 
+def _polygon_get(url, params=None):
+    started_at = time.perf_counter()
+    try:
+        response = requests.get(url, params=params)
+    except requests.RequestException:
+        telemetry.observe_polygon_request(url, started_at, "error")
+        raise
+    telemetry.observe_polygon_request(url, started_at, response.status_code)
+    return response
+
+
 def _fetch_polygon_daily_series(symbol, start, fetch_end, api_key, today_date):
     if pd.Timestamp(start) > pd.Timestamp(fetch_end):
         return pd.Series(dtype=float)
@@ -156,10 +171,10 @@ def _fetch_polygon_daily_series(symbol, start, fetch_end, api_key, today_date):
     if not hit:
         print(f"Fetching Polygon {symbol} -> {start} {fetch_end}")
         url = (
-            f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/"
+            f"{POLYGON_BASE_URL}/v2/aggs/ticker/{symbol}/range/1/day/"
             f"{start}/{fetch_end}?adjusted=true&sort=asc&limit=50000&apiKey={api_key}"
         )
-        response = requests.get(url)
+        response = _polygon_get(url)
         if response.status_code != 200:
             raise RuntimeError(f"Polygon daily fetch failed for {symbol}: {response.status_code}")
         cache_data = response.json()
@@ -171,7 +186,7 @@ def _fetch_polygon_daily_series(symbol, start, fetch_end, api_key, today_date):
 def _fetch_yfinance_daily_series(symbol, start, end, today_date):
     if pd.Timestamp(start) >= pd.Timestamp(end):
         return pd.Series(dtype=float)
-    if yf is None:
+    if not yf:
         raise RuntimeError("yfinance is required for history older than Polygon supports")
 
     cache_data, hit = _load_yfinance_cache(symbol, start, end)
@@ -202,10 +217,10 @@ def _fetch_yfinance_daily_series(symbol, start, end, today_date):
 
 def _fetch_intraday_summary(symbol, today_str, api_key):
     intra_url = (
-        f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/minute/"
+        f"{POLYGON_BASE_URL}/v2/aggs/ticker/{symbol}/range/1/minute/"
         f"{today_str}/{today_str}?adjusted=true&sort=desc&limit=2000&apiKey={api_key}"
     )
-    response = requests.get(intra_url)
+    response = _polygon_get(intra_url)
     if response.status_code != 200:
         return {"current": None, "open": None}
 
@@ -242,7 +257,7 @@ def _fetch_polygon_reference_results(symbol, kind, date_field, start, end, api_k
         return cache_data.get("results", [])
 
     print(f"Fetching Polygon {kind} {symbol} -> {start} {end}")
-    base_url = f"https://api.polygon.io/v3/reference/{kind}"
+    base_url = f"{POLYGON_BASE_URL}/v3/reference/{kind}"
     next_url = base_url
     params = {
         "ticker": symbol,
@@ -256,7 +271,7 @@ def _fetch_polygon_reference_results(symbol, kind, date_field, start, end, api_k
     results = []
 
     while next_url:
-        response = requests.get(next_url, params=params if next_url == base_url else None)
+        response = _polygon_get(next_url, params=params if next_url == base_url else None)
         if response.status_code != 200:
             raise RuntimeError(f"Polygon {kind} fetch failed for {symbol}: {response.status_code}")
 
@@ -296,16 +311,37 @@ def get_polygon_splits(symbols, start, end):
     return out
 
 
-def future_split_factor_for_date(split_events, date_like) -> float:
-    trade_date = pd.Timestamp(date_like).normalize()
-    factor = 1.0
+def compile_split_factors(split_events) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted split dates and, for each position, the product of the ratios from there on.
+
+    `factors[i]` is the combined ratio of every split at index >= i, with a trailing
+    1.0 for dates after the last split, so `factors[searchsorted(dates, day, "right")]`
+    is the adjustment for anything dated `day`.
+    """
+    dates = []
+    ratios = []
     for event in split_events or []:
-        split_date = pd.Timestamp(event.get("execution_date")).normalize()
         split_from = float(event.get("split_from") or 0)
         split_to = float(event.get("split_to") or 0)
-        if split_date > trade_date and split_from > 0 and split_to > 0:
-            factor *= split_to / split_from
-    return factor
+        if split_from > 0 and split_to > 0 and event.get("execution_date"):
+            dates.append(event["execution_date"])
+            ratios.append(split_to / split_from)
+
+    split_dates = pd.to_datetime(pd.Series(dates, dtype=object), format="mixed").dt.normalize().to_numpy(dtype="datetime64[D]")
+    order = np.argsort(split_dates, kind="stable")
+    reverse_products = np.cumprod(np.asarray(ratios, dtype=float)[order][::-1])[::-1]
+    return split_dates[order], np.append(reverse_products, 1.0)
+
+
+def future_split_factors(split_events, dates) -> np.ndarray:
+    """Vectorized `future_split_factor_for_date` over many dates."""
+    split_dates, factors = compile_split_factors(split_events)
+    days = pd.DatetimeIndex(pd.to_datetime(dates, format="mixed")).normalize().to_numpy(dtype="datetime64[D]")
+    return factors[np.searchsorted(split_dates, days, side="right")]
+
+
+def future_split_factor_for_date(split_events, date_like) -> float:
+    return float(future_split_factors(split_events, [date_like])[0])
 
 
 def get_polygon_dividends(symbols, start, end):
@@ -329,27 +365,26 @@ def get_polygon_dividends(symbols, start, end):
                     api_key,
                 )
             )
-        amounts_by_date = {}
-        split_events = splits_by_symbol.get(sym, [])
-
+        ex_dates = []
+        amounts = []
         for event in events:
             ex_dividend_date = event.get("ex_dividend_date")
-            cash_amount = event.get("cash_amount")
             if not ex_dividend_date:
                 continue
 
             try:
-                amount = float(cash_amount)
+                amount = float(event.get("cash_amount"))
             except (TypeError, ValueError):
                 continue
             if amount == 0:
                 continue
 
-            ex_date = pd.Timestamp(ex_dividend_date).normalize()
-            adjusted_amount = amount / future_split_factor_for_date(split_events, ex_date)
-            amounts_by_date[ex_date] = amounts_by_date.get(ex_date, 0.0) + adjusted_amount
+            ex_dates.append(ex_dividend_date)
+            amounts.append(amount)
 
-        series_by_symbol[sym] = pd.Series(amounts_by_date, dtype=float)
+        ex_index = pd.DatetimeIndex(pd.to_datetime(ex_dates, format="mixed")).normalize()
+        adjusted = np.asarray(amounts, dtype=float) / future_split_factors(splits_by_symbol.get(sym, []), ex_index)
+        series_by_symbol[sym] = pd.Series(adjusted, index=ex_index, dtype=float).groupby(level=0).sum()
 
     if not series_by_symbol:
         return pd.DataFrame()
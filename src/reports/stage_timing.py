@@ -0,0 +1,150 @@
+"""Per-stage wall/CPU/RSS timings and optional cProfile dumps for report rebuilds."""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+RUN_LOG_MAX_ENTRIES = int(os.environ.get("PIPELINE_RUN_LOG_MAX_ENTRIES", "500"))
+PROFILE_TEXT_LINES = 60
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class StageTimer:
+    """Lap timer: `begin(name)` closes the running stage and opens the next one.
+
+    The report loop is one long function with early `continue`s, so stages are
+    laps rather than nested `with` blocks. With `profile=True` the whole span from
+    construction to `finish()` also runs under cProfile.
+    """
+
+    def __init__(self, label: str, profile: bool = False):
+        self.label = label
+        self.stages: list[dict] = []
+        self.skipped: str | None = None
+        self._current = None
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self._finished = None
+        self._profiler = cProfile.Profile() if profile else None
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def begin(self, name: str):
+        self._close_stage()
+        self._current = (name, time.perf_counter(), time.process_time())
+
+    def _close_stage(self):
+        if self._current is None:
+            return
+        name, wall_start, cpu_start = self._current
+        self.stages.append({
+            "name": name,
+            "wallSeconds": round(time.perf_counter() - wall_start, 4),
+            "cpuSeconds": round(time.process_time() - cpu_start, 4),
+            "peakRssMb": peak_rss_mb(),
+        })
+        self._current = None
+
+    def finish(self, skipped: str | None = None):
+        if self._finished is not None:
+            return
+        self._close_stage()
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.skipped = skipped
+        self._finished = (
+            time.perf_counter() - self._started_wall,
+            time.process_time() - self._started_cpu,
+            peak_rss_mb(),
+        )
+
+    def stage_seconds(self, name: str) -> float:
+        return sum(stage["wallSeconds"] for stage in self.stages if stage["name"] == name)
+
+    def to_dict(self) -> dict:
+        self.finish()
+        wall_seconds, cpu_seconds, peak_rss = self._finished
+        record = {
+            "label": self.label,
+            "wallSeconds": round(wall_seconds, 4),
+            "cpuSeconds": round(cpu_seconds, 4),
+            "peakRssMb": peak_rss,
+            "stages": self.stages,
+        }
+        if self.skipped:
+            record["skipped"] = self.skipped
+        return record
+
+    def write_profile(self, path_stem: Path) -> list[Path]:
+        """Write `<stem>.prof` for snakeviz/pstats and `<stem>.txt` with the top functions."""
+        if self._profiler is None:
+            return []
+        self.finish()
+        path_stem.parent.mkdir(parents=True, exist_ok=True)
+        prof_path = path_stem.with_suffix(".prof")
+        text_path = path_stem.with_suffix(".txt")
+        self._profiler.dump_stats(prof_path)
+        buffer = io.StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_TEXT_LINES)
+        text_path.write_text(buffer.getvalue(), encoding="utf-8")
+        return [prof_path, text_path]
+
+
+def append_run_log(path: Path, record: dict, max_entries: int = RUN_LOG_MAX_ENTRIES):
+    """Append one JSON line, keeping only the newest `max_entries` runs."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    lines.append(json.dumps(record, separators=(",", ":")))
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text("\n".join(lines[-max_entries:]) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def format_summary_table(timers: list[StageTimer]) -> str:
+    """Wall seconds per stage (rows) and account (columns), with totals and peak RSS."""
+    if not timers:
+        return ""
+
+    stage_names = list(dict.fromkeys(stage["name"] for timer in timers for stage in timer.stages))
+    records = [timer.to_dict() for timer in timers]
+    labels = [timer.label for timer in timers]
+    name_width = max(len("peak RSS MB"), *(len(name) for name in stage_names))
+    widths = [max(8, len(label)) for label in labels]
+
+    def row(name: str, values: list[str], total: str = "") -> str:
+        cells = [value.rjust(width) for value, width in zip(values, widths)]
+        return "  ".join([name.ljust(name_width), *cells, total.rjust(8)]).rstrip()
+
+    lines = [row("stage", labels, "total")]
+    for name in stage_names:
+        seconds = [timer.stage_seconds(name) for timer in timers]
+        lines.append(row(name, [f"{value:.2f}" for value in seconds], f"{sum(seconds):.2f}"))
+    lines.append(row(
+        "total",
+        [f"{record['wallSeconds']:.2f}" for record in records],
+        f"{sum(record['wallSeconds'] for record in records):.2f}",
+    ))
+    lines.append(row(
+        "peak RSS MB",
+        ["—" if record["peakRssMb"] is None else f"{record['peakRssMb']:.0f}" for record in records],
+    ))
+    return "\n".join(lines)
@@ -0,0 +1,274 @@
+"""Tax-lot reconstruction with wash-sale basis adjustments.
+
+Sales consume long-term lots before short-term ones, then the lots with the
+smallest realized gain per share, then the oldest trade date, then book order.
+Selling a lot at a loss moves that loss into lots bought within 30 days before
+the sale, or into shares bought within 30 days after it.
+"""
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from operator import attrgetter
+
+import pandas as pd
+
+
+NS_PER_DAY = 86_400_000_000_000
+WASH_SALE_WINDOW_DAYS = 30
+
+_lot_day = attrgetter("day")
+
+
+@lru_cache(maxsize=None)
+def _last_short_term_day(tax_day: int) -> int:
+    """Lots acquired on `tax_day` are long-term on sales strictly after this day."""
+    return (pd.Timestamp(tax_day, unit="D") + pd.DateOffset(years=1)).value // NS_PER_DAY
+
+
+class Lot:
+    __slots__ = ("date", "date_ns", "day", "tax_day", "qty", "price", "position", "version")
+
+    def __init__(self, date, date_ns: int, day: int, tax_day: int, qty: float, price: float, position: tuple):
+        self.date = date
+        self.date_ns = date_ns
+        self.day = day
+        self.tax_day = tax_day
+        self.qty = qty
+        self.price = price
+        self.position = position
+        self.version = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "date": self.date,
+            "tax_date": pd.Timestamp(self.tax_day, unit="D"),
+            "qty": self.qty,
+            "price": self.price,
+        }
+
+
+class PendingWash:
+    __slots__ = ("expires_day", "loss_per_share", "qty", "tax_day")
+
+    def __init__(self, expires_day: int, loss_per_share: float, qty: float, tax_day: int):
+        self.expires_day = expires_day
+        self.loss_per_share = loss_per_share
+        self.qty = qty
+        self.tax_day = tax_day
+
+
+class SymbolLotBook:
+    """Open lots for one symbol in book order, plus heaps that rank them for sale.
+
+    Heap entries are `(-price, date_ns, position, version, lot)`; an entry is stale
+    once the lot's version moves on or the lot is closed. Short-term lots also sit
+    in a maturity heap so they move to the long-term heap on the first sale after
+    their one-year mark.
+
+    Trades arrive in date order, so book order is also acquisition-day order and
+    the wash-sale window is found by bisecting on `Lot.day`. Pending washes expire
+    in the order they were created and are consumed front to back, so they live
+    in a deque.
+    """
+
+    def __init__(self, eps: float):
+        self.eps = eps
+        self.lots: list[Lot] = []
+        self.pending_washes: deque[PendingWash] = deque()
+        self._next_position = 0
+        self._closed_count = 0
+        self._long_term: list[tuple] = []
+        self._short_term: list[tuple] = []
+        self._maturing: list[tuple] = []
+
+    def _track(self, lot: Lot):
+        lot.version += 1
+        entry = (-lot.price, lot.date_ns, lot.position, lot.version, lot)
+        heapq.heappush(self._short_term, entry)
+        heapq.heappush(self._maturing, (_last_short_term_day(lot.tax_day), lot.position, lot.version, lot))
+
+    def _mature(self, sale_day: int):
+        while self._maturing and self._maturing[0][0] < sale_day:
+            _, _, version, lot = heapq.heappop(self._maturing)
+            if version != lot.version or lot.qty <= self.eps:
+                continue
+            lot.version += 1
+            heapq.heappush(self._long_term, (-lot.price, lot.date_ns, lot.position, lot.version, lot))
+
+    def _is_live(self, entry: tuple) -> bool:
+        lot = entry[-1]
+        return entry[3] == lot.version and lot.qty > self.eps
+
+    def _pop_live(self, heap: list[tuple]) -> tuple | None:
+        while heap:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                return entry
+        return None
+
+    def _pop_equal_gain_entries(self, heap: list[tuple], sale_price: float) -> list[tuple]:
+        # Heaps order by price, but the sale order compares `sale_price - price`,
+        # which can round distinct prices to the same gain; those ties fall back
+        # to trade date and book order, so pull the whole tie group at once.
+        first = self._pop_live(heap)
+        if first is None:
+            return []
+        gain = sale_price - first[-1].price
+        entries = [first]
+        while heap:
+            if not self._is_live(heap[0]):
+                heapq.heappop(heap)
+                continue
+            if sale_price - heap[0][-1].price != gain:
+                break
+            entries.append(heapq.heappop(heap))
+        if len(entries) > 1:
+            entries.sort(key=lambda entry: (entry[1], entry[2]))
+        return entries
+
+    def _append(self, lot: Lot):
+        self.lots.append(lot)
+        self._track(lot)
+
+    def expire_pending_washes(self, day: int):
+        pending_washes = self.pending_washes
+        while pending_washes and pending_washes[0].expires_day < day:
+            pending_washes.popleft()
+
+    def add_pending_wash(self, sale_day: int, loss_per_share: float, qty: float, tax_day: int):
+        self.pending_washes.append(PendingWash(sale_day + WASH_SALE_WINDOW_DAYS, loss_per_share, qty, tax_day))
+
+    def buy(self, date, date_ns: int, day: int, qty: float, price: float):
+        eps = self.eps
+        remaining_qty = qty
+        pending_washes = self.pending_washes
+        while pending_washes and remaining_qty > eps:
+            pending = pending_washes[0]
+            matched = min(remaining_qty, pending.qty)
+            self._append(Lot(date, date_ns, day, min(day, pending.tax_day), matched, price + pending.loss_per_share, (self._next_position,)))
+            self._next_position += 1
+            pending.qty -= matched
+            remaining_qty -= matched
+            if pending.qty <= eps:
+                pending_washes.popleft()
+
+        if remaining_qty > eps:
+            self._append(Lot(date, date_ns, day, day, remaining_qty, price, (self._next_position,)))
+            self._next_position += 1
+
+    def sell(self, qty: float, sale_day: int, sale_price: float) -> list[tuple[float, float, int]]:
+        """Consume lots for a sale; returns (qty, price, tax_day) for each lot sold from."""
+        eps = self.eps
+        self._mature(sale_day)
+        sold = []
+        remaining_qty = qty
+
+        for heap in (self._long_term, self._short_term):
+            while remaining_qty > eps:
+                entries = self._pop_equal_gain_entries(heap, sale_price)
+                if not entries:
+                    break
+                for entry in entries:
+                    lot = entry[-1]
+                    if remaining_qty <= eps:
+                        heapq.heappush(heap, entry)
+                        continue
+                    matched = min(remaining_qty, lot.qty)
+                    lot.qty -= matched
+                    remaining_qty -= matched
+                    sold.append((matched, lot.price, lot.tax_day))
+                    if lot.qty > eps:
+                        heapq.heappush(heap, entry)
+                    else:
+                        self._closed_count += 1
+
+        if self._closed_count * 2 > len(self.lots):
+            self.lots = [lot for lot in self.lots if lot.qty > eps]
+            self._closed_count = 0
+        return sold
+
+    def apply_wash_sale(self, sale_day: int, loss_qty: float, loss_per_share: float, sold_tax_day: int) -> float:
+        """Move a realized loss into lots bought in the 30 days up to the sale.
+
+        Returns the loss quantity that no existing lot absorbed.
+        """
+        eps = self.eps
+        if loss_qty <= eps or loss_per_share <= eps:
+            return 0.0
+
+        remaining = loss_qty
+        index = bisect_left(self.lots, sale_day - WASH_SALE_WINDOW_DAYS, key=_lot_day)
+        while index < len(self.lots) and remaining > eps:
+            lot = self.lots[index]
+            if lot.day > sale_day:
+                break
+            index += 1
+            if lot.qty <= eps:
+                continue
+
+            matched = min(remaining, lot.qty)
+            leftover_qty = lot.qty - matched
+            original_price = lot.price
+            original_tax_day = lot.tax_day
+            lot.qty = matched
+            lot.price = float(original_price) + loss_per_share
+            lot.tax_day = min(original_tax_day, sold_tax_day)
+            if leftover_qty > eps:
+                leftover = Lot(lot.date, lot.date_ns, lot.day, original_tax_day, leftover_qty, original_price, lot.position + (1,))
+                lot.position = lot.position + (0,)
+                self.lots.insert(index, leftover)
+                self._track(leftover)
+                index += 1
+            self._track(lot)
+            remaining -= matched
+
+        return remaining
+
+    def open_lots(self) -> list[dict]:
+        return [lot.to_dict() for lot in self.lots if lot.qty > self.eps]
+
+
+def build_lot_book(trades: pd.DataFrame, symbols: list[str], eps: float) -> dict[str, list[dict]]:
+    books = {sym: SymbolLotBook(eps) for sym in symbols}
+    if trades.empty:
+        return {sym: [] for sym in symbols}
+
+    ordered_trades = (
+        trades.reset_index()
+        .rename(columns={"index": "_trade_order"})
+        .sort_values(["Run Date", "_trade_order"], kind="stable")
+    )
+    trade_dates = pd.to_datetime(ordered_trades["Run Date"])
+    date_ns = trade_dates.to_numpy(dtype="datetime64[ns]").astype("int64")
+    days = trade_dates.dt.normalize().to_numpy(dtype="datetime64[D]").astype("int64")
+
+    for sym, trade_date, trade_ns, day, qty, price in zip(
+        ordered_trades["symbol"],
+        ordered_trades["Run Date"],
+        date_ns.tolist(),
+        days.tolist(),
+        ordered_trades["quantity"].astype(float).tolist(),
+        ordered_trades["price"].astype(float).tolist(),
+    ):
+        book = books.get(sym)
+        if book is None or abs(qty) <= eps:
+            continue
+
+        book.expire_pending_washes(day)
+
+        if qty > 0:
+            book.buy(trade_date, trade_ns, day, qty, price)
+            continue
+
+        for sold_qty, sold_price, sold_tax_day in book.sell(-qty, day, price):
+            if sold_price <= price + eps:
+                continue
+
+            unmatched_loss_qty = book.apply_wash_sale(day, sold_qty, sold_price - price, sold_tax_day)
+            if unmatched_loss_qty > eps:
+                book.add_pending_wash(day, sold_price - price, unmatched_loss_qty, sold_tax_day)
+
+    return {sym: book.open_lots() for sym, book in books.items()}
@@ -0,0 +1,188 @@
+"""NYSE sessions as integer day numbers.
+
+Days are counted from 1970-01-01 (numpy's `datetime64[D]` epoch), so calendar
+arithmetic is integer arithmetic, ISO strings come from a precomputed table,
+and "how many sessions between A and B" is two `searchsorted` calls. pandas is
+only imported by the helpers that return timestamps, so the Flask server can
+use the day arithmetic without loading it.
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+
+FIRST_YEAR = 1980
+LAST_YEAR = 2099
+# Unscheduled full-day closures; the rule-based holidays are in `nyse_holidays`.
+SPECIAL_CLOSURES = (
+    "1985-09-27",  # Hurricane Gloria
+    "1994-04-27",  # Nixon funeral
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11",  # Reagan funeral
+    "2007-01-02",  # Ford funeral
+    "2012-10-29", "2012-10-30",  # Hurricane Sandy
+    "2018-12-05",  # G.H.W. Bush funeral
+    "2025-01-09",  # Carter funeral
+)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_FIRST_DAY = date(FIRST_YEAR, 1, 1).toordinal() - _EPOCH_ORDINAL
+_LAST_DAY = date(LAST_YEAR, 12, 31).toordinal() - _EPOCH_ORDINAL
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm.
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> list[date]:
+    holidays = []
+    new_year = date(year, 1, 1)
+    # The exchange does not close the Friday before a Saturday New Year's Day.
+    if new_year.weekday() != 5:
+        holidays.append(_observed(new_year))
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, 0, 3))
+    holidays.append(_nth_weekday(year, 2, 0, 3))
+    holidays.append(_easter(year) - timedelta(days=2))
+    holidays.append(_last_weekday(year, 5, 0))
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))
+    holidays.append(_observed(date(year, 7, 4)))
+    holidays.append(_nth_weekday(year, 9, 0, 1))
+    holidays.append(_nth_weekday(year, 11, 3, 4))
+    holidays.append(_observed(date(year, 12, 25)))
+    return sorted(holidays)
+
+
+def day_number(value) -> int:
+    """Days since 1970-01-01 for an ISO string, date, datetime/Timestamp (wall date), or datetime64."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        return int(np.datetime64(value, "D").astype(np.int64))
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _check_range(day: int):
+    if not _FIRST_DAY <= day <= _LAST_DAY:
+        raise ValueError(f"Date outside the trading calendar ({FIRST_YEAR}-{LAST_YEAR})")
+
+
+@lru_cache(maxsize=1)
+def _iso_table() -> list[str]:
+    days = np.arange(_FIRST_DAY, _LAST_DAY + 1).astype("datetime64[D]")
+    return np.datetime_as_string(days, unit="D").tolist()
+
+
+@lru_cache(maxsize=1)
+def session_days() -> np.ndarray:
+    """Sorted day numbers of every NYSE session in the calendar span."""
+    days = np.arange(_FIRST_DAY, _LAST_DAY + 1, dtype=np.int64)
+    # 1970-01-01 was a Thursday, so (day + 3) % 7 is Monday=0 .. Sunday=6.
+    weekdays = days[(days + 3) % 7 < 5]
+    closed = [day_number(holiday) for year in range(FIRST_YEAR, LAST_YEAR + 1) for holiday in nyse_holidays(year)]
+    closed.extend(day_number(day) for day in SPECIAL_CLOSURES)
+    sessions = weekdays[~np.isin(weekdays, np.asarray(closed, dtype=np.int64))]
+    sessions.setflags(write=False)
+    return sessions
+
+
+@lru_cache(maxsize=1)
+def _iso_array() -> np.ndarray:
+    return np.array(_iso_table(), dtype=object)
+
+
+def iso_date(day: int) -> str:
+    _check_range(day)
+    return _iso_table()[day - _FIRST_DAY]
+
+
+def calendar_days_after(after, through) -> list[str]:
+    """ISO strings for every calendar day in (after, through]; empty if through <= after."""
+    first, last = day_number(after) + 1, day_number(through)
+    if last < first:
+        return []
+    _check_range(first)
+    _check_range(last)
+    return _iso_table()[first - _FIRST_DAY:last - _FIRST_DAY + 1]
+
+
+def iso_dates(index) -> list[str]:
+    """ISO strings for every entry of a DatetimeIndex (wall dates), in one table gather."""
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    days = np.asarray(index, dtype="datetime64[D]").astype(np.int64)
+    if not len(days):
+        return []
+    if days.min() < _FIRST_DAY or days.max() > _LAST_DAY:
+        return np.datetime_as_string(days.astype("datetime64[D]"), unit="D").tolist()
+    return _iso_array()[days - _FIRST_DAY].tolist()
+
+
+def is_session(value) -> bool:
+    day = day_number(value)
+    sessions = session_days()
+    position = np.searchsorted(sessions, day)
+    return bool(position < len(sessions) and sessions[position] == day)
+
+
+def count_sessions(start, end) -> int:
+    """Sessions in [start, end]."""
+    sessions = session_days()
+    first = np.searchsorted(sessions, day_number(start), side="left")
+    last = np.searchsorted(sessions, day_number(end), side="right")
+    return max(int(last - first), 0)
+
+
+def previous_session(value):
+    """The last session strictly before `value`, as a midnight `pd.Timestamp`."""
+    import pandas as pd
+
+    day = day_number(value)
+    _check_range(day)
+    sessions = session_days()
+    position = int(np.searchsorted(sessions, day, side="left")) - 1
+    if position < 0:
+        raise ValueError(f"No session before {value}")
+    return pd.Timestamp(int(sessions[position]), unit="D")
+
+
+def sessions_between(start, end):
+    """NYSE sessions in [start, end] as a midnight `pd.DatetimeIndex`."""
+    import pandas as pd
+
+    sessions = session_days()
+    first = np.searchsorted(sessions, day_number(start), side="left")
+    last = np.searchsorted(sessions, day_number(end), side="right")
+    return pd.DatetimeIndex(sessions[first:last].astype("datetime64[D]").astype("datetime64[ns]"))
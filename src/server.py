@@ -1,5 +1,7 @@
 import copy
 import csv
+import hashlib
+import itertools
 import json
 import math
 import os
@@ -7,23 +9,39 @@ import queue
 import re
 import threading
 import time
-from datetime import datetime, timedelta
+from collections.abc import Sequence
+from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlencode
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 from dotenv import load_dotenv
-from flask import Flask, send_from_directory, jsonify, request, Response, stream_with_context
+from flask import Flask, send_file, send_from_directory, jsonify, request, Response, stream_with_context
+import numpy as np
 import requests
 from websockets.sync.client import connect
+from werkzeug.utils import safe_join
 
+from src.jobs import JobCapacityError, JobManager, job_event_stream
 from src.posthog_analytics import (
+    PostHogProxyBusyError,
+    backend_event_sender,
     build_backend_capture_payload,
     build_posthog_public_config,
     capture_backend_event_async,
     forward_posthog_request,
 )
-from src.reports.model_portfolio import create_model_portfolio_report
+from src import telemetry
+from src.precompressed import (
+    MIN_COMPRESS_BYTES,
+    compress_bytes,
+    compressed_file_bytes,
+    fresh_sibling,
+    is_compressible,
+    supported_encodings,
+)
+from src.reports.trading_calendar import calendar_days_after
 from src.tools import ToolDataError, algo_output_processor, earnings_calendar, market_cap_weights, stock_source
 from src.util import BASE_DIR
 
@@ -35,6 +53,7 @@ load_dotenv()
 OUT_DIR = BASE_DIR / "out"
 CLIENT_DIR = BASE_DIR / "client" / "dist"
 DATA_ACCOUNTS_FILE = BASE_DIR / "data" / "accounts.json"
+POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
 POLYGON_REALTIME_STOCKS_WS_URL = os.environ.get(
     "POLYGON_REALTIME_STOCKS_WS_URL",
     "wss://socket.polygon.io/stocks",
@@ -45,6 +64,7 @@ POLYGON_DELAYED_STOCKS_WS_URL = os.environ.get(
 )
 LIVE_POLL_SECONDS = 5
 LIVE_REPORT_REFRESH_SECONDS = int(os.environ.get("LIVE_REPORT_REFRESH_SECONDS", "5"))
+EMBEDDED_REPORT_CACHE_SIZE = int(os.environ.get("EMBEDDED_REPORT_CACHE_SIZE", "16"))
 NY_TZ = ZoneInfo("America/New_York")
 
 app = Flask(
@@ -63,8 +83,105 @@ else:
 # ============================================================
 #  Live quote helpers
 # ============================================================
+class _CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+accounts_index_stats = _CacheStats()
+live_config_stats = _CacheStats()
+
+http_request_seconds = telemetry.Histogram(
+    "http_request_duration_seconds",
+    "Flask request latency by route template, method, and status.",
+    ("route", "method", "status"),
+)
+live_quote_messages_in = telemetry.Counter(
+    "live_quote_messages_in_total",
+    "Messages received by LiveQuoteHub from the Polygon feed.",
+    ("type", "transport"),
+)
+live_quote_messages_out = telemetry.Counter(
+    "live_quote_messages_out_total",
+    "Messages queued by LiveQuoteHub for SSE clients.",
+    ("type",),
+)
+live_feed_connects = telemetry.Counter(
+    "live_feed_ws_connects_total",
+    "Polygon WebSocket connection attempts by feed and outcome.",
+    ("feed", "result"),
+)
+live_feed_restarts = telemetry.Counter(
+    "live_feed_restarts_total",
+    "Times LiveQuoteHub restarted the upstream feed (ticker changes or disconnects).",
+)
+live_snapshot_poll_seconds = telemetry.Histogram(
+    "live_snapshot_poll_duration_seconds",
+    "Wall time of one _fetch_stock_snapshots call, across all ticker chunks.",
+)
+live_report_cycle_seconds = telemetry.Histogram(
+    "live_report_refresh_cycle_seconds",
+    "Wall time of one LiveReportRefresher pass over every report.",
+)
+live_report_files_written = telemetry.Counter(
+    "live_report_files_written_total",
+    "Files rewritten by LiveReportRefresher.",
+    ("kind",),
+)
+_accounts_index_lock = threading.Lock()
+_accounts_index_cache: tuple[tuple, list[dict]] | None = None
+
+
+def _file_signature(path: Path) -> tuple[int, int, int] | None:
+    # Inode catches atomic os.replace rewrites that land within one mtime tick.
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
 def _load_accounts():
+    global _accounts_index_cache
     index_path = OUT_DIR / "accounts.json"
+    cache_key = (
+        str(index_path),
+        _file_signature(index_path),
+        str(DATA_ACCOUNTS_FILE),
+        _file_signature(DATA_ACCOUNTS_FILE),
+    )
+    with _accounts_index_lock:
+        cached = _accounts_index_cache
+    if cached is not None and cached[0] == cache_key:
+        accounts_index_stats.record(hit=True)
+        return list(cached[1])
+
+    accounts_index_stats.record(hit=False)
+    accounts = _read_accounts_index(index_path)
+    with _accounts_index_lock:
+        _accounts_index_cache = (cache_key, accounts)
+    return list(accounts)
+
+
+def _read_accounts_index(index_path: Path) -> list[dict]:
     if not index_path.exists():
         return []
 
@@ -234,11 +351,25 @@ def _fetch_stock_snapshots(tickers: list[str]) -> dict[str, dict]:
     if not api_key or not tickers:
         return {}
 
+    poll_started_at = time.perf_counter()
+    try:
+        return _fetch_stock_snapshot_chunks(tickers, api_key)
+    finally:
+        live_snapshot_poll_seconds.observe_since(poll_started_at)
+
+
+def _fetch_stock_snapshot_chunks(tickers: list[str], api_key: str) -> dict[str, dict]:
     out = {}
     for chunk in _chunked(tickers, 50):
         params = urlencode({"tickers": ",".join(chunk), "apiKey": api_key})
-        url = f"https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/tickers?{params}"
-        response = requests.get(url, timeout=10)
+        url = f"{POLYGON_BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers?{params}"
+        started_at = time.perf_counter()
+        try:
+            response = requests.get(url, timeout=10)
+        except requests.RequestException:
+            telemetry.observe_polygon_request(url, started_at, "error")
+            raise
+        telemetry.observe_polygon_request(url, started_at, response.status_code)
         response.raise_for_status()
         payload = response.json()
 
@@ -281,49 +412,101 @@ def _ny_date_string() -> str:
     return datetime.now(NY_TZ).strftime("%Y-%m-%d")
 
 
+class _LiveSeries(Sequence):
+    """A report series as a shared base list plus the live points after it.
+
+    The base is the list parsed from the interactive JSON and is never mutated;
+    live updates drop or append points at the end by building a new view in
+    O(tail) instead of copying every point. Slices come back as plain lists and
+    `_write_json` serializes views through `to_list()`.
+    """
+
+    __slots__ = ("_base", "_keep", "_tail")
+
+    def __init__(self, base: list, keep: int | None = None, tail: tuple = ()):
+        self._base = base
+        self._keep = len(base) if keep is None else keep
+        self._tail = tail
+
+    @classmethod
+    def wrap(cls, series) -> "_LiveSeries":
+        return series if isinstance(series, cls) else cls(series or [])
+
+    def __len__(self) -> int:
+        return self._keep + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.to_list()[index]
+            head = self._base[start:min(stop, self._keep)] if start < self._keep else []
+            return head + list(self._tail[max(start - self._keep, 0):max(stop - self._keep, 0)])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("series index out of range")
+        return self._base[index] if index < self._keep else self._tail[index - self._keep]
+
+    def __iter__(self):
+        yield from itertools.islice(self._base, self._keep)
+        yield from self._tail
+
+    def __eq__(self, other):
+        if isinstance(other, _LiveSeries) and other._base is self._base:
+            return self._keep == other._keep and self._tail == other._tail
+        if isinstance(other, (_LiveSeries, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"_LiveSeries({self.to_list()!r})"
+
+    def to_list(self) -> list:
+        return self._base[:self._keep] + list(self._tail)
+
+    def splice(self, drop: int, points) -> "_LiveSeries":
+        """Drop the last `drop` points and append `points`."""
+        keep, tail = self._keep, self._tail
+        if drop <= len(tail):
+            tail = tail[:len(tail) - drop]
+        else:
+            keep -= drop - len(tail)
+            tail = ()
+        return _LiveSeries(self._base, keep, tail + tuple(points))
+
+
 def _upsert_series_point(series: list[dict], point: dict) -> list[dict]:
     if not series:
         return [point]
-    next_series = list(series)
-    if next_series[-1].get("t") == point["t"]:
-        next_series[-1] = point
-    else:
-        next_series.append(point)
-    return next_series
+    series = _LiveSeries.wrap(series)
+    return series.splice(1 if series[-1].get("t") == point["t"] else 0, (point,))
 
 
 def _roll_forward_series(series: list[dict], as_of_date: str) -> list[dict]:
     if not series:
         return series
-    next_series = list(series)
-    last_date = next_series[-1].get("t")
+    series = _LiveSeries.wrap(series)
+    last_date = series[-1].get("t")
     if not last_date or last_date >= as_of_date:
-        return next_series
+        return series
 
-    current_date = datetime.strptime(last_date, "%Y-%m-%d").date() + timedelta(days=1)
-    end_date = datetime.strptime(as_of_date, "%Y-%m-%d").date()
-    last_value = next_series[-1].get("v")
-    while current_date <= end_date:
-        next_series.append({"t": current_date.isoformat(), "v": last_value})
-        current_date += timedelta(days=1)
-    return next_series
+    last_value = series[-1].get("v")
+    return series.splice(0, ({"t": day, "v": last_value} for day in calendar_days_after(last_date, as_of_date)))
 
 
 def _carry_latest_point_to_date(series: list[dict], as_of_date: str) -> list[dict]:
     if not series:
         return series
+    series = _LiveSeries.wrap(series)
     last_date = series[-1].get("t")
     if not last_date or last_date >= as_of_date:
-        return list(series)
+        return series
 
-    next_series = list(series[:-1])
-    current_date = datetime.strptime(last_date, "%Y-%m-%d").date() + timedelta(days=1)
-    end_date = datetime.strptime(as_of_date, "%Y-%m-%d").date()
     last_value = series[-1].get("v")
-    while current_date <= end_date:
-        next_series.append({"t": current_date.isoformat(), "v": last_value})
-        current_date += timedelta(days=1)
-    return next_series
+    return series.splice(1, ({"t": day, "v": last_value} for day in calendar_days_after(last_date, as_of_date)))
 
 
 def _roll_forward_weights_series(weights_series: list[dict], as_of_date: str) -> list[dict]:
@@ -341,13 +524,12 @@ def _roll_forward_weights_series(weights_series: list[dict], as_of_date: str) ->
 def _with_live_equity(series: list[dict], live_return: float | None, as_of_date: str) -> list[dict]:
     if not series or live_return is None:
         return series
-    next_series = list(series)
-    base_idx = len(next_series) - 2 if next_series[-1].get("t") == as_of_date else len(next_series) - 1
+    base_idx = len(series) - 2 if series[-1].get("t") == as_of_date else len(series) - 1
     base_idx = max(base_idx, 0)
-    base_value = next_series[base_idx].get("v")
+    base_value = series[base_idx].get("v")
     if base_value in (None, 0):
         return series
-    return _upsert_series_point(next_series, {"t": as_of_date, "v": base_value * (1 + live_return)})
+    return _upsert_series_point(series, {"t": as_of_date, "v": base_value * (1 + live_return)})
 
 
 def _with_live_compounded_return(
@@ -357,65 +539,128 @@ def _with_live_compounded_return(
 ) -> list[dict]:
     if not series or live_return is None:
         return series
-    next_series = list(series)
-    base_idx = len(next_series) - 2 if next_series[-1].get("t") == as_of_date else len(next_series) - 1
+    base_idx = len(series) - 2 if series[-1].get("t") == as_of_date else len(series) - 1
     base_idx = max(base_idx, 0)
-    base_value = next_series[base_idx].get("v")
+    base_value = series[base_idx].get("v")
     if base_value is None:
         return series
     return _upsert_series_point(
-        next_series,
+        series,
         {"t": as_of_date, "v": (1 + base_value) * (1 + live_return) - 1},
     )
 
 
-def _build_daily_alpha_payload(portfolio_daily: list[dict], benchmark_daily: list[dict]) -> dict:
-    portfolio_by_date = {}
-    for point in portfolio_daily or []:
+def _daily_points_by_date(points: list[dict]) -> dict[str, float]:
+    by_date = {}
+    for point in points or []:
         date = point.get("t")
         value = _to_float(point.get("v"))
         if date and not math.isnan(value):
-            portfolio_by_date[date] = value
+            by_date[date] = value
+    return by_date
 
-    benchmark_by_date = {}
-    for point in benchmark_daily or []:
-        date = point.get("t")
-        value = _to_float(point.get("v"))
-        if date and not math.isnan(value):
-            benchmark_by_date[date] = value
-
-    shared_dates = sorted(set(portfolio_by_date) & set(benchmark_by_date))
-    if not shared_dates:
-        return {"beta": 0.0, "daily": []}
-
-    benchmark_values = [benchmark_by_date[date] for date in shared_dates]
-    portfolio_values = [portfolio_by_date[date] for date in shared_dates]
-    benchmark_mean = sum(benchmark_values) / len(benchmark_values)
-    portfolio_mean = sum(portfolio_values) / len(portfolio_values)
-    variance = sum((value - benchmark_mean) ** 2 for value in benchmark_values)
-    if variance <= 1e-12:
-        beta = 0.0
-    else:
-        covariance = sum(
-            (bench - benchmark_mean) * (port - portfolio_mean)
-            for bench, port in zip(benchmark_values, portfolio_values)
-        )
-        beta = covariance / variance
 
-    daily = []
-    cumulative = []
-    running = 1.0
-    for date in shared_dates:
-        alpha = portfolio_by_date[date] - beta * benchmark_by_date[date]
-        daily.append({"t": date, "v": alpha})
-        running *= 1 + alpha
-        cumulative.append({"t": date, "v": running - 1})
+def _shared_daily_arrays(portfolio_points: list[dict], benchmark_points: list[dict]):
+    portfolio_by_date = _daily_points_by_date(portfolio_points)
+    benchmark_by_date = _daily_points_by_date(benchmark_points)
+    dates = sorted(portfolio_by_date.keys() & benchmark_by_date.keys())
+    portfolio = np.fromiter((portfolio_by_date[date] for date in dates), dtype=float, count=len(dates))
+    benchmark = np.fromiter((benchmark_by_date[date] for date in dates), dtype=float, count=len(dates))
+    return dates, portfolio, benchmark
 
-    return {
-        "beta": beta,
-        "daily": daily,
-        "cumulative": cumulative,
-    }
+
+class _DailyAlphaSums:
+    """Running Σx, Σy, Σxy, Σx² (x = benchmark, y = portfolio) for one report's daily series.
+
+    The live refresher only replaces or appends points at the end of the daily
+    series, so every day before the last shared day of the base payload is summed
+    once and a refresh only folds in the tail. Anything else (a rebuilt report, or
+    a tail longer than MAX_TAIL) rebases with a full numpy recompute.
+    """
+
+    MAX_TAIL = 32
+
+    def __init__(self):
+        self.boundary = None
+        self.rebases = 0
+
+    def _rebase(self, portfolio_daily: list[dict], benchmark_daily: list[dict]):
+        self.rebases += 1
+        dates, portfolio, benchmark = _shared_daily_arrays(portfolio_daily, benchmark_daily)
+        self.boundary = dates[-1] if dates else None
+        settled = len(dates) - 1 if dates else 0
+        self.dates = dates[:settled]
+        self.portfolio = portfolio[:settled]
+        self.benchmark = benchmark[:settled]
+        self.count = settled
+        self.sum_x = float(self.benchmark.sum())
+        self.sum_y = float(self.portfolio.sum())
+        self.sum_xy = float(self.benchmark @ self.portfolio)
+        self.sum_xx = float(self.benchmark @ self.benchmark)
+        self.portfolio_prefix = self._prefix(portfolio_daily)
+        self.benchmark_prefix = self._prefix(benchmark_daily)
+
+    def _prefix(self, points: list[dict]) -> tuple[int, str | None]:
+        """(length, last date) of the leading points dated before the boundary."""
+        points = points or []
+        length = len(points)
+        while length and self.boundary is not None and (points[length - 1].get("t") or "") >= self.boundary:
+            length -= 1
+        return length, (points[length - 1].get("t") if length else None)
+
+    def _tail(self, points: list[dict], prefix: tuple[int, str | None]) -> list[dict] | None:
+        points = points or []
+        length, last_date = prefix
+        if len(points) < length or (length and points[length - 1].get("t") != last_date):
+            return None
+        tail = points[length:]
+        if len(tail) > self.MAX_TAIL or any((point.get("t") or "") < self.boundary for point in tail):
+            return None
+        return tail
+
+    def payload(self, portfolio_daily: list[dict], benchmark_daily: list[dict]) -> dict:
+        tails = None
+        if self.boundary is not None:
+            tails = (
+                self._tail(portfolio_daily, self.portfolio_prefix),
+                self._tail(benchmark_daily, self.benchmark_prefix),
+            )
+        if tails is None or None in tails:
+            self._rebase(portfolio_daily, benchmark_daily)
+            if self.boundary is None:
+                return {"beta": 0.0, "daily": []}
+            tails = ((portfolio_daily or [])[self.portfolio_prefix[0]:], (benchmark_daily or [])[self.benchmark_prefix[0]:])
+
+        tail_dates, tail_portfolio, tail_benchmark = _shared_daily_arrays(*tails)
+        count = self.count + len(tail_dates)
+        if not count:
+            return {"beta": 0.0, "daily": []}
+
+        sum_x = self.sum_x + float(tail_benchmark.sum())
+        sum_y = self.sum_y + float(tail_portfolio.sum())
+        variance = self.sum_xx + float(tail_benchmark @ tail_benchmark) - sum_x * sum_x / count
+        if variance <= 1e-12:
+            beta = 0.0
+        else:
+            covariance = self.sum_xy + float(tail_benchmark @ tail_portfolio) - sum_x * sum_y / count
+            beta = covariance / variance
+
+        dates = self.dates + tail_dates
+        alpha = np.concatenate((self.portfolio, tail_portfolio)) - beta * np.concatenate((self.benchmark, tail_benchmark))
+        cumulative = np.cumprod(1 + alpha) - 1
+        return {
+            "beta": beta,
+            "daily": [{"t": date, "v": value} for date, value in zip(dates, alpha.tolist())],
+            "cumulative": [{"t": date, "v": value} for date, value in zip(dates, cumulative.tolist())],
+        }
+
+
+def _build_daily_alpha_payload(
+    portfolio_daily: list[dict],
+    benchmark_daily: list[dict],
+    alpha_sums: _DailyAlphaSums | None = None,
+) -> dict:
+    return (alpha_sums or _DailyAlphaSums()).payload(portfolio_daily, benchmark_daily)
 
 
 def _read_csv_rows(path: Path) -> tuple[list[str], list[dict]]:
@@ -436,10 +681,16 @@ def _write_csv_rows(path: Path, fieldnames: list[str], rows: list[dict]):
 def _write_json(path: Path, payload: dict):
     tmp_path = path.with_suffix(path.suffix + ".tmp")
     with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+        json.dump(payload, f, indent=2, default=_json_default)
     os.replace(tmp_path, path)
 
 
+def _json_default(value):
+    if isinstance(value, _LiveSeries):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 _CSS_VALUE_RE = re.compile(r"^[#(),.%\sA-Za-z0-9-]+$")
 
 
@@ -536,37 +787,36 @@ table thead th {{
 """
 
 
-def _build_embedded_report_html(raw_html: str) -> str:
+def _embedded_report_theme() -> tuple[str, str, str, str, str, str]:
     theme_mode = "dark" if request.args.get("mode") == "dark" else "light"
-    background_default = _safe_css_value(
-        request.args.get("bg"),
-        "#121212" if theme_mode == "dark" else "#ffffff",
-    )
-    background_paper = _safe_css_value(
-        request.args.get("paper"),
-        "#1e1e1e" if theme_mode == "dark" else "#ffffff",
-    )
-    text_primary = _safe_css_value(
-        request.args.get("text"),
-        "#ffffff" if theme_mode == "dark" else "#111111",
-    )
-    divider = _safe_css_value(
-        request.args.get("divider"),
-        "rgba(255,255,255,0.12)" if theme_mode == "dark" else "rgba(0,0,0,0.12)",
-    )
-    action_hover = _safe_css_value(
-        request.args.get("hover"),
-        "rgba(255,255,255,0.08)" if theme_mode == "dark" else "rgba(0,0,0,0.04)",
-    )
-    injected_css = _quantstats_embed_css(
+    return (
         theme_mode,
-        background_default,
-        background_paper,
-        text_primary,
-        divider,
-        action_hover,
+        _safe_css_value(
+            request.args.get("bg"),
+            "#121212" if theme_mode == "dark" else "#ffffff",
+        ),
+        _safe_css_value(
+            request.args.get("paper"),
+            "#1e1e1e" if theme_mode == "dark" else "#ffffff",
+        ),
+        _safe_css_value(
+            request.args.get("text"),
+            "#ffffff" if theme_mode == "dark" else "#111111",
+        ),
+        _safe_css_value(
+            request.args.get("divider"),
+            "rgba(255,255,255,0.12)" if theme_mode == "dark" else "rgba(0,0,0,0.12)",
+        ),
+        _safe_css_value(
+            request.args.get("hover"),
+            "rgba(255,255,255,0.08)" if theme_mode == "dark" else "rgba(0,0,0,0.04)",
+        ),
     )
 
+
+def _build_embedded_report_html(raw_html: str, theme: tuple[str, str, str, str, str, str]) -> str:
+    injected_css = _quantstats_embed_css(*theme)
+
     html = re.sub(
         r"<body([^>]*)\sonload=[\"'][^\"']*[\"']([^>]*)>",
         r"<body\1\2>",
@@ -586,6 +836,84 @@ def _build_embedded_report_html(raw_html: str) -> str:
     return html
 
 
+@lru_cache(maxsize=EMBEDDED_REPORT_CACHE_SIZE)
+def _cached_embedded_report(
+    report_path: str,
+    mtime_ns: int,
+    size: int,
+    theme: tuple[str, str, str, str, str, str],
+) -> tuple[bytes, str]:
+    # mtime_ns and size only take part in the cache key, so a rewritten
+    # report misses the cache and old variants age out of the LRU.
+    with open(report_path, "r", encoding="utf-8") as f:
+        html = _build_embedded_report_html(f.read(), theme).encode("utf-8")
+    return html, hashlib.sha256(html).hexdigest()
+
+
+@lru_cache(maxsize=EMBEDDED_REPORT_CACHE_SIZE)
+def _cached_encoded_embedded_report(
+    report_path: str,
+    mtime_ns: int,
+    size: int,
+    theme: tuple[str, str, str, str, str, str],
+    encoding: str,
+) -> tuple[bytes, str]:
+    html, etag = _cached_embedded_report(report_path, mtime_ns, size, theme)
+    return compress_bytes(html, encoding), f"{etag}-{encoding}"
+
+
+def _negotiated_encoding(path: Path) -> str | None:
+    if not is_compressible(path):
+        return None
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def _embedded_report_response(report_path: Path) -> Response:
+    stat = report_path.stat()
+    cache_key = (str(report_path), stat.st_mtime_ns, stat.st_size, _embedded_report_theme())
+    encoding = _negotiated_encoding(report_path)
+    if encoding is None:
+        body, etag = _cached_embedded_report(*cache_key)
+    else:
+        body, etag = _cached_encoded_embedded_report(*cache_key, encoding)
+
+    response = Response(body, mimetype="text/html")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(stat.st_mtime, tz=ZoneInfo("UTC"))
+    # Reports are rewritten in place, so make browsers revalidate every time.
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _send_out_file(filename: str, mimetype: str) -> Response:
+    """Serve a file from OUT_DIR, preferring a .br/.gz sibling when the client accepts one."""
+    joined = safe_join(str(OUT_DIR), filename)
+    file_path = Path(joined) if joined else None
+    encoding = _negotiated_encoding(file_path) if file_path and file_path.is_file() else None
+    if encoding is None or file_path.stat().st_size < MIN_COMPRESS_BYTES:
+        response = send_from_directory(OUT_DIR, filename, mimetype=mimetype)
+        response.vary.add("Accept-Encoding")
+        return response
+
+    sibling = fresh_sibling(file_path, encoding)
+    if sibling is not None:
+        response = send_file(sibling, mimetype=mimetype, conditional=True, etag=True)
+    else:
+        # The live refresher rewrites CSV/JSON in place without siblings, so
+        # compress those here and keep the result until the file changes.
+        body, stat = compressed_file_bytes(file_path, encoding)
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(f"{encoding}-{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        response.last_modified = datetime.fromtimestamp(stat.st_mtime, tz=ZoneInfo("UTC"))
+        response = response.make_conditional(request)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
 def _extract_holdings(rows: list[dict]) -> list[dict]:
     holdings = []
     for row in rows:
@@ -672,12 +1000,22 @@ def _with_live_weights(weights_series: list[dict], live_snapshot: dict) -> list[
     return out
 
 
-def _apply_live_payload(payload: dict, holdings: list[dict], benchmark_ticker: str, quotes: dict) -> dict | None:
+def _apply_live_payload(
+    payload: dict,
+    holdings: list[dict],
+    benchmark_ticker: str,
+    quotes: dict,
+    alpha_sums: _DailyAlphaSums | None = None,
+) -> dict | None:
     live_snapshot = _compute_live_snapshot(holdings, benchmark_ticker, quotes)
     if not live_snapshot:
         return None
 
-    next_payload = copy.deepcopy(payload)
+    # Only the dicts on the path to each series are copied; series are shared views.
+    next_payload = {**payload}
+    for key in ("portfolio", "benchmark", "spread"):
+        if isinstance(payload.get(key), dict):
+            next_payload[key] = {**payload[key]}
     as_of_date = live_snapshot["as_of_date"]
     portfolio_return = live_snapshot["portfolio_return"]
     benchmark_return = live_snapshot["benchmark_return"]
@@ -755,6 +1093,7 @@ def _apply_live_payload(payload: dict, holdings: list[dict], benchmark_ticker: s
     next_payload["alpha"] = _build_daily_alpha_payload(
         next_payload.get("portfolio", {}).get("daily", []),
         next_payload.get("benchmark", {}).get("daily", []),
+        alpha_sums,
     )
     if not (portfolio_has_trade_today or benchmark_has_trade_today):
         next_payload["alpha"]["cumulative"] = _roll_forward_series(
@@ -831,12 +1170,13 @@ def _stream_polygon_stock_feed(tickers: list[str], emit, stop_event: threading.E
         })
 
     stream_targets = [
-        (POLYGON_REALTIME_STOCKS_WS_URL, "Live prices: Polygon streaming"),
-        (POLYGON_DELAYED_STOCKS_WS_URL, "Live prices: Polygon streaming (delayed)"),
+        ("realtime", POLYGON_REALTIME_STOCKS_WS_URL, "Live prices: Polygon streaming"),
+        ("delayed", POLYGON_DELAYED_STOCKS_WS_URL, "Live prices: Polygon streaming (delayed)"),
     ]
     last_stream_error = None
 
-    for ws_url, status_message in stream_targets:
+    for feed, ws_url, status_message in stream_targets:
+        subscribed = False
         try:
             with connect(ws_url, open_timeout=10, close_timeout=2) as ws:
                 ws.send(json.dumps({"action": "auth", "params": api_key}))
@@ -859,6 +1199,8 @@ def _stream_polygon_stock_feed(tickers: list[str], emit, stop_event: threading.E
 
                 params = ",".join(f"T.{ticker}" for ticker in tickers)
                 ws.send(json.dumps({"action": "subscribe", "params": params}))
+                subscribed = True
+                live_feed_connects.inc(feed, "subscribed")
                 emit({
                     "type": "status",
                     "transport": "stream",
@@ -895,6 +1237,10 @@ def _stream_polygon_stock_feed(tickers: list[str], emit, stop_event: threading.E
                         })
             return
         except Exception as exc:
+            if not subscribed:
+                live_feed_connects.inc(feed, "failed")
+            else:
+                live_feed_connects.inc(feed, "dropped")
             last_stream_error = exc
 
     emit({
@@ -994,6 +1340,10 @@ class LiveQuoteHub:
         if removed is not None and next_union != prev_union:
             self._restart_event.set()
 
+    def queue_depths(self) -> dict[int, int]:
+        with self._lock:
+            return {client_id: client["queue"].qsize() for client_id, client in self._clients.items()}
+
     def get_quotes(self, tickers: list[str] | set[str] | None = None) -> dict[str, dict]:
         with self._lock:
             if tickers is None:
@@ -1012,6 +1362,8 @@ class LiveQuoteHub:
         return sorted(self._base_tickers | client_tickers)
 
     def _broadcast(self, payload: dict):
+        message_type = payload.get("type")
+        live_quote_messages_in.inc(message_type, payload.get("transport"))
         with self._lock:
             if payload.get("type") == "status":
                 self._status_payload = copy.deepcopy(payload)
@@ -1029,13 +1381,18 @@ class LiveQuoteHub:
         if payload.get("type") == "status":
             for _, client_queue in clients:
                 client_queue.put(copy.deepcopy(payload))
+            live_quote_messages_out.inc(message_type, amount=len(clients))
             return
 
         quotes = normalized_quotes if payload.get("quotes") else {}
+        sent = 0
         for tickers, client_queue in clients:
             filtered = {ticker: copy.deepcopy(quote) for ticker, quote in quotes.items() if ticker in tickers}
             if filtered:
                 client_queue.put({**payload, "quotes": filtered})
+                sent += 1
+        if sent:
+            live_quote_messages_out.inc(message_type, amount=sent)
 
     def _run(self):
         while not self._stop_event.is_set():
@@ -1048,6 +1405,8 @@ class LiveQuoteHub:
                 continue
 
             _stream_polygon_stock_feed(tickers, self._broadcast, self._restart_event)
+            if not self._stop_event.is_set():
+                live_feed_restarts.inc()
 
 
 class LiveReportRefresher:
@@ -1055,6 +1414,7 @@ class LiveReportRefresher:
         self._quote_hub = quote_hub
         self._stop_event = threading.Event()
         self._worker = None
+        self._config_cache: dict[Path, dict] = {}
 
     def start(self):
         if self._worker and self._worker.is_alive():
@@ -1065,13 +1425,23 @@ class LiveReportRefresher:
 
     def _load_configs(self):
         configs = []
+        cached_configs = {}
         for account in _load_accounts():
             weights_path = OUT_DIR / Path(account.get("weights", "")).name
             report_path = OUT_DIR / Path(account.get("report", "")).name
             interactive_path = OUT_DIR / f"{report_path.stem}_interactive.json"
-            if not weights_path.exists() or not interactive_path.exists():
+            signature = (_file_signature(weights_path), _file_signature(interactive_path))
+            if signature[0] is None or signature[1] is None:
+                continue
+
+            cached = self._config_cache.get(interactive_path)
+            if cached is not None and cached["signature"] == signature and cached["weights_path"] == weights_path:
+                live_config_stats.record(hit=True)
+                configs.append(cached)
+                cached_configs[interactive_path] = cached
                 continue
 
+            live_config_stats.record(hit=False)
             try:
                 fieldnames, rows = _read_csv_rows(weights_path)
                 with open(interactive_path, "r", encoding="utf-8") as f:
@@ -1082,7 +1452,8 @@ class LiveReportRefresher:
             holdings = _extract_holdings(rows)
             benchmark_ticker = payload.get("benchmark", {}).get("ticker", "SPY")
             watch_tickers = {benchmark_ticker, *[holding["ticker"] for holding in holdings]}
-            configs.append({
+            config = {
+                "signature": signature,
                 "weights_path": weights_path,
                 "interactive_path": interactive_path,
                 "fieldnames": fieldnames,
@@ -1091,11 +1462,44 @@ class LiveReportRefresher:
                 "holdings": holdings,
                 "benchmark_ticker": benchmark_ticker,
                 "watch_tickers": watch_tickers,
-            })
+                # Lives as long as the parsed payload, so a rebuilt report starts fresh sums.
+                "alpha_sums": _DailyAlphaSums(),
+            }
+            configs.append(config)
+            cached_configs[interactive_path] = config
+
+        self._config_cache = cached_configs
         return configs
 
+    def _refresh_config(self, config: dict, quotes: dict):
+        refreshed_rows = _refresh_weights_rows(config["rows"], quotes)
+        if refreshed_rows != config["rows"]:
+            _write_csv_rows(config["weights_path"], config["fieldnames"], refreshed_rows)
+            live_report_files_written.inc("weights")
+            # Only display columns change, so the parsed holdings stay valid.
+            config["rows"] = refreshed_rows
+
+        refreshed_payload = _apply_live_payload(
+            config["payload"],
+            config["holdings"],
+            config["benchmark_ticker"],
+            quotes,
+            config["alpha_sums"],
+        )
+        if refreshed_payload and refreshed_payload != config["payload"]:
+            _write_json(config["interactive_path"], refreshed_payload)
+            live_report_files_written.inc("interactive")
+            config["payload"] = refreshed_payload
+
+        # Our own writes should not force a re-parse on the next cycle.
+        config["signature"] = (
+            _file_signature(config["weights_path"]),
+            _file_signature(config["interactive_path"]),
+        )
+
     def _run(self):
         while not self._stop_event.is_set():
+            cycle_started_at = time.perf_counter()
             configs = self._load_configs()
             base_tickers = sorted({ticker for config in configs for ticker in config["watch_tickers"]})
             self._quote_hub.set_base_tickers(base_tickers)
@@ -1104,26 +1508,31 @@ class LiveReportRefresher:
             if quotes:
                 for config in configs:
                     try:
-                        refreshed_rows = _refresh_weights_rows(config["rows"], quotes)
-                        if refreshed_rows != config["rows"]:
-                            _write_csv_rows(config["weights_path"], config["fieldnames"], refreshed_rows)
-
-                        refreshed_payload = _apply_live_payload(
-                            config["payload"],
-                            config["holdings"],
-                            config["benchmark_ticker"],
-                            quotes,
-                        )
-                        if refreshed_payload and refreshed_payload != config["payload"]:
-                            _write_json(config["interactive_path"], refreshed_payload)
+                        self._refresh_config(config, quotes)
                     except Exception:
+                        # Force a re-read from disk next cycle.
+                        self._config_cache.pop(config["interactive_path"], None)
                         continue
 
+            live_report_cycle_seconds.observe_since(cycle_started_at)
             self._stop_event.wait(LIVE_REPORT_REFRESH_SECONDS)
 
 
 quote_hub = LiveQuoteHub()
 live_report_refresher = LiveReportRefresher(quote_hub)
+
+telemetry.CallbackMetric(
+    "live_sse_clients",
+    "Connected /api/live/stocks/stream clients.",
+    (),
+    lambda: {(): len(quote_hub.queue_depths())},
+)
+telemetry.CallbackMetric(
+    "live_sse_client_queue_depth",
+    "Messages waiting in each SSE client's queue.",
+    ("client",),
+    lambda: {(client_id,): depth for client_id, depth in quote_hub.queue_depths().items()},
+)
 _services_started = False
 _services_lock = threading.Lock()
 
@@ -1162,6 +1571,34 @@ def list_accounts():
     return jsonify(data)
 
 
+@app.before_request
+def _start_request_timer():
+    request.environ["portfolio.started_at"] = time.perf_counter()
+
+
+@app.after_request
+def _observe_request_latency(response):
+    started_at = request.environ.get("portfolio.started_at")
+    if started_at is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        # Streaming responses are timed to the first byte, not to disconnect.
+        http_request_seconds.observe_since(started_at, route, request.method, str(response.status_code))
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(telemetry.render_metrics(), mimetype=telemetry.CONTENT_TYPE)
+
+
+@app.route("/api/cache/stats")
+def cache_stats():
+    return jsonify({
+        "accounts_index": accounts_index_stats.snapshot(),
+        "live_report_configs": live_config_stats.snapshot(),
+    })
+
+
 @app.route("/api/posthog/config")
 def posthog_config():
     return jsonify(build_posthog_public_config())
@@ -1175,14 +1612,17 @@ def posthog_proxy(proxy_path):
             proxy_path,
             method=request.method,
             query_params=list(request.args.items(multi=True)),
-            body=request.get_data(),
+            # Session recordings can be large; stream them through instead of buffering.
+            body=request.stream if request.content_length or request.headers.get("Transfer-Encoding") else None,
             headers=request.headers,
         )
+    except PostHogProxyBusyError:
+        return jsonify({"error": "PostHog proxy is busy"}), 503, {"Retry-After": "1"}
     except RuntimeError:
         return jsonify({"error": "PostHog is not configured"}), 404
     except requests.RequestException:
         return jsonify({"error": "Could not reach PostHog"}), 502
-    return Response(body, status=status_code, headers=headers)
+    return Response(body, status=status_code, headers=headers, direct_passthrough=True)
 
 
 @app.route("/api/live/stocks/stream")
@@ -1220,6 +1660,20 @@ def _json_body() -> dict:
     return request.get_json(silent=True) or {}
 
 
+def create_model_portfolio_report(body: dict, out_dir: Path, progress=None) -> dict:
+    # QuantStats drags in matplotlib, seaborn, and scipy; only pay for them
+    # once someone actually builds a model portfolio report.
+    from src.reports.model_portfolio import create_model_portfolio_report as build_report
+
+    return build_report(body, out_dir, progress=progress)
+
+
+def create_model_portfolio_sweep(body: dict, progress=None) -> dict:
+    from src.reports.model_portfolio import create_model_portfolio_sweep as build_sweep
+
+    return build_sweep(body, progress=progress)
+
+
 def _tool_error_response(exc: ToolDataError):
     return jsonify({"error": str(exc)}), exc.status_code
 
@@ -1437,6 +1891,155 @@ def tool_model_portfolio_report():
     )
     return jsonify(payload)
 
+
+@app.route("/api/tools/model-portfolio-sweep", methods=["POST"])
+def tool_model_portfolio_sweep():
+    started_at = time.perf_counter()
+    body = _json_body()
+    analytics_props = {
+        "tool_name": "model_portfolio_sweep",
+        "weight_set_count": _count_items(body.get("weightSets")) or 1,
+        "rebalance_period_count": _count_items(body.get("rebalancePeriods")) or 1,
+        "start_date_count": _count_items(body.get("startDates")) or 1,
+    }
+    try:
+        payload = create_model_portfolio_sweep(body)
+    except ToolDataError as exc:
+        _track_backend_api_event(
+            "/api/tools/model-portfolio-sweep",
+            started_at,
+            success=False,
+            status_code=exc.status_code,
+            extra_properties=analytics_props,
+        )
+        return _tool_error_response(exc)
+    _track_backend_api_event(
+        "/api/tools/model-portfolio-sweep",
+        started_at,
+        success=True,
+        status_code=200,
+        extra_properties={
+            **analytics_props,
+            "variant_count": _count_items(payload.get("variants")),
+        },
+    )
+    return jsonify(payload)
+
+# ============================================================
+#  API: background tool jobs
+# ============================================================
+tool_jobs = JobManager()
+
+
+def _cache_stat_samples() -> dict[tuple, int]:
+    samples = {}
+    for cache, stats in (("accounts_index", accounts_index_stats), ("live_report_configs", live_config_stats)):
+        snapshot = stats.snapshot()
+        samples[(cache, "hit")] = snapshot["hits"]
+        samples[(cache, "miss")] = snapshot["misses"]
+    return samples
+
+
+telemetry.CallbackMetric(
+    "cache_lookups_total",
+    "Server-side cache lookups by cache and outcome.",
+    ("cache", "result"),
+    _cache_stat_samples,
+    kind="counter",
+)
+telemetry.CallbackMetric(
+    "tool_jobs",
+    "Background tool jobs by state.",
+    ("state",),
+    lambda: {(state,): count for state, count in tool_jobs.stats().items()},
+)
+telemetry.CallbackMetric(
+    "posthog_backend_events_total",
+    "PostHog backend events by outcome.",
+    ("outcome",),
+    lambda: {
+        (outcome,): count
+        for outcome, count in backend_event_sender.stats().items()
+        if outcome != "queue_depth"
+    },
+    kind="counter",
+)
+telemetry.CallbackMetric(
+    "posthog_backend_queue_depth",
+    "PostHog backend events waiting for the batch worker.",
+    (),
+    lambda: {(): backend_event_sender.stats()["queue_depth"]},
+)
+
+_JOB_TOOLS = {
+    "model-portfolio-report": lambda body, progress: create_model_portfolio_report(body, OUT_DIR, progress=progress),
+    "model-portfolio-sweep": lambda body, progress: create_model_portfolio_sweep(body, progress=progress),
+    "market-cap-weights": lambda body, progress: market_cap_weights(
+        body.get("tickers"),
+        os.environ.get("POLYGON_API_KEY"),
+        progress=progress,
+    ),
+    "earnings-calendar": lambda body, progress: earnings_calendar(
+        body.get("tickers"),
+        body.get("start"),
+        body.get("end"),
+        os.environ.get("POLYGON_API_KEY"),
+        progress=progress,
+    ),
+}
+
+
+def _job_links(job) -> dict:
+    return {
+        "statusUrl": f"/api/jobs/{job.id}",
+        "eventsUrl": f"/api/jobs/{job.id}/events",
+    }
+
+
+@app.route("/api/tools/<tool>/jobs", methods=["POST"])
+def submit_tool_job(tool):
+    started_at = time.perf_counter()
+    run_tool = _JOB_TOOLS.get(tool)
+    if run_tool is None:
+        return jsonify({"error": f"Unknown tool {tool}"}), 404
+
+    body = _json_body()
+    try:
+        job, created = tool_jobs.submit(tool, body, lambda progress: run_tool(body, progress))
+    except JobCapacityError as exc:
+        return jsonify({"error": str(exc)}), 503, {"Retry-After": "5"}
+
+    _track_backend_api_event(
+        f"/api/tools/{tool}/jobs",
+        started_at,
+        success=True,
+        status_code=202,
+        extra_properties={"tool_name": tool.replace("-", "_"), "deduplicated": not created},
+    )
+    return jsonify({**job.to_dict(include_result=False), **_job_links(job)}), 202
+
+
+@app.route("/api/jobs/<job_id>")
+def get_tool_job(job_id):
+    job = tool_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify({**job.to_dict(), **_job_links(job)})
+
+
+@app.route("/api/jobs/<job_id>/events")
+def stream_tool_job(job_id):
+    job = tool_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    }
+    return Response(job_event_stream(job), mimetype="text/event-stream", headers=headers)
+
+
 # ============================================================
 #  Serve QuantStats HTML reports
 # ============================================================
@@ -1447,10 +2050,8 @@ def serve_report(filename):
     if not report_path.exists():
         return jsonify({"error": f"Report {filename} not found"}), 404
     if request.args.get("embed") == "1":
-        with open(report_path, "r", encoding="utf-8") as f:
-            html = _build_embedded_report_html(f.read())
-        return Response(html, mimetype="text/html")
-    return send_from_directory(OUT_DIR, filename, mimetype="text/html")
+        return _embedded_report_response(report_path)
+    return _send_out_file(filename, "text/html")
 
 # ============================================================
 #  Serve CSV data (weights/trades)
@@ -1461,7 +2062,7 @@ def serve_data(filename):
     csv_path = OUT_DIR / filename
     if not csv_path.exists():
         return jsonify({"error": f"Data file {filename} not found"}), 404
-    return send_from_directory(OUT_DIR, filename, mimetype="text/csv")
+    return _send_out_file(filename, "text/csv")
 
 # ============================================================
 #  React frontend routes
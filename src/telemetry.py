@@ -0,0 +1,231 @@
+"""In-process Prometheus metrics without a client library.
+
+Hot paths only ever touch a dict owned by the calling thread, so recording a
+sample takes no lock. A scrape sums every thread's dict; the registry lock is
+only taken when a thread records its first sample and when a scrape runs.
+Gauges are callbacks evaluated at scrape time, so they cost nothing in between.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Dead request threads are folded into one total once this many shards pile up.
+_SHARD_FOLD_THRESHOLD = 64
+
+_registry_lock = threading.Lock()
+_registry: list = []
+
+
+class _Shards:
+    """Per-thread accumulators: each thread writes only its own dict."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                if len(self._live) >= _SHARD_FOLD_THRESHOLD:
+                    self._fold_dead_shards()
+                self._live.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def add(self, key, amount: float = 1.0):
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def _fold_dead_shards(self):
+        live = []
+        for thread, shard in self._live:
+            if thread.is_alive():
+                live.append((thread, shard))
+                continue
+            for key, value in shard.items():
+                self._retired[key] = self._retired.get(key, 0.0) + value
+        self._live = live
+
+    def totals(self) -> dict:
+        with self._lock:
+            self._fold_dead_shards()
+            totals = dict(self._retired)
+            shards = [shard for _, shard in self._live]
+        for shard in shards:
+            # A C-level copy, so the owning thread can keep writing meanwhile.
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        with _registry_lock:
+            _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards()
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        self._shards.add(labelvalues, amount)
+
+    def values(self) -> dict[tuple, float]:
+        return self._shards.totals()
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards()
+
+    def observe(self, value: float, *labelvalues):
+        shard = self._shards._shard()
+        bucket_key = (labelvalues, bisect_left(self.buckets, value))
+        shard[bucket_key] = shard.get(bucket_key, 0.0) + 1
+        sum_key = (labelvalues, "sum")
+        shard[sum_key] = shard.get(sum_key, 0.0) + value
+
+    def observe_since(self, started_at: float, *labelvalues):
+        self.observe(time.perf_counter() - started_at, *labelvalues)
+
+    def snapshot(self) -> dict[tuple, dict]:
+        """Per label set: cumulative bucket counts (last is +Inf), count, and sum."""
+        series: dict[tuple, dict] = {}
+        for (labelvalues, slot), value in self._shards.totals().items():
+            entry = series.setdefault(labelvalues, {"counts": [0.0] * (len(self.buckets) + 1), "sum": 0.0})
+            if slot == "sum":
+                entry["sum"] += value
+            else:
+                entry["counts"][slot] += value
+        for entry in series.values():
+            running = 0.0
+            for index, count in enumerate(entry["counts"]):
+                running += count
+                entry["counts"][index] = running
+            entry["count"] = running
+        return series
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, entry in sorted(self.snapshot().items()):
+            for bound, count in zip((*self.buckets, float("inf")), entry["counts"]):
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(count)}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry['sum'])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(entry['count'])}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose samples come from `collect()` at scrape time.
+
+    `collect` returns `{labelvalues_tuple: value}`; exceptions drop the metric
+    from that scrape instead of failing it.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...], collect, kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def render(self) -> list[str]:
+        try:
+            samples = self._collect()
+        except Exception:
+            return []
+        lines = self._header()
+        for labelvalues, value in sorted(samples.items()):
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+def render_metrics() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+_POLYGON_PATH_TEMPLATES = (
+    (re.compile(r"^/v2/aggs/ticker/[^/]+/range/\d+/(\w+)/.*$"), r"/v2/aggs/ticker/{ticker}/range/{multiplier}/\1"),
+    (re.compile(r"^/v2/aggs/grouped/locale/(\w+)/market/(\w+)/[^/]+$"), r"/v2/aggs/grouped/locale/\1/market/\2/{date}"),
+    (re.compile(r"^/v3/reference/tickers/[^/]+$"), "/v3/reference/tickers/{ticker}"),
+)
+
+polygon_request_seconds = Histogram(
+    "polygon_http_request_duration_seconds",
+    "Latency of Polygon REST calls by endpoint template and status code.",
+    ("endpoint", "status"),
+)
+
+
+def polygon_endpoint(url: str) -> str:
+    """Collapse tickers, dates, and query strings out of a Polygon URL or path."""
+    path = urlsplit(url).path or "/"
+    for pattern, template in _POLYGON_PATH_TEMPLATES:
+        if pattern.match(path):
+            return pattern.sub(template, path)
+    return path
+
+
+def observe_polygon_request(url: str, started_at: float, status):
+    polygon_request_seconds.observe_since(started_at, polygon_endpoint(url), str(status))
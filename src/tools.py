@@ -2,20 +2,46 @@ import csv
 import json
 import math
 import os
+import random
 import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from urllib.parse import quote
 
 import requests
 
+from src import telemetry
+from src.util import BASE_DIR
 from src.yfinance_cache import yf
 
 
 POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
 MAX_SOURCE_TICKERS = 1000
-MAX_EARNINGS_TICKERS = 300
+MAX_EARNINGS_TICKERS = 1000
 MAX_ALGO_ROWS = 1000
+TICKER_REFERENCE_CACHE_DIR = BASE_DIR / "data" / ".cache" / "ticker-reference"
+# Market caps move daily; names, exchanges and types almost never do. Entries
+# holding a cap use the first TTL and profile-only entries the second. An
+# expired entry is still good enough to fall back on when a refresh fails.
+TICKER_REFERENCE_TTL_SECONDS = int(os.environ.get("TICKER_REFERENCE_TTL_SECONDS", str(24 * 60 * 60)))
+TICKER_PROFILE_TTL_SECONDS = int(os.environ.get("TICKER_PROFILE_TTL_SECONDS", str(30 * 24 * 60 * 60)))
+TICKER_REFERENCE_STALE_TTL_SECONDS = int(
+    os.environ.get("TICKER_REFERENCE_STALE_TTL_SECONDS", str(30 * 24 * 60 * 60))
+)
+TICKER_FETCH_WORKERS = int(os.environ.get("TICKER_FETCH_WORKERS", "8"))
+# Rate-limited upstream calls are retried this many times with jittered exponential backoff.
+UPSTREAM_MAX_RETRIES = int(os.environ.get("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_RETRY_BASE_SECONDS = float(os.environ.get("UPSTREAM_RETRY_BASE_SECONDS", "1.0"))
+UPSTREAM_RETRY_MAX_SECONDS = 30.0
+EARNINGS_CACHE_DIR = BASE_DIR / "data" / ".cache" / "earnings"
+# Estimates and upcoming dates move around; reported results do not.
+EARNINGS_ESTIMATED_TTL_SECONDS = int(os.environ.get("EARNINGS_ESTIMATED_TTL_SECONDS", str(24 * 60 * 60)))
+EARNINGS_REPORTED_TTL_SECONDS = int(os.environ.get("EARNINGS_REPORTED_TTL_SECONDS", str(30 * 24 * 60 * 60)))
+# After a failed refresh the previous entry is served for this long before Yahoo is tried again.
+EARNINGS_RETRY_SECONDS = int(os.environ.get("EARNINGS_RETRY_SECONDS", str(15 * 60)))
 
 
 class ToolDataError(RuntimeError):
@@ -80,15 +106,30 @@ def _polygon_error(response: requests.Response) -> str:
     return message or f"Polygon request failed with status {response.status_code}"
 
 
+def _retry_delay_seconds(attempt: int, retry_after: str | None = None) -> float:
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = UPSTREAM_RETRY_BASE_SECONDS * 2 ** attempt * random.uniform(1.0, 1.5)
+    return min(max(delay, 0.0), UPSTREAM_RETRY_MAX_SECONDS)
+
+
 def _polygon_get(path_or_url: str, params: dict | None = None, api_key: str | None = None) -> dict:
     key = _polygon_key(api_key)
     url = path_or_url if path_or_url.startswith("http") else f"{POLYGON_BASE_URL}{path_or_url}"
     request_params = dict(params or {})
     request_params["apiKey"] = key
-    try:
-        response = requests.get(url, params=request_params, timeout=20)
-    except requests.RequestException as exc:
-        raise ToolDataError(f"Polygon request failed: {exc.__class__.__name__}", 502) from exc
+    for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+        started_at = time.perf_counter()
+        try:
+            response = requests.get(url, params=request_params, timeout=20)
+        except requests.RequestException as exc:
+            telemetry.observe_polygon_request(url, started_at, "error")
+            raise ToolDataError(f"Polygon request failed: {exc.__class__.__name__}", 502) from exc
+        telemetry.observe_polygon_request(url, started_at, response.status_code)
+        if response.status_code != 429 or attempt == UPSTREAM_MAX_RETRIES:
+            break
+        time.sleep(_retry_delay_seconds(attempt, response.headers.get("Retry-After")))
     if response.status_code >= 400:
         raise ToolDataError(_polygon_error(response), 502)
     return response.json()
@@ -581,18 +622,135 @@ def algo_output_processor(
     }
 
 
-def _fetch_ticker_overviews(tickers: list[str], api_key: str | None = None) -> dict[str, dict]:
-    details = {}
-    for ticker in tickers:
+def _reference_cache_path(source: str, ticker: str) -> Path:
+    return TICKER_REFERENCE_CACHE_DIR / source / f"{ticker}.json"
+
+
+def _load_reference_entry(source: str, ticker: str) -> tuple[dict, float] | None:
+    """Cached results for `ticker` and their age in seconds."""
+    path = _reference_cache_path(source, ticker)
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    return cached.get("results") or {}, time.time() - float(cached.get("fetched_at") or 0)
+
+
+def _load_reference_cache(source: str, ticker: str, max_age_seconds: int) -> dict | None:
+    entry = _load_reference_entry(source, ticker)
+    if entry is None or entry[1] > max_age_seconds:
+        return None
+    return entry[0]
+
+
+def _save_reference_cache(source: str, ticker: str, results: dict):
+    path = _reference_cache_path(source, ticker)
+    try:
+        encoded = json.dumps({"fetched_at": time.time(), "results": results})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(encoded, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        # The cache is an optimization; a read-only data dir should not fail the tool.
+        return
+
+
+_inflight_lock = threading.Lock()
+_inflight_fetches: dict[tuple[str, str], Future] = {}
+_fetch_pool_lock = threading.Lock()
+_fetch_pool = None
+
+
+def _ticker_fetch_pool() -> ThreadPoolExecutor:
+    """One pool for every per-ticker upstream lookup, so concurrent requests share TICKER_FETCH_WORKERS."""
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=max(1, TICKER_FETCH_WORKERS), thread_name_prefix="ticker-fetch")
+        return _fetch_pool
+
+
+def _shared_fetch(key: tuple[str, str], fetch):
+    """Run `fetch` once per key even when several requests ask for it at the same time."""
+    with _inflight_lock:
+        future = _inflight_fetches.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight_fetches[key] = future
+
+    if owner:
         try:
-            payload = _polygon_get(f"/v3/reference/tickers/{quote(ticker, safe='')}", {}, api_key)
-        except ToolDataError as exc:
-            details[ticker] = {"_polygon_error": str(exc)}
-            continue
-        details[ticker] = payload.get("results") or {}
+            future.set_result(fetch())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with _inflight_lock:
+                _inflight_fetches.pop(key, None)
+    return future.result()
+
+
+def _cached_reference_lookup(source: str, tickers: list[str], fetch_one, ttl_seconds=None) -> dict[str, dict]:
+    """Fetch per-ticker reference data through the disk cache, in parallel and deduplicated.
+
+    `fetch_one(ticker)` returns `(details, cacheable)`; uncacheable results (errors)
+    fall back to an expired cache entry when one is available. `ttl_seconds(details)`
+    picks an entry's lifetime, TICKER_REFERENCE_TTL_SECONDS by default.
+    """
+    details = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        entry = _load_reference_entry(source, ticker)
+        if entry is not None:
+            cached, age = entry
+            if age <= (TICKER_REFERENCE_TTL_SECONDS if ttl_seconds is None else ttl_seconds(cached)):
+                details[ticker] = cached
+                continue
+        missing.append(ticker)
+    if not missing:
+        return details
+
+    def load(ticker: str) -> dict:
+        result, cacheable = fetch_one(ticker)
+        if cacheable:
+            _save_reference_cache(source, ticker, result)
+            return result
+        stale = _load_reference_cache(source, ticker, TICKER_REFERENCE_STALE_TTL_SECONDS)
+        return stale if stale is not None else result
+
+    results = _ticker_fetch_pool().map(lambda ticker: _shared_fetch((source, ticker), lambda: load(ticker)), missing)
+    details.update(zip(missing, results))
     return details
 
 
+def _fetch_ticker_overview(ticker: str, api_key: str | None = None) -> tuple[dict, bool]:
+    try:
+        payload = _polygon_get(f"/v3/reference/tickers/{quote(ticker, safe='')}", {}, api_key)
+    except ToolDataError as exc:
+        return {"_polygon_error": str(exc)}, False
+    return payload.get("results") or {}, True
+
+
+def _ticker_overview_ttl(overview: dict) -> int:
+    # ETF overviews have no market cap, only the slow-moving profile fields.
+    if _is_etf_overview(overview) and _to_float(overview.get("market_cap")) is None:
+        return TICKER_PROFILE_TTL_SECONDS
+    return TICKER_REFERENCE_TTL_SECONDS
+
+
+def _fetch_ticker_overviews(tickers: list[str], api_key: str | None = None) -> dict[str, dict]:
+    return _cached_reference_lookup(
+        "polygon",
+        tickers,
+        lambda ticker: _fetch_ticker_overview(ticker, api_key),
+        _ticker_overview_ttl,
+    )
+
+
 def _is_etf_overview(item: dict) -> bool:
     ticker_type = str(item.get("type") or "").upper()
     name = str(item.get("name") or "").upper()
@@ -613,39 +771,71 @@ def _dict_get(value, *keys):
     return None
 
 
-def _fetch_yfinance_market_caps(tickers: list[str]) -> dict[str, dict]:
-    if yf is None or not tickers:
-        return {}
-
-    details = {}
-    for ticker in tickers:
+def _yfinance_with_backoff(fetch):
+    """Call `fetch`, retrying with backoff while Yahoo answers with its rate-limit error."""
+    for attempt in range(UPSTREAM_MAX_RETRIES + 1):
         try:
-            yf_ticker = yf.Ticker(ticker)
-            fast_info = getattr(yf_ticker, "fast_info", {}) or {}
-            info = getattr(yf_ticker, "info", {}) or {}
+            return fetch()
         except Exception as exc:
-            details[ticker] = {"_yfinance_error": str(exc)}
-            continue
+            # Matched by name so older yfinance releases without the class still work.
+            if type(exc).__name__ != "YFRateLimitError" or attempt == UPSTREAM_MAX_RETRIES:
+                raise
+        time.sleep(_retry_delay_seconds(attempt))
+
 
-        market_cap = _to_float(_dict_get(fast_info, "marketCap", "market_cap"))
+def _fetch_yfinance_market_cap(ticker: str) -> tuple[dict, bool]:
+    def lookup():
+        yf_ticker = yf.Ticker(ticker)
+        market_cap = _to_float(_dict_get(getattr(yf_ticker, "fast_info", {}) or {}, "marketCap", "market_cap"))
         if market_cap is None:
-            market_cap = _to_float(_dict_get(info, "marketCap", "market_cap"))
+            market_cap = _to_float(_dict_get(getattr(yf_ticker, "info", {}) or {}, "marketCap", "market_cap"))
+        return market_cap
 
-        details[ticker] = {
-            "market_cap": market_cap,
-            "name": _dict_get(info, "longName", "shortName", "displayName"),
-            "currency": _dict_get(fast_info, "currency") or _dict_get(info, "currency", "financialCurrency"),
-            "exchange": _dict_get(fast_info, "exchange") or _dict_get(info, "exchange", "fullExchangeName"),
-            "type": _dict_get(info, "quoteType"),
-        }
-    return details
+    try:
+        market_cap = _yfinance_with_backoff(lookup)
+    except Exception as exc:
+        return {"_yfinance_error": str(exc)}, False
+    # yfinance reports throttling and lookup failures as empty info, so a missing
+    # cap is not cached and an older entry is used instead when there is one.
+    return {"market_cap": market_cap}, market_cap is not None
 
 
-def market_cap_weights(tickers, api_key: str | None = None) -> dict:
+def _fetch_yfinance_profile(ticker: str) -> tuple[dict, bool]:
+    try:
+        info = _yfinance_with_backoff(lambda: getattr(yf.Ticker(ticker), "info", {}) or {})
+    except Exception as exc:
+        return {"_yfinance_error": str(exc)}, False
+    profile = {
+        "name": _dict_get(info, "longName", "shortName", "displayName"),
+        "currency": _dict_get(info, "currency", "financialCurrency"),
+        "exchange": _dict_get(info, "exchange", "fullExchangeName"),
+        "type": _dict_get(info, "quoteType"),
+    }
+    return profile, profile["name"] is not None or profile["type"] is not None
+
+
+def _fetch_yfinance_market_caps(tickers: list[str]) -> dict[str, dict]:
+    if not yf or not tickers:
+        return {}
+    # Caps come from the light `fast_info` call and are refreshed daily; the
+    # `info` scrape behind names and exchanges is only repeated once a month.
+    market_caps = _cached_reference_lookup("yfinance", tickers, _fetch_yfinance_market_cap)
+    profiles = _cached_reference_lookup(
+        "yfinance-profile",
+        tickers,
+        _fetch_yfinance_profile,
+        lambda profile: TICKER_PROFILE_TTL_SECONDS,
+    )
+    return {ticker: {**profiles.get(ticker, {}), **market_caps.get(ticker, {})} for ticker in market_caps}
+
+
+def market_cap_weights(tickers, api_key: str | None = None, progress=None) -> dict:
     normalized = normalize_tickers(tickers)
     if not normalized:
         raise ToolDataError("Add at least one stock ticker", 400)
 
+    if progress is not None:
+        progress("fetching_reference", f"Looking up {len(normalized)} tickers")
     details = _fetch_ticker_overviews(normalized, api_key)
     yfinance_candidates = [
         ticker
@@ -653,7 +843,11 @@ def market_cap_weights(tickers, api_key: str | None = None) -> dict:
         if not _is_etf_overview(details.get(ticker) or {})
         and not (_to_float((details.get(ticker) or {}).get("market_cap")) or 0) > 0
     ]
+    if progress is not None and yfinance_candidates:
+        progress("fetching_fallbacks", f"Checking Yahoo Finance for {len(yfinance_candidates)} tickers")
     yfinance_details = _fetch_yfinance_market_caps(yfinance_candidates)
+    if progress is not None:
+        progress("computing", "Computing weights")
     rows = []
     total = 0.0
 
@@ -827,8 +1021,8 @@ def _calendar_dates(calendar: dict) -> list[date]:
     return [event_date for event_date in (_date_from_any(value) for value in raw_dates) if event_date is not None]
 
 
-def _yfinance_earnings_events(ticker: str, start_date: date, end_date: date) -> tuple[list[dict], list[str]]:
-    if yf is None:
+def _yfinance_earnings_events(ticker: str) -> tuple[list[dict], list[str]]:
+    if not yf:
         raise ToolDataError("yfinance is required for earnings calendar data", 502)
 
     warnings = []
@@ -846,7 +1040,7 @@ def _yfinance_earnings_events(ticker: str, start_date: date, end_date: date) ->
     if frame is not None and not frame.empty:
         for event_dt, row in frame.iterrows():
             event_date = _date_from_any(event_dt)
-            if event_date is None or event_date < start_date or event_date > end_date:
+            if event_date is None:
                 continue
 
             estimated_eps = _to_float(row.get("EPS Estimate"))
@@ -880,8 +1074,6 @@ def _yfinance_earnings_events(ticker: str, start_date: date, end_date: date) ->
 
     if calendar:
         for event_date in _calendar_dates(calendar):
-            if event_date < start_date or event_date > end_date:
-                continue
             estimated_eps = _to_float(calendar.get("Earnings Average"))
             estimated_revenue = _to_float(calendar.get("Revenue Average"))
             if event_date in seen_dates:
@@ -913,7 +1105,100 @@ def _yfinance_earnings_events(ticker: str, start_date: date, end_date: date) ->
     return events, warnings
 
 
-def earnings_calendar(tickers, start: str | None = None, end: str | None = None, api_key: str | None = None) -> dict:
+def _earnings_cache_path(ticker: str) -> Path:
+    return EARNINGS_CACHE_DIR / f"{ticker}.json"
+
+
+def _load_earnings_cache(ticker: str) -> dict | None:
+    try:
+        with open(_earnings_cache_path(ticker), "r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or not isinstance(cached.get("events"), list):
+        return None
+    return cached
+
+
+def _save_earnings_cache(
+    ticker: str,
+    events: list[dict],
+    warnings: list[str],
+    fetched_at: float | None = None,
+    retry_after: float | None = None,
+):
+    path = _earnings_cache_path(ticker)
+    entry = {"fetched_at": time.time() if fetched_at is None else fetched_at, "events": events, "warnings": warnings}
+    if retry_after is not None:
+        entry["retry_after"] = retry_after
+    try:
+        encoded = json.dumps(entry)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(encoded, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        return
+
+
+def _events_in_window(events: list[dict], start_date: date, end_date: date) -> list[dict]:
+    start_text = start_date.isoformat()
+    end_text = end_date.isoformat()
+    return [event for event in events if start_text <= (event.get("date") or "") <= end_text]
+
+
+def _cached_earnings_usable(cached: dict, start_date: date, end_date: date) -> bool:
+    fetched_at = float(cached.get("fetched_at") or 0)
+    age = time.time() - fetched_at
+    if age <= EARNINGS_ESTIMATED_TTL_SECONDS or time.time() < float(cached.get("retry_after") or 0):
+        return True
+    # A window that ended before the fetch can only hold reported events, which
+    # Yahoo does not revise, so it may be served from a much older fetch.
+    return (
+        age <= EARNINGS_REPORTED_TTL_SECONDS
+        and not cached.get("warnings")
+        and end_date < date.fromtimestamp(fetched_at)
+        and all(
+            event.get("date_status") == "reported"
+            for event in _events_in_window(cached["events"], start_date, end_date)
+        )
+    )
+
+
+def _refresh_earnings_cache(ticker: str, previous: dict | None) -> dict:
+    events, warnings = _yfinance_earnings_events(ticker)
+    if previous and not events and warnings:
+        # Keep serving the last good fetch, and remember the failure so an outage
+        # is retried every EARNINGS_RETRY_SECONDS rather than on every request.
+        retry_after = time.time() + EARNINGS_RETRY_SECONDS
+        _save_earnings_cache(ticker, previous["events"], warnings, previous.get("fetched_at"), retry_after)
+        return {**previous, "warnings": warnings, "retry_after": retry_after}
+
+    fetched_dates = {event["date"] for event in events}
+    for event in (previous or {}).get("events", []):
+        if event.get("date_status") == "reported" and event.get("date") not in fetched_dates:
+            events.append(event)
+    _save_earnings_cache(ticker, events, warnings)
+    return {"events": events, "warnings": warnings}
+
+
+def _cached_earnings_events(ticker: str, start_date: date, end_date: date) -> tuple[list[dict], list[str]]:
+    try:
+        cached = _load_earnings_cache(ticker)
+        if cached is None or not _cached_earnings_usable(cached, start_date, end_date):
+            cached = _shared_fetch(("earnings", ticker), lambda: _refresh_earnings_cache(ticker, cached))
+    except ToolDataError as exc:
+        return [], [f"{ticker}: {exc}"]
+    return _events_in_window(cached["events"], start_date, end_date), list(cached.get("warnings") or [])
+
+
+def earnings_calendar(
+    tickers,
+    start: str | None = None,
+    end: str | None = None,
+    api_key: str | None = None,
+    progress=None,
+) -> dict:
     normalized = normalize_tickers(tickers)
     if not normalized:
         raise ToolDataError("Add at least one stock ticker", 400)
@@ -930,15 +1215,12 @@ def earnings_calendar(tickers, start: str | None = None, end: str | None = None,
 
     events = []
     warnings = []
-    for ticker in normalized:
-        try:
-            ticker_events, ticker_warnings = _yfinance_earnings_events(ticker, start_date, end_date)
-        except ToolDataError as exc:
-            warnings.append(f"{ticker}: {exc}")
-            continue
-
+    results = _ticker_fetch_pool().map(lambda ticker: _cached_earnings_events(ticker, start_date, end_date), normalized)
+    for index, (ticker_events, ticker_warnings) in enumerate(results, start=1):
         events.extend(ticker_events)
         warnings.extend(ticker_warnings)
+        if progress is not None:
+            progress("fetching_earnings", f"{index}/{len(normalized)} tickers")
 
     events.sort(key=lambda item: (item.get("date") or "", item.get("time") or "", item.get("ticker") or ""))
     return {
@@ -1,15 +1,57 @@
-from src.util import BASE_DIR
+import importlib
+import importlib.util
+import threading
 
-try:
-    import yfinance as yf
-except ImportError:
-    yf = None
+from src.util import BASE_DIR
 
 
 YFINANCE_CACHE_DIR = BASE_DIR / "data" / ".cache" / "yfinance"
 YFINANCE_HISTORY_CACHE_DIR = YFINANCE_CACHE_DIR / "history"
 
-YFINANCE_HISTORY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+_load_lock = threading.Lock()
+_yfinance_module = None
+_yfinance_loaded = False
+
+
+def load_yfinance():
+    """Import yfinance on first use and point its tz cache at the shared cache dir."""
+    global _yfinance_module, _yfinance_loaded
+    if _yfinance_loaded:
+        return _yfinance_module
+
+    with _load_lock:
+        if _yfinance_loaded:
+            return _yfinance_module
+        try:
+            module = importlib.import_module("yfinance")
+        except ImportError:
+            module = None
+
+        if module is not None:
+            YFINANCE_HISTORY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            module.set_tz_cache_location(str(YFINANCE_CACHE_DIR))
+
+        _yfinance_module = module
+        _yfinance_loaded = True
+    return _yfinance_module
+
+
+class _LazyYFinance:
+    """Stand-in for the yfinance module that defers the import until an attribute is used.
+
+    Falsy when yfinance is not installed, so callers can keep `if not yf:` guards.
+    """
+
+    def __bool__(self):
+        if _yfinance_loaded:
+            return _yfinance_module is not None
+        return importlib.util.find_spec("yfinance") is not None
+
+    def __getattr__(self, name):
+        module = load_yfinance()
+        if module is None:
+            raise AttributeError(f"yfinance is not installed (needed for yf.{name})")
+        return getattr(module, name)
+
 
-if yf is not None:
-    yf.set_tz_cache_location(str(YFINANCE_CACHE_DIR))
+yf = _LazyYFinance()
@@ -1,4 +1,5 @@
 import json
+import os
 
 import pandas as pd
 import pytest
@@ -14,6 +15,7 @@ from src.reports.analyze_fidelity import (
     _holding_today_gl_series,
     _is_invalid_sell_post_quantity,
     _load_generated_accounts_index,
+    _quantstats_report_is_fresh,
     _statement_cash_income_series,
     _trade_aware_portfolio_returns,
     _write_quantstats_report,
@@ -292,11 +294,12 @@ def test_fetch_polygon_prices_with_minimum_history_backfills_when_initial_window
         pd.Timestamp("2026-05-25"),
     )
 
+    # 2026-05-25 is Memorial Day, so the window already starts a session early.
     assert calls == [
-        (("AAA", "VT"), "2026-05-22", "2026-05-25"),
         (("AAA", "VT"), "2026-05-21", "2026-05-25"),
+        (("AAA", "VT"), "2026-05-20", "2026-05-25"),
     ]
-    assert fetch_start == pd.Timestamp("2026-05-21")
+    assert fetch_start == pd.Timestamp("2026-05-20")
     assert list(prices.index) == list(pd.to_datetime(["2026-05-21", "2026-05-22"]))
 
 
@@ -464,3 +467,21 @@ def test_write_quantstats_report_falls_back_for_flat_short_history(tmp_path, mon
     assert generated is False
     assert called["value"] is False
     assert "Too short" in report_path.read_text(encoding="utf-8")
+
+
+def test_quantstats_report_is_refreshed_when_statements_change_or_render_ages_out(tmp_path):
+    report_path = tmp_path / "report_0.html"
+    source_path = tmp_path / "combined.csv"
+    source_path.write_text("Run Date\n", encoding="utf-8")
+
+    assert _quantstats_report_is_fresh(report_path, source_path, 3600) is False
+
+    report_path.write_text("<html></html>", encoding="utf-8")
+    source_mtime = source_path.stat().st_mtime - 100
+    os.utime(source_path, (source_mtime, source_mtime))
+    os.utime(report_path, (source_mtime + 10, source_mtime + 10))
+    assert _quantstats_report_is_fresh(report_path, source_path, 3600) is True
+    assert _quantstats_report_is_fresh(report_path, source_path, -1) is False
+
+    os.utime(source_path, (source_mtime + 20, source_mtime + 20))
+    assert _quantstats_report_is_fresh(report_path, source_path, 3600) is False
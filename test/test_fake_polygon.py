@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+import requests
+
+from bench.fake_polygon import FakeMarket, FakePolygonServer
+from bench.synthetic_statements import synthetic_market
+from src import server, tools
+from src.reports import polygon
+
+
+@pytest.fixture
+def fake_polygon(monkeypatch):
+    market = FakeMarket(synthetic_market(["AAA", "BBB"], "2024-01-02", "2026-03-31", seed=3, splits_per_year=2.0), end="2026-03-31")
+    with FakePolygonServer(market) as fake:
+        monkeypatch.setenv("POLYGON_API_KEY", "fake")
+        for module in (polygon, server, tools):
+            monkeypatch.setattr(module, "POLYGON_BASE_URL", fake.base_url)
+        yield fake
+
+
+def test_reference_splits_follow_next_url_pagination(fake_polygon, monkeypatch, tmp_path):
+    monkeypatch.setattr(polygon, "REFERENCE_CACHE_DIR", tmp_path)
+    expected = fake_polygon.fake.market.splits("AAA")
+    assert len(expected) > 1
+
+    first_page = requests.get(
+        f"{fake_polygon.base_url}/v3/reference/splits",
+        params={"ticker": "AAA", "limit": 1, "apiKey": "fake"},
+        timeout=5,
+    ).json()
+    assert first_page["results"] == expected[:1]
+    assert "next_url" in first_page
+
+    assert polygon.get_polygon_splits(["AAA"], "2024-01-01", "2026-03-31")["AAA"] == expected
+
+
+def test_rate_limit_and_error_knobs(fake_polygon, monkeypatch):
+    monkeypatch.setattr(tools, "UPSTREAM_MAX_RETRIES", 0)
+    fake_polygon.fake.configure(rate_limit=1, burst=1)
+    assert tools._polygon_get("/v3/reference/tickers/AAA")["results"]["ticker"] == "AAA"
+    with pytest.raises(tools.ToolDataError, match="exceeded the maximum requests"):
+        tools._polygon_get("/v3/reference/tickers/AAA")
+
+    fake_polygon.fake.configure(error_rate=1.0, error_status=503)
+    with pytest.raises(requests.HTTPError):
+        server._fetch_stock_snapshots(["AAA"])
+
+    stats = requests.get(f"{fake_polygon.base_url}/_fake/stats", timeout=5).json()
+    assert stats["rate_limited"] == 1
+    assert stats["injected_errors"] == 1
+
+
+def test_live_feed_snapshots_then_streams_trades(fake_polygon, monkeypatch):
+    fake_polygon.fake.configure(trade_interval_ms=20)
+    monkeypatch.setattr(server, "POLYGON_REALTIME_STOCKS_WS_URL", fake_polygon.ws_url)
+    stop_event = threading.Event()
+    messages = []
+
+    def emit(message):
+        messages.append(message)
+        if message["type"] == "quote":
+            stop_event.set()
+
+    feed = threading.Thread(target=server._stream_polygon_stock_feed, args=(["AAA", "BBB"], emit, stop_event))
+    feed.start()
+    feed.join(timeout=10)
+    stop_event.set()
+
+    assert [message["type"] for message in messages[:2]] == ["snapshot", "status"]
+    assert set(messages[0]["quotes"]) == {"AAA", "BBB"}
+    assert messages[1]["transport"] == "stream"
+    assert messages[-1]["type"] == "quote"
+    assert set(messages[-1]["quotes"]) <= {"AAA", "BBB"}
@@ -0,0 +1,104 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from src.reports import figures
+
+
+def _fake_quantstats_html(returns, rf, benchmark, output, title):
+    sections = []
+    for name in ("returns", "drawdown"):
+        figfile = BytesIO()
+        getattr(figures.qs.reports._plots, name)(
+            returns,
+            benchmark,
+            figsize=(8, 4),
+            savefig={"fname": figfile, "format": "svg"},
+            show=False,
+        )
+        sections.append(f"<div>{figfile.getvalue().decode()}</div>")
+    output.write_text(f"<html><h1>{title}</h1>{''.join(sections)}</html>", encoding="utf-8")
+
+
+def _returns(values, name):
+    return pd.Series(values, index=pd.bdate_range("2026-01-02", periods=len(values)), name=name)
+
+
+def test_render_quantstats_report_fills_figures_and_reuses_cached_svgs(monkeypatch, tmp_path):
+    rendered = []
+
+    def fake_render(name, args, kwargs):
+        rendered.append(name)
+        return f"<svg>{name} {args[0].iloc[-1]}</svg>".encode()
+
+    monkeypatch.setattr(figures.qs.reports, "html", _fake_quantstats_html)
+    monkeypatch.setattr(figures, "_render_figure", fake_render)
+    monkeypatch.setattr(figures, "QUANTSTATS_RENDER_WORKERS", 1)
+    returns = _returns([0.0, 0.01, -0.02], "Portfolio")
+    benchmark = _returns([0.0, 0.005, 0.001], "VT")
+    cache_dir = tmp_path / "figures"
+
+    output = tmp_path / "report.html"
+    figures.render_quantstats_report(returns, benchmark, output, title="Report", rf=0.04, cache_dir=cache_dir)
+
+    html = output.read_text(encoding="utf-8")
+    assert "<svg>returns -0.02</svg>" in html
+    assert "<svg>drawdown -0.02</svg>" in html
+    assert "quantstats-figure" not in html
+    assert figures.qs.reports._plots is figures.qs.plots
+    assert len(list(cache_dir.glob("*.svg"))) == 2
+
+    figures.render_quantstats_report(returns, benchmark, tmp_path / "again.html", title="Report", rf=0.04, cache_dir=cache_dir)
+    assert rendered == ["returns", "drawdown"]
+    assert (tmp_path / "again.html").read_text(encoding="utf-8") == html
+
+    figures.render_quantstats_report(
+        _returns([0.0, 0.01, 0.03], "Portfolio"),
+        benchmark,
+        tmp_path / "changed.html",
+        title="Report",
+        rf=0.04,
+        cache_dir=cache_dir,
+    )
+    assert rendered == ["returns", "drawdown", "returns", "drawdown"]
+
+
+def test_figure_cache_key_tracks_data_labels_and_options():
+    returns = _returns([0.0, 0.01], "Portfolio")
+    key = figures._figure_cache_key("returns", (returns, None), {"figsize": (8, 4)})
+
+    assert key == figures._figure_cache_key("returns", (returns.copy(), None), {"figsize": (8, 4)})
+    assert key != figures._figure_cache_key("returns", (returns.rename("Other"), None), {"figsize": (8, 4)})
+    assert key != figures._figure_cache_key("returns", (returns * 2, None), {"figsize": (8, 4)})
+    assert key != figures._figure_cache_key("returns", (returns, None), {"figsize": (8, 5)})
+    assert key != figures._figure_cache_key("log_returns", (returns, None), {"figsize": (8, 4)})
+
+
+def test_pooled_and_inline_rendering_produce_identical_reports(monkeypatch, tmp_path):
+    rng = np.random.default_rng(3)
+    returns = _returns(rng.normal(0.0005, 0.01, 300), "Portfolio")
+    benchmark = _returns(rng.normal(0.0004, 0.009, 300), "VT")
+
+    def render(label, workers):
+        monkeypatch.setattr(figures, "QUANTSTATS_RENDER_WORKERS", workers)
+        output = tmp_path / f"{label}.html"
+        figures.render_quantstats_report(
+            returns.copy(),
+            benchmark.copy(),
+            output,
+            title="Report",
+            rf=0.04,
+            cache_dir=tmp_path / label,
+        )
+        return output.read_text(encoding="utf-8")
+
+    figures._reset_render_pool()
+    try:
+        pooled = render("pooled", 2)
+    finally:
+        figures._reset_render_pool()
+    inline = render("inline", 1)
+
+    assert pooled == inline
+    assert "<!-- VT -->" in inline
@@ -0,0 +1,66 @@
+import json
+import threading
+
+from src import jobs
+from src.tools import ToolDataError
+
+
+def _wait_until_finished(job, timeout=5):
+    sent = 0
+    while not job.finished:
+        sent += len(job.wait_for_events(sent, timeout))
+    return job
+
+
+def test_job_manager_dedupes_identical_inflight_requests():
+    manager = jobs.JobManager(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def run(progress):
+        calls.append(1)
+        progress("fetching_prices", "Fetching prices for 2 symbols")
+        release.wait(5)
+        return {"ok": True}
+
+    first, first_created = manager.submit("market-cap-weights", {"tickers": ["AAPL", "MSFT"]}, run)
+    second, second_created = manager.submit("market-cap-weights", {"tickers": ["AAPL", "MSFT"]}, run)
+    other, other_created = manager.submit("market-cap-weights", {"tickers": ["NVDA"]}, run)
+    release.set()
+    for job in (first, other):
+        _wait_until_finished(job)
+
+    assert first_created and other_created and not second_created
+    assert second is first
+    assert calls == [1, 1]
+    assert first.to_dict()["result"] == {"ok": True}
+    assert [event["stage"] for event in first.events if event["type"] == "progress"] == ["started", "fetching_prices"]
+    assert first.events[-1] == {"type": "done", "status": "succeeded", "seq": 2}
+
+
+def test_job_manager_records_tool_errors_and_expires_results():
+    manager = jobs.JobManager(result_ttl_seconds=0)
+
+    def run(progress):
+        raise ToolDataError("Add at least one stock ticker", 400)
+
+    job, _ = manager.submit("earnings-calendar", {}, run)
+    _wait_until_finished(job)
+
+    assert job.to_dict()["error"] == "Add at least one stock ticker"
+    assert job.to_dict()["statusCode"] == 400
+    job.finished_at -= 1
+    assert manager.get(job.id) is None
+
+
+def test_job_event_stream_emits_progress_then_done():
+    manager = jobs.JobManager()
+    job, _ = manager.submit("earnings-calendar", {"tickers": ["AAPL"]}, lambda progress: {"events": []})
+    _wait_until_finished(job)
+
+    frames = list(jobs.job_event_stream(job))
+    payloads = [json.loads(frame.split("data: ", 1)[1]) for frame in frames if "data: " in frame]
+
+    assert frames[0] == "retry: 3000\n\n"
+    assert payloads[0]["stage"] == "started"
+    assert payloads[-1] == {"type": "done", "status": "succeeded", "seq": 1}
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reports.metrics import performance_summary, rolling_beta, summary_metrics
+
+
+def test_summary_metrics_handles_series_that_start_later():
+    dates = pd.to_datetime(["2025-01-01", "2025-07-02", "2026-01-01"])
+    returns = np.array(
+        [
+            [0.0, np.nan],
+            [0.5, 0.0],
+            [-0.2, 0.1],
+        ]
+    )
+
+    metrics = summary_metrics(returns, dates, rf=0.0)
+
+    assert metrics["total_return"] == pytest.approx([0.2, 0.1])
+    assert metrics["cagr"][0] == pytest.approx(0.2)
+    assert metrics["cagr"][1] == pytest.approx(1.1 ** (365 / 183) - 1.0)
+    assert metrics["max_drawdown"] == pytest.approx([-0.2, 0.0])
+    assert metrics["volatility"][1] == pytest.approx(np.std([0.0, 0.1], ddof=1) * np.sqrt(252))
+
+
+def test_summary_metrics_measures_cagr_over_each_series_own_span():
+    dates = pd.to_datetime(["2025-01-01", "2025-07-02", "2026-01-01"])
+    returns = np.array([[0.0], [0.1], [np.nan]])
+
+    metrics = summary_metrics(returns, dates, rf=0.0)
+
+    assert metrics["total_return"][0] == pytest.approx(0.1)
+    assert metrics["cagr"][0] == pytest.approx(1.1 ** (365 / 182) - 1.0)
+
+
+def test_summary_metrics_leaves_single_return_volatility_undefined():
+    metrics = summary_metrics(np.array([0.01]), pd.to_datetime(["2026-01-02"]))
+
+    assert np.isnan(metrics["volatility"][0])
+    assert np.isnan(metrics["cagr"][0])
+
+
+def test_performance_summary_reports_drawdowns_beta_and_monthly_returns():
+    dates = pd.bdate_range("2025-12-29", periods=6)
+    benchmark = pd.Series([0.0, 0.01, -0.02, 0.01, 0.0, 0.02], index=dates)
+    returns = 2.0 * benchmark
+
+    summary = performance_summary(returns, benchmark, rf=0.0)
+
+    assert summary["beta"] == pytest.approx(2.0)
+    assert summary["alpha"] == pytest.approx(0.0, abs=1e-12)
+    assert summary["portfolio"]["maxDrawdown"] == pytest.approx(-0.04)
+    assert summary["portfolio"]["maxDrawdownDate"] == "2025-12-31"
+    assert summary["portfolio"]["longestDrawdownDays"] == 6
+    assert [row["year"] for row in summary["monthlyReturns"]] == [2025, 2026]
+    assert summary["monthlyReturns"][0]["months"][11] == pytest.approx(1.02 * 0.96 - 1.0)
+    assert summary["monthlyReturns"][0]["months"][0] is None
+    assert summary["rollingBeta"]["6m"] == []
+
+
+def test_rolling_beta_matches_window_regression():
+    rng = np.random.default_rng(3)
+    benchmark = pd.Series(rng.normal(0.0, 0.01, 40), index=pd.bdate_range("2026-01-02", periods=40))
+    returns = 1.5 * benchmark + rng.normal(0.0, 0.002, 40)
+
+    beta = rolling_beta(returns, benchmark, 20)
+
+    window = slice(20, 40)
+    expected = np.cov(returns.iloc[window], benchmark.iloc[window])
+    assert beta.iloc[-1] == pytest.approx(expected[0, 1] / expected[1, 1])
+    assert beta.iloc[:19].isna().all()
@@ -1,5 +1,7 @@
 import json
+import os
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -278,6 +280,92 @@ def test_build_buy_and_hold_basket_supports_weekly_rebalancing():
     assert weekly["returns"].loc[pd.Timestamp("2026-03-09")] == pytest.approx(0.5)
 
 
+def _reference_rebalanced_basket(asset_returns, basis, rebalance_flags):
+    # The original day-by-day simulation, kept as the oracle for the segment engine.
+    current_values = basis.copy()
+    previous_total = float(current_values.sum())
+    value_rows, weight_rows, return_rows = [], [], []
+    for idx, date in enumerate(asset_returns.index):
+        if idx > 0:
+            current_values = current_values * (1.0 + asset_returns.loc[date])
+            pre_rebalance_total = float(current_values.sum())
+            daily_return = 0.0 if previous_total == 0 else pre_rebalance_total / previous_total - 1.0
+        else:
+            pre_rebalance_total = previous_total
+            daily_return = 0.0
+        if bool(rebalance_flags.loc[date]):
+            current_values = basis * pre_rebalance_total
+        close_total = float(current_values.sum())
+        value_rows.append(current_values.copy())
+        weight_rows.append(current_values / close_total if close_total else current_values * 0.0)
+        return_rows.append(daily_return)
+        previous_total = close_total
+    return (
+        pd.DataFrame(value_rows, index=asset_returns.index, columns=basis.index, dtype=float),
+        pd.DataFrame(weight_rows, index=asset_returns.index, columns=basis.index, dtype=float),
+        pd.Series(return_rows, index=asset_returns.index, dtype=float),
+    )
+
+
+@pytest.mark.parametrize("rebalance_period", ["none", "daily", "weekly", "monthly", "quarterly"])
+def test_build_buy_and_hold_basket_matches_day_by_day_simulation_exactly(rebalance_period):
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range("2024-01-02", periods=400)
+    symbols = [f"S{number:02d}" for number in range(23)]
+    asset_returns = pd.DataFrame(rng.normal(0.0004, 0.02, (len(index), len(symbols))), index=index, columns=symbols)
+    asset_returns.iloc[0] = 0.0
+    prices = (1.0 + asset_returns).cumprod() * 50.0
+    raw_weights = rng.uniform(0.1, 1.0, len(symbols))
+    holdings = [
+        {"ticker": ticker, "weight": weight}
+        for ticker, weight in zip(symbols, raw_weights / raw_weights.sum())
+    ]
+
+    basket = model_portfolio._build_buy_and_hold_basket(
+        prices,
+        holdings,
+        asset_returns,
+        index[0],
+        rebalance_period=rebalance_period,
+    )
+    expected_values, expected_weights, expected_returns = _reference_rebalanced_basket(
+        asset_returns,
+        basket["basis"],
+        model_portfolio._rebalance_close_flags(index, rebalance_period),
+    )
+
+    pd.testing.assert_frame_equal(basket["value_df"], expected_values, check_exact=True)
+    pd.testing.assert_frame_equal(basket["weights_df"], expected_weights, check_exact=True)
+    pd.testing.assert_series_equal(basket["returns"], expected_returns, check_exact=True)
+
+
+def test_build_buy_and_hold_basket_aligns_gappy_inputs_like_pandas():
+    index = pd.bdate_range("2026-01-02", periods=8)
+    prices = pd.DataFrame(
+        {
+            "AAA": [np.nan, 10.0, np.nan, 11.0, 12.0, np.nan, 13.0, 14.0],
+            "BBB": [5.0, np.nan, np.nan, 6.0, np.nan, 7.0, 7.5, np.nan],
+            "ZZZ": np.arange(8, dtype=float),
+        },
+        index=index,
+    )
+    asset_returns = pd.DataFrame({"AAA": [0.01] * 6, "CCC": [0.5] * 6}, index=index[2:])
+    asset_returns.iloc[3, 0] = np.nan
+    holdings = [{"ticker": "AAA", "weight": 0.5}, {"ticker": "BBB", "weight": 0.5}]
+
+    basket = model_portfolio._build_buy_and_hold_basket(prices, holdings, asset_returns, index[3])
+
+    expected_prices = prices[["AAA", "BBB"]][index >= index[3]].ffill().dropna(how="any")
+    expected_returns = asset_returns.reindex(index=expected_prices.index, columns=["AAA", "BBB"]).fillna(0.0)
+    expected_returns.iloc[0] = 0.0
+    pd.testing.assert_frame_equal(basket["prices"], expected_prices)
+    pd.testing.assert_frame_equal(basket["asset_returns"], expected_returns)
+    assert basket["entry_prices"].tolist() == [11.0, 6.0]
+
+    with pytest.raises(ToolDataError, match="No price history"):
+        model_portfolio._build_buy_and_hold_basket(prices, [{"ticker": "MISSING", "weight": 1.0}], asset_returns, index[0])
+
+
 def test_create_model_portfolio_report_rebalances_strategy_and_benchmark_independently(monkeypatch, tmp_path):
     prices = pd.DataFrame(
         {
@@ -774,3 +862,215 @@ def test_create_model_portfolio_report_rejects_dates_outside_common_history_wind
             },
             out_dir=tmp_path,
         )
+
+
+def _cache_test_body():
+    return {
+        "reportName": "Cached Model",
+        "startDate": "2026-01-02",
+        "endDate": "2026-01-05",
+        "holdings": [
+            {"ticker": "AAA", "weight": 60},
+            {"ticker": "BBB", "weight": 40},
+        ],
+        "benchmark": {"mode": "ticker", "ticker": "VT"},
+    }
+
+
+def test_create_model_portfolio_report_reuses_artifacts_for_identical_requests(monkeypatch, tmp_path):
+    prices = pd.DataFrame(
+        {
+            "AAA": [10.0, 11.0, 12.0],
+            "BBB": [20.0, 18.0, 18.0],
+            "VT": [100.0, 101.0, 102.0],
+        },
+        index=pd.to_datetime(["2026-01-02", "2026-01-03", "2026-01-05"]),
+    )
+    price_calls = []
+
+    def fake_prices(symbols, start, end):
+        price_calls.append(tuple(symbols))
+        return prices[symbols].copy()
+
+    monkeypatch.setattr(model_portfolio, "get_polygon_prices", fake_prices)
+    monkeypatch.setattr(model_portfolio, "get_polygon_dividends", lambda symbols, start, end: pd.DataFrame(columns=symbols))
+    monkeypatch.setattr(model_portfolio.qs.reports, "html", _fake_report_writer)
+    monkeypatch.setattr(model_portfolio, "_today_date", lambda: pd.Timestamp("2026-01-06"))
+
+    first = model_portfolio.create_model_portfolio_report(_cache_test_body(), out_dir=tmp_path)
+    second = model_portfolio.create_model_portfolio_report(_cache_test_body(), out_dir=tmp_path)
+    monkeypatch.setattr(model_portfolio, "_today_date", lambda: pd.Timestamp("2026-01-07"))
+    next_day = model_portfolio.create_model_portfolio_report(_cache_test_body(), out_dir=tmp_path)
+
+    assert second == first
+    assert len(price_calls) == 2
+    assert next_day["account"]["report"] != first["account"]["report"]
+    assert len(list((tmp_path / "tool-model-portfolios").glob("result_*.json"))) == 2
+
+
+def test_evict_tool_artifacts_drops_least_recently_used_results(tmp_path):
+    for index, name in enumerate(["old", "new"]):
+        files = [f"report_{name}.html", f"weights_{name}.csv"]
+        for file_name in files:
+            (tmp_path / file_name).write_text("x" * 100, encoding="utf-8")
+        (tmp_path / f"report_{name}.html.gz").write_bytes(b"z" * 10)
+        manifest = tmp_path / f"result_{name}.json"
+        manifest.write_text(json.dumps({"key": name, "files": files, "result": {}}), encoding="utf-8")
+        os.utime(manifest, (1_000_000 + index, 1_000_000 + index))
+    (tmp_path / "report_legacy.html").write_text("legacy", encoding="utf-8")
+
+    evicted = model_portfolio._evict_tool_artifacts(tmp_path, max_bytes=300, max_age_seconds=10 ** 12)
+
+    assert sorted(evicted) == ["report_old.html", "report_old.html.gz", "result_old.json", "weights_old.csv"]
+    assert (tmp_path / "result_new.json").exists()
+    assert (tmp_path / "report_legacy.html").exists()
+
+    expired = model_portfolio._evict_tool_artifacts(tmp_path, max_bytes=10 ** 9, max_age_seconds=-1)
+    assert "report_legacy.html" in expired
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("rebalance_period", ["none", "daily", "monthly"])
+def test_simulate_basket_returns_batch_matches_single_basket_simulation(rebalance_period):
+    rng = np.random.default_rng(11)
+    index = pd.bdate_range("2024-01-02", periods=250)
+    asset_returns = rng.normal(0.0004, 0.02, (len(index), 6))
+    asset_returns[0] = 0.0
+    basis_matrix = rng.uniform(0.0, 1.0, (6, 4))
+    basis_matrix[2, 1] = 0.0
+    basis_matrix /= basis_matrix.sum(axis=0)
+    flags = model_portfolio._rebalance_close_flags(index, rebalance_period).to_numpy(dtype=bool)
+
+    batch = model_portfolio._simulate_basket_returns_batch(asset_returns.copy(), basis_matrix, flags)
+
+    for column in range(basis_matrix.shape[1]):
+        _, _, expected = model_portfolio._simulate_rebalanced_values(asset_returns, basis_matrix[:, column], flags)
+        np.testing.assert_allclose(batch[:, column], expected, rtol=0, atol=1e-12)
+
+
+def test_create_model_portfolio_sweep_fetches_prices_once_for_the_whole_grid(monkeypatch):
+    index = pd.bdate_range("2026-01-02", periods=60)
+    prices = pd.DataFrame(
+        {
+            "AAA": np.linspace(10.0, 16.0, len(index)),
+            "BBB": np.linspace(20.0, 18.0, len(index)),
+            "CCC": np.linspace(30.0, 33.0, len(index)),
+        },
+        index=index,
+    )
+    price_calls = []
+
+    def fake_prices(symbols, start, end):
+        price_calls.append(tuple(symbols))
+        return prices[symbols].copy()
+
+    monkeypatch.setattr(model_portfolio, "get_polygon_prices", fake_prices)
+    monkeypatch.setattr(model_portfolio, "get_polygon_dividends", lambda symbols, start, end: pd.DataFrame(columns=symbols))
+
+    result = model_portfolio.create_model_portfolio_sweep(
+        {
+            "weightSets": [
+                {"label": "Growth", "holdings": [{"ticker": "AAA", "weight": 3}, {"ticker": "BBB", "weight": 1}]},
+                {"label": "Value", "holdings": [{"ticker": "BBB", "weight": 1}, {"ticker": "CCC", "weight": 1}]},
+            ],
+            "rebalancePeriods": ["none", "monthly", "daily"],
+            "startDates": ["2026-01-02", "2026-02-02"],
+            "endDate": "2026-03-27",
+        }
+    )
+
+    assert price_calls == [("AAA", "BBB", "CCC")]
+    assert len(result["variants"]) == 12
+    assert result["effectiveEndDate"] == "2026-03-26"
+    aaa_only = next(
+        variant for variant in result["variants"]
+        if variant["weightSet"] == "Growth" and variant["rebalancePeriod"] == "none" and variant["startDate"] == "2026-01-02"
+    )
+    expected_total = 0.75 * (16.0 / 10.0) + 0.25 * (18.0 / 20.0) - 1.0
+    assert aaa_only["totalReturn"] == pytest.approx(expected_total, abs=1e-6)
+    assert aaa_only["maxDrawdown"] <= 0.0
+    assert {variant["effectiveStartDate"] for variant in result["variants"]} == {"2026-01-02", "2026-02-02"}
+
+
+def test_create_model_portfolio_sweep_clips_each_weight_set_to_its_own_holdings(monkeypatch):
+    index = pd.bdate_range("2026-01-02", periods=60)
+    late = np.linspace(30.0, 33.0, len(index))
+    late[:20] = np.nan
+    late[-5:] = np.nan
+    prices = pd.DataFrame(
+        {
+            "AAA": np.linspace(10.0, 16.0, len(index)),
+            "BBB": np.linspace(20.0, 18.0, len(index)),
+            "LATE": late,
+        },
+        index=index,
+    )
+    monkeypatch.setattr(model_portfolio, "get_polygon_prices", lambda symbols, start, end: prices[symbols].copy())
+    monkeypatch.setattr(model_portfolio, "get_polygon_dividends", lambda symbols, start, end: pd.DataFrame(columns=symbols))
+
+    result = model_portfolio.create_model_portfolio_sweep(
+        {
+            "weightSets": [
+                {"label": "Core", "holdings": [{"ticker": "AAA", "weight": 1}, {"ticker": "BBB", "weight": 1}]},
+                {"label": "New", "holdings": [{"ticker": "BBB", "weight": 1}, {"ticker": "LATE", "weight": 1}]},
+            ],
+            "startDates": ["2026-01-02"],
+            "endDate": index[-1].strftime("%Y-%m-%d"),
+        }
+    )
+
+    core, new = result["variants"]
+    assert (core["effectiveStartDate"], core["effectiveEndDate"]) == ("2026-01-02", index[-1].strftime("%Y-%m-%d"))
+    assert (new["effectiveStartDate"], new["effectiveEndDate"]) == (
+        index[20].strftime("%Y-%m-%d"),
+        index[-6].strftime("%Y-%m-%d"),
+    )
+    assert result["effectiveEndDate"] == index[-1].strftime("%Y-%m-%d")
+    assert core["totalReturn"] == pytest.approx(0.5 * (16.0 / 10.0) + 0.5 * (18.0 / 20.0) - 1.0, abs=1e-6)
+    expected_new = 0.5 * (prices["BBB"].iloc[-6] / prices["BBB"].iloc[20]) + 0.5 * (late[-6] / late[20]) - 1.0
+    assert new["totalReturn"] == pytest.approx(expected_new, abs=1e-6)
+
+
+def test_create_model_portfolio_sweep_rejects_grids_over_the_variant_limit(monkeypatch):
+    monkeypatch.setattr(model_portfolio, "MAX_SWEEP_VARIANTS", 3)
+
+    with pytest.raises(ToolDataError, match="limited to 3 variants"):
+        model_portfolio.create_model_portfolio_sweep(
+            {
+                "holdings": [{"ticker": "AAA", "weight": 1}],
+                "rebalancePeriods": ["none", "monthly"],
+                "startDates": ["2026-01-02", "2026-02-02"],
+            }
+        )
+
+
+def test_model_and_account_reports_share_headline_metrics_for_the_same_returns():
+    from src.reports import analyze_fidelity
+    from src.reports.metrics import performance_summary
+    from src.reports.trading_calendar import sessions_between
+
+    sessions = sessions_between("2024-01-02", "2024-12-31")
+    traded = sessions[np.arange(len(sessions)) % 7 != 3]
+    rng = np.random.default_rng(38)
+    portfolio_returns = pd.Series(rng.normal(0.0008, 0.01, len(traded)), index=traded)
+    benchmark_returns = pd.Series(rng.normal(0.0005, 0.009, len(traded)), index=traded)
+    weights = pd.DataFrame({"AAA": 1.0}, index=traded)
+    start, end = traded[0], traded[-1]
+
+    payload = model_portfolio._build_chart_payload(
+        portfolio_returns,
+        benchmark_returns,
+        weights,
+        {"mode": "ticker", "label": "SPY", "ticker": "SPY"},
+        start,
+        start,
+        end,
+        end,
+        "none",
+        "none",
+    )
+
+    assert payload["metrics"] == analyze_fidelity.report_metrics(portfolio_returns, benchmark_returns)
+    padded = analyze_fidelity.add_missing_zeros(portfolio_returns)
+    padded_metrics = performance_summary(padded, analyze_fidelity.add_missing_zeros(benchmark_returns))
+    assert payload["metrics"]["portfolio"]["volatility"] != padded_metrics["portfolio"]["volatility"]
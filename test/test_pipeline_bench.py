@@ -0,0 +1,29 @@
+from bench.pipeline import _regressions
+
+
+BASELINE = {
+    "calibration_ms": 100.0,
+    "stages": {
+        "merge": {"median_ms": 110.0, "best_ms": 100.0},
+        "lot_book": {"median_ms": 22.0, "best_ms": 20.0},
+    },
+}
+
+
+def test_regressions_rescale_the_baseline_to_this_machine():
+    slower_machine = {
+        "merge": {"median_ms": 165.0, "best_ms": 150.0},
+        "lot_book": {"median_ms": 33.0, "best_ms": 30.0},
+    }
+
+    assert _regressions(slower_machine, 150.0, BASELINE, 0.25, 5.0, 2.0) == []
+    assert _regressions(slower_machine, 100.0, BASELINE, 0.25, 5.0, 2.0) == [
+        "merge: 150.0 ms vs rescaled baseline 100.0 ms (+50%)",
+        "lot_book: 30.0 ms vs rescaled baseline 20.0 ms (+50%)",
+    ]
+
+
+def test_regressions_ignore_deltas_within_this_runs_spread():
+    noisy_run = {"merge": {"median_ms": 200.0, "best_ms": 140.0}}
+
+    assert _regressions(noisy_run, 100.0, BASELINE, 0.25, 5.0, 2.0) == []
@@ -348,6 +348,48 @@ def test_future_split_factor_for_date_uses_future_splits_only():
     assert pf.future_split_factor_for_date(split_events, "2025-01-01") == pytest.approx(1.0)
 
 
+def test_future_split_factors_matches_scalar_lookup_for_unsorted_events():
+    split_events = [
+        {"execution_date": "2024-06-10", "split_from": 1, "split_to": 10},
+        {"execution_date": "2021-07-20", "split_from": 1, "split_to": 4},
+        {"execution_date": "2022-01-03", "split_from": 0, "split_to": 3},
+    ]
+    dates = [pd.Timestamp(value) for value in ["2025-01-01", "2020-01-01", "2021-07-20", "2021-07-19 15:30"]]
+
+    factors = pf.future_split_factors(split_events, dates)
+
+    assert factors.tolist() == pytest.approx([1.0, 40.0, 10.0, 40.0])
+    assert factors.tolist() == pytest.approx(
+        [pf.future_split_factor_for_date(split_events, date) for date in dates]
+    )
+    assert pf.future_split_factors([], dates).tolist() == [1.0, 1.0, 1.0, 1.0]
+
+
+def test_get_polygon_dividends_adjusts_and_sums_amounts_by_ex_date(monkeypatch):
+    monkeypatch.setenv("POLYGON_API_KEY", "dummy")
+    monkeypatch.setattr(
+        pf,
+        "get_polygon_splits",
+        lambda symbols, start, end: {"AAA": [{"execution_date": "2024-06-10", "split_from": 1, "split_to": 4}]},
+    )
+    monkeypatch.setattr(
+        pf,
+        "_fetch_polygon_reference_results",
+        lambda symbol, kind, date_field, start, end, api_key: [
+            {"ex_dividend_date": "2024-03-01", "cash_amount": 4.0},
+            {"ex_dividend_date": "2024-03-01", "cash_amount": "2"},
+            {"ex_dividend_date": "2024-09-01", "cash_amount": 1.0},
+            {"ex_dividend_date": "2024-10-01", "cash_amount": "n/a"},
+            {"ex_dividend_date": None, "cash_amount": 3.0},
+        ],
+    )
+
+    dividends = pf.get_polygon_dividends(["AAA"], "2024-01-01", "2024-12-31")
+
+    assert list(dividends.index) == list(pd.to_datetime(["2024-03-01", "2024-09-01"]))
+    assert dividends["AAA"].tolist() == pytest.approx([1.5, 1.0])
+
+
 def test_compute_total_return_returns_adds_dividend_yield_to_price_return():
     prices = pd.DataFrame(
         {"AAA": [100.0, 99.0, 101.0]},
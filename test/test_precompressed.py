@@ -0,0 +1,40 @@
+import gzip
+import os
+
+from src import precompressed
+
+
+def test_write_precompressed_siblings_writes_gzip_copy(tmp_path):
+    report_path = tmp_path / "report_0_interactive.json"
+    payload = b'{"portfolio": {"daily": [' + b'{"t": "2026-01-02", "v": 0.01},' * 200 + b"]}}"
+    report_path.write_bytes(payload)
+
+    written = precompressed.write_precompressed_siblings(report_path)
+
+    gzip_path = tmp_path / "report_0_interactive.json.gz"
+    assert gzip_path in written
+    assert gzip.decompress(gzip_path.read_bytes()) == payload
+    assert precompressed.fresh_sibling(report_path, "gzip") == gzip_path
+
+
+def test_write_precompressed_siblings_skips_small_and_unknown_files(tmp_path):
+    small_csv = tmp_path / "weights_0.csv"
+    small_csv.write_text("Ticker\nAAA\n", encoding="utf-8")
+    binary = tmp_path / "chart.png"
+    binary.write_bytes(b"\x89PNG" * 1000)
+
+    assert precompressed.write_precompressed_siblings(small_csv) == []
+    assert precompressed.write_precompressed_siblings(binary) == []
+    assert not (tmp_path / "weights_0.csv.gz").exists()
+    assert not (tmp_path / "chart.png.gz").exists()
+
+
+def test_fresh_sibling_ignores_copy_older_than_source(tmp_path):
+    weights_path = tmp_path / "weights_0.csv"
+    weights_path.write_text("Ticker,Weight\n" + "AAA,1.00%\n" * 200, encoding="utf-8")
+    precompressed.write_precompressed_siblings(weights_path)
+    gzip_path = tmp_path / "weights_0.csv.gz"
+    stat = gzip_path.stat()
+    os.utime(weights_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert precompressed.fresh_sibling(weights_path, "gzip") is None
@@ -1,7 +1,10 @@
+import gzip
 import json
+import os
+import time
 from types import SimpleNamespace
 
-from src import posthog_analytics
+from src import jobs, posthog_analytics, precompressed
 from src import server
 
 
@@ -76,6 +79,102 @@ def test_embedded_report_rewrite_serves_same_origin_html(monkeypatch, tmp_path):
     assert "background: #0f0f0f !important;" in html
 
 
+def test_embedded_report_supports_conditional_requests(monkeypatch, tmp_path):
+    report_path = tmp_path / "report_0.html"
+    report_path.write_text("<html><head></head><body>v1</body></html>", encoding="utf-8")
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    client = server.app.test_client()
+
+    first = client.get("/reports/report_0.html?embed=1&mode=dark")
+    etag = first.headers["ETag"]
+    repeat = client.get("/reports/report_0.html?embed=1&mode=dark", headers={"If-None-Match": etag})
+    light = client.get("/reports/report_0.html?embed=1&mode=light", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert not etag.startswith("W/")
+    assert "Last-Modified" in first.headers
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert repeat.status_code == 304
+    assert light.status_code == 200
+    assert light.headers["ETag"] != etag
+
+
+def test_embedded_report_cache_misses_after_report_is_rewritten(monkeypatch, tmp_path):
+    report_path = tmp_path / "report_0.html"
+    report_path.write_text("<html><head></head><body>v1</body></html>", encoding="utf-8")
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    client = server.app.test_client()
+
+    first = client.get("/reports/report_0.html?embed=1")
+    report_path.write_text("<html><head></head><body>version 2</body></html>", encoding="utf-8")
+    second = client.get("/reports/report_0.html?embed=1", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert "version 2" in second.get_data(as_text=True)
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_data_route_serves_fresh_gzip_sibling(monkeypatch, tmp_path):
+    csv_text = "Ticker,Portfolio Weight (%)\n" + "AAA,1.00%\n" * 300
+    csv_path = tmp_path / "weights_0.csv"
+    csv_path.write_text(csv_text, encoding="utf-8")
+    precompressed.write_precompressed_siblings(csv_path)
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    client = server.app.test_client()
+
+    compressed = client.get("/data/weights_0.csv", headers={"Accept-Encoding": "gzip, deflate"})
+    plain = client.get("/data/weights_0.csv")
+
+    assert compressed.status_code == 200
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert compressed.data == (tmp_path / "weights_0.csv.gz").read_bytes()
+    assert gzip.decompress(compressed.data).decode("utf-8") == csv_text
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data(as_text=True) == csv_text
+
+
+def test_data_route_compresses_live_rewrites_on_the_fly(monkeypatch, tmp_path):
+    csv_path = tmp_path / "weights_0.csv"
+    csv_path.write_text("Ticker,Today G/L\n" + "AAA,+1.00%\n" * 300, encoding="utf-8")
+    precompressed.write_precompressed_siblings(csv_path)
+    live_text = "Ticker,Today G/L\n" + "AAA,+2.00%\n" * 300
+    server._write_csv_rows(
+        csv_path,
+        ["Ticker", "Today G/L"],
+        [{"Ticker": "AAA", "Today G/L": "+2.00%"}] * 300,
+    )
+    gzip_stat = (tmp_path / "weights_0.csv.gz").stat()
+    os.utime(csv_path, ns=(gzip_stat.st_atime_ns, gzip_stat.st_mtime_ns + 1_000_000))
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    client = server.app.test_client()
+
+    response = client.get("/data/weights_0.csv", headers={"Accept-Encoding": "gzip"})
+    repeat = client.get(
+        "/data/weights_0.csv",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).decode("utf-8").replace("\r\n", "\n") == live_text
+    assert repeat.status_code == 304
+
+
+def test_embedded_report_is_gzipped_when_accepted(monkeypatch, tmp_path):
+    report_path = tmp_path / "report_0.html"
+    report_path.write_text("<html><head></head><body>" + "<p>row</p>" * 500 + "</body></html>", encoding="utf-8")
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    client = server.app.test_client()
+
+    plain = client.get("/reports/report_0.html?embed=1")
+    compressed = client.get("/reports/report_0.html?embed=1", headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers["ETag"] != plain.headers["ETag"]
+
+
 def test_algo_output_processor_endpoint_returns_json(monkeypatch):
     monkeypatch.setattr(
         server,
@@ -100,6 +199,29 @@ def test_algo_output_processor_endpoint_returns_json(monkeypatch):
     assert response.get_json()["priceSignals"]["groups"]["buy"] == ["CEF"]
 
 
+def test_tool_job_endpoints_run_tools_in_the_background(monkeypatch):
+    def fake_market_cap_weights(tickers, api_key=None, progress=None):
+        progress("fetching_reference", "Looking up 1 tickers")
+        return {"tickers": tickers, "rows": []}
+
+    monkeypatch.setattr(server, "tool_jobs", jobs.JobManager())
+    monkeypatch.setattr(server, "market_cap_weights", fake_market_cap_weights)
+    client = server.app.test_client()
+
+    submitted = client.post("/api/tools/market-cap-weights/jobs", json={"tickers": ["AAPL"]})
+    job_id = submitted.get_json()["id"]
+    events = client.get(submitted.get_json()["eventsUrl"]).get_data(as_text=True)
+    status = client.get(f"/api/jobs/{job_id}").get_json()
+
+    assert submitted.status_code == 202
+    assert "event: progress" in events and "fetching_reference" in events
+    assert "event: done" in events
+    assert status["status"] == "succeeded"
+    assert status["result"] == {"tickers": ["AAPL"], "rows": []}
+    assert client.post("/api/tools/unknown/jobs", json={}).status_code == 404
+    assert client.get("/api/jobs/missing").status_code == 404
+
+
 def test_load_accounts_sorts_using_canonical_account_order(monkeypatch, tmp_path):
     out_dir = tmp_path / "out"
     out_dir.mkdir()
@@ -134,6 +256,34 @@ def test_load_accounts_sorts_using_canonical_account_order(monkeypatch, tmp_path
     assert [account["name"] for account in accounts] == ["Optical", "Cloud", "Retirement"]
 
 
+def test_load_accounts_reuses_index_until_files_change(monkeypatch, tmp_path):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    index_path = out_dir / "accounts.json"
+    index_path.write_text(json.dumps([{"id": "a", "name": "Alpha"}, {"id": "b", "name": "Beta"}]), encoding="utf-8")
+    data_accounts = tmp_path / "accounts.json"
+    data_accounts.write_text(json.dumps([{"id": "B", "name": "Beta"}]), encoding="utf-8")
+    monkeypatch.setattr(server, "OUT_DIR", out_dir)
+    monkeypatch.setattr(server, "DATA_ACCOUNTS_FILE", data_accounts)
+    monkeypatch.setattr(server, "accounts_index_stats", server._CacheStats())
+    reads = []
+    original_read = server._read_accounts_index
+    monkeypatch.setattr(server, "_read_accounts_index", lambda path: reads.append(path) or original_read(path))
+
+    first = server._load_accounts()
+    second = server._load_accounts()
+    data_accounts.write_text(json.dumps([{"id": "A", "name": "Alpha"}, {"id": "B", "name": "Beta"}]), encoding="utf-8")
+    os.utime(data_accounts, ns=(0, data_accounts.stat().st_mtime_ns + 1_000_000))
+    third = server._load_accounts()
+
+    assert [account["name"] for account in first] == ["Beta", "Alpha"]
+    assert second == first
+    assert [account["name"] for account in third] == ["Alpha", "Beta"]
+    assert len(reads) == 2
+    stats = server.app.test_client().get("/api/cache/stats").get_json()
+    assert stats["accounts_index"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
 def test_posthog_config_endpoint_is_disabled_without_token(monkeypatch):
     monkeypatch.delenv("POSTHOG_PROJECT_TOKEN", raising=False)
     monkeypatch.delenv("POSTHOG_UI_HOST", raising=False)
@@ -164,34 +314,45 @@ def test_posthog_config_endpoint_can_enable_respect_dnt(monkeypatch):
     assert response.get_json()["respectDnt"] is True
 
 
-def test_posthog_proxy_forwards_requests(monkeypatch):
-    captured = {}
-
-    def fake_request(method, url, params=None, data=None, headers=None, allow_redirects=None, timeout=None):
-        captured.update(
-            {
-                "method": method,
-                "url": url,
-                "params": params,
-                "data": data,
-                "headers": headers,
-                "allow_redirects": allow_redirects,
-                "timeout": timeout,
-            }
-        )
-        return SimpleNamespace(
-            status_code=202,
-            content=b'{"ok":true}',
-            headers={
-                "Content-Type": "application/json",
-                "Cache-Control": "no-store",
-                "X-Ignored": "skip-me",
-            },
-        )
+class _FakeUpstreamResponse:
+    def __init__(self, chunks, status_code=202, headers=None):
+        self._chunks = chunks
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        yield from self._chunks
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeProxySession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
 
+    def request(self, **kwargs):
+        data = kwargs.get("data")
+        kwargs["data"] = b"".join(data) if data is not None else None
+        self.calls.append(kwargs)
+        return self.response
+
+
+def test_posthog_proxy_forwards_requests(monkeypatch):
+    upstream = _FakeUpstreamResponse(
+        [b'{"ok":', b"true}"],
+        headers={
+            "Content-Type": "application/json",
+            "Cache-Control": "no-store",
+            "X-Ignored": "skip-me",
+        },
+    )
+    session = _FakeProxySession(upstream)
     monkeypatch.setenv("POSTHOG_PROJECT_TOKEN", "phc_test")
     monkeypatch.setenv("POSTHOG_HOST", "https://eu.i.posthog.com")
-    monkeypatch.setattr(posthog_analytics.requests, "request", fake_request)
+    monkeypatch.setattr(posthog_analytics, "_http_session", lambda: session)
 
     response = server.app.test_client().post(
         "/api/posthog/decide/?v=3",
@@ -205,20 +366,45 @@ def test_posthog_proxy_forwards_requests(monkeypatch):
 
     assert response.status_code == 202
     assert response.get_json() == {"ok": True}
-    assert captured == {
-        "method": "POST",
-        "url": "https://eu.i.posthog.com/decide/",
-        "params": [("v", "3")],
-        "data": b'{"token":"x"}',
-        "headers": {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "User-Agent": "pytest",
-        },
-        "allow_redirects": False,
-        "timeout": (5, 30),
-    }
+    assert session.calls == [
+        {
+            "method": "POST",
+            "url": "https://eu.i.posthog.com/decide/",
+            "params": [("v", "3")],
+            "data": b'{"token":"x"}',
+            "headers": {
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "User-Agent": "pytest",
+            },
+            "allow_redirects": False,
+            "stream": True,
+            "timeout": (5, 30),
+        }
+    ]
     assert response.headers["Cache-Control"] == "no-store"
+    assert "X-Ignored" not in response.headers
+    response.close()
+    assert upstream.closed
+
+
+def test_posthog_proxy_sheds_load_when_all_slots_are_busy(monkeypatch):
+    session = _FakeProxySession(_FakeUpstreamResponse([b"{}"]))
+    monkeypatch.setenv("POSTHOG_PROJECT_TOKEN", "phc_test")
+    monkeypatch.setattr(posthog_analytics, "_http_session", lambda: session)
+    monkeypatch.setattr(posthog_analytics, "_proxy_slots", posthog_analytics.threading.BoundedSemaphore(1))
+
+    held, _, _ = posthog_analytics.forward_posthog_request(
+        "e/", method="POST", query_params=[], body=b"{}", headers={}
+    )
+    busy = server.app.test_client().post("/api/posthog/e/", data=b"{}")
+    held.close()
+    freed = server.app.test_client().get("/api/posthog/decide/")
+
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+    assert freed.status_code == 202
+    assert len(session.calls) == 2
 
 
 def test_build_backend_capture_payload_keeps_anonymous_context(monkeypatch):
@@ -256,3 +442,58 @@ def test_build_backend_capture_payload_keeps_anonymous_context(monkeypatch):
             "portfolio_holding_count": 14,
         },
     }
+
+
+class _FakeAnalyticsSession:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append({"url": url, **kwargs})
+        return SimpleNamespace(ok=True)
+
+
+def test_backend_event_sender_batches_events_and_flushes_on_close(monkeypatch):
+    monkeypatch.setenv("POSTHOG_HOST", "https://eu.i.posthog.com")
+    session = _FakeAnalyticsSession()
+    sender = posthog_analytics.BackendEventSender(batch_size=2, flush_interval_ms=60_000, session=session)
+
+    for index in range(3):
+        sender.enqueue({"api_key": "phc_test", "event": "backend_api_request", "distinct_id": f"anon-{index}"})
+    sender.close()
+
+    assert [post["url"] for post in session.posts] == ["https://eu.i.posthog.com/batch/"] * 2
+    bodies = [json.loads(post["data"]) for post in session.posts]
+    assert [body["api_key"] for body in bodies] == ["phc_test", "phc_test"]
+    assert [[event["distinct_id"] for event in body["batch"]] for body in bodies] == [
+        ["anon-0", "anon-1"],
+        ["anon-2"],
+    ]
+    assert all("api_key" not in event and event["timestamp"] for body in bodies for event in body["batch"])
+    assert sender.stats() == {"enqueued": 3, "sent": 3, "dropped": 0, "failed": 0, "queue_depth": 0}
+
+
+def test_backend_event_sender_close_wakes_worker_holding_a_partial_batch():
+    session = _FakeAnalyticsSession()
+    sender = posthog_analytics.BackendEventSender(batch_size=10, flush_interval_ms=60_000, session=session)
+
+    sender.enqueue({"api_key": "phc_test", "event": "backend_api_request", "distinct_id": "anon-0"})
+    deadline = time.monotonic() + 5
+    while sender.stats()["queue_depth"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    started_at = time.monotonic()
+    sender.close(timeout=5)
+
+    assert time.monotonic() - started_at < 2
+    assert len(session.posts) == 1
+    assert sender.stats()["sent"] == 1
+
+
+def test_backend_event_sender_drops_events_when_queue_is_full(monkeypatch):
+    sender = posthog_analytics.BackendEventSender(max_queue_size=1, session=_FakeAnalyticsSession())
+    monkeypatch.setattr(sender, "_ensure_worker", lambda: None)
+
+    assert sender.enqueue({"api_key": "phc_test", "event": "first"}) is True
+    assert sender.enqueue({"api_key": "phc_test", "event": "second"}) is False
+    assert sender.stats()["dropped"] == 1
+    assert sender.stats()["queue_depth"] == 1
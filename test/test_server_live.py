@@ -1,3 +1,6 @@
+import json
+import os
+
 import pytest
 
 from src import server
@@ -69,6 +72,8 @@ def test_stream_trade_updated_at_falls_back_to_receive_time(monkeypatch):
 
 def test_fetch_stock_snapshots_ignores_zero_snapshot_price(monkeypatch):
     class FakeResponse:
+        status_code = 200
+
         def raise_for_status(self):
             return None
 
@@ -99,6 +104,8 @@ def test_fetch_stock_snapshots_keeps_prior_day_last_trade_before_first_trade(mon
     previous_trade_ms = 1776110340000  # 2026-04-13 15:59:00 ET
 
     class FakeResponse:
+        status_code = 200
+
         def raise_for_status(self):
             return None
 
@@ -424,3 +431,74 @@ def test_refresh_weights_rows_keeps_report_values_when_quotes_are_stale(monkeypa
     refreshed = server._refresh_weights_rows(rows, quotes)
 
     assert refreshed == rows
+
+
+def test_live_report_refresher_reuses_parsed_configs_until_files_change(monkeypatch, tmp_path):
+    weights_path = tmp_path / "weights_0.csv"
+    weights_path.write_text("Ticker,_Quantity,_BasisApprox\nAAA,10,100\n", encoding="utf-8")
+    interactive_path = tmp_path / "report_0_interactive.json"
+    interactive_path.write_text(json.dumps({"benchmark": {"ticker": "QQQ"}}), encoding="utf-8")
+    monkeypatch.setattr(server, "OUT_DIR", tmp_path)
+    monkeypatch.setattr(
+        server,
+        "_load_accounts",
+        lambda: [{"id": "a", "weights": "/data/weights_0.csv", "report": "/reports/report_0.html"}],
+    )
+    monkeypatch.setattr(server, "live_config_stats", server._CacheStats())
+    refresher = server.LiveReportRefresher(server.LiveQuoteHub())
+
+    first = refresher._load_configs()
+    second = refresher._load_configs()
+    weights_path.write_text("Ticker,_Quantity,_BasisApprox\nBBB,5,50\n", encoding="utf-8")
+    os.utime(weights_path, ns=(0, weights_path.stat().st_mtime_ns + 1_000_000))
+    third = refresher._load_configs()
+
+    assert second[0] is first[0]
+    assert first[0]["watch_tickers"] == {"AAA", "QQQ"}
+    assert third[0]["watch_tickers"] == {"BBB", "QQQ"}
+    assert server.live_config_stats.snapshot()["hits"] == 1
+    assert server.live_config_stats.snapshot()["misses"] == 2
+
+
+def test_daily_alpha_sums_fold_live_tail_without_rebasing():
+    dates = [f"2026-03-{day:02d}" for day in range(2, 28)]
+    portfolio = [{"t": date, "v": 0.001 * (index % 7) - 0.002} for index, date in enumerate(dates)]
+    benchmark = [{"t": date, "v": 0.0007 * (index % 5) - 0.001} for index, date in enumerate(dates)]
+    alpha_sums = server._DailyAlphaSums()
+
+    def assert_matches_full(portfolio_daily, benchmark_daily):
+        incremental = server._build_daily_alpha_payload(portfolio_daily, benchmark_daily, alpha_sums)
+        full = server._build_daily_alpha_payload(portfolio_daily, benchmark_daily)
+        assert incremental["beta"] == pytest.approx(full["beta"])
+        assert [point["t"] for point in incremental["cumulative"]] == [point["t"] for point in full["cumulative"]]
+        assert [point["v"] for point in incremental["cumulative"]] == pytest.approx(
+            [point["v"] for point in full["cumulative"]]
+        )
+
+    assert_matches_full(portfolio, benchmark)
+    # Live updates to the last day, then a new day appended, then a carried-forward weekend.
+    assert_matches_full(portfolio[:-1] + [{"t": dates[-1], "v": 0.03}], benchmark[:-1] + [{"t": dates[-1], "v": 0.01}])
+    assert_matches_full(portfolio + [{"t": "2026-03-28", "v": 0.02}], benchmark + [{"t": "2026-03-28", "v": 0.004}])
+    assert_matches_full(portfolio[:-1] + [{"t": "2026-03-28", "v": 0.0}], benchmark[:-1] + [{"t": "2026-03-28", "v": 0.0}])
+    assert alpha_sums.rebases == 1
+
+    assert_matches_full(portfolio[5:], benchmark[5:])
+    assert alpha_sums.rebases == 2
+
+
+def test_live_series_views_share_the_base_and_serialize_as_lists(tmp_path):
+    base = [{"t": "2026-04-09", "v": 1.0}, {"t": "2026-04-10", "v": 2.0}]
+    snapshot = json.loads(json.dumps(base))
+
+    live = server._upsert_series_point(base, {"t": "2026-04-13", "v": 3.0})
+    live = server._upsert_series_point(live, {"t": "2026-04-13", "v": 4.0})
+    carried = server._carry_latest_point_to_date(live, "2026-04-15")
+
+    assert base == snapshot
+    assert live == base + [{"t": "2026-04-13", "v": 4.0}]
+    assert carried == base + [{"t": "2026-04-14", "v": 4.0}, {"t": "2026-04-15", "v": 4.0}]
+    assert server._roll_forward_series(carried, "2026-04-15") is carried
+
+    path = tmp_path / "payload.json"
+    server._write_json(path, {"equity": carried})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"equity": carried.to_list()}
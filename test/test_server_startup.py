@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("quantstats", "matplotlib", "seaborn", "scipy", "yfinance", "pandas")
+# Generous enough for a cold CI runner; the lazy-import path lands well under it.
+SERVER_IMPORT_BUDGET_MS = float(os.environ.get("SERVER_IMPORT_BUDGET_MS", "1500"))
+
+
+def _server_import_profile() -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "FLASK_ENV": "production"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.server"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+
+    cumulative_us = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        try:
+            cumulative_us[name.strip()] = int(cumulative.strip())
+        except ValueError:
+            continue
+    return cumulative_us
+
+
+def test_server_import_skips_heavy_report_dependencies():
+    profile = _server_import_profile()
+
+    loaded_heavy = sorted(
+        name
+        for name in profile
+        if name.split(".", 1)[0] in HEAVY_MODULES
+    )
+    assert loaded_heavy == []
+    assert "src.reports.model_portfolio" not in profile
+
+
+def test_server_import_stays_within_startup_budget():
+    profile = _server_import_profile()
+
+    assert "src.server" in profile
+    assert profile["src.server"] / 1000 <= SERVER_IMPORT_BUDGET_MS
@@ -0,0 +1,47 @@
+import json
+
+from src.reports import stage_timing
+from src.reports.stage_timing import StageTimer, append_run_log, format_summary_table
+
+
+def test_stage_timer_records_laps_and_profile(tmp_path):
+    timer = StageTimer("ACCOUNT", profile=True)
+    timer.begin("load")
+    sum(range(1000))
+    timer.begin("returns")
+    timer.finish()
+    timer.begin("ignored")
+
+    record = timer.to_dict()
+    assert [stage["name"] for stage in record["stages"]] == ["load", "returns"]
+    assert record["wallSeconds"] >= sum(stage["wallSeconds"] for stage in record["stages"]) - 1e-3
+    assert set(record["stages"][0]) == {"name", "wallSeconds", "cpuSeconds", "peakRssMb"}
+
+    prof_path, text_path = timer.write_profile(tmp_path / "profiles" / "run_ACCOUNT")
+    assert prof_path.stat().st_size > 0
+    assert "cumulative" in text_path.read_text(encoding="utf-8")
+    assert StageTimer("OTHER").write_profile(tmp_path / "other") == []
+
+
+def test_append_run_log_keeps_newest_entries(tmp_path, monkeypatch):
+    path = tmp_path / ".runs" / "pipeline.jsonl"
+    for run in range(4):
+        append_run_log(path, {"runId": run}, max_entries=3)
+
+    assert [json.loads(line)["runId"] for line in path.read_text(encoding="utf-8").splitlines()] == [1, 2, 3]
+
+
+def test_format_summary_table_has_a_column_per_account(monkeypatch):
+    monkeypatch.setattr(stage_timing, "peak_rss_mb", lambda: 128.0)
+    timers = []
+    for label in ("FIRST", "SECOND_ACCOUNT"):
+        timer = StageTimer(label)
+        timer.begin("prices")
+        timer.stages.append({"name": "quantstats", "wallSeconds": 1.5, "cpuSeconds": 1.0, "peakRssMb": 128.0})
+        timer.finish()
+        timers.append(timer)
+
+    lines = format_summary_table(timers).splitlines()
+    assert lines[0].split() == ["stage", "FIRST", "SECOND_ACCOUNT", "total"]
+    assert lines[1].split() == ["quantstats", "1.50", "1.50", "3.00"]
+    assert lines[-1].split() == ["peak", "RSS", "MB", "128", "128"]
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from bench.synthetic_statements import MarketFixture, generate_history
+from src.reports.analyze_fidelity import _build_position_trade_frame
+from src.reports.watch import merge_statements
+
+
+def test_generate_history_is_deterministic_and_merges_both_statement_formats(tmp_path):
+    first = generate_history(tmp_path / "a", accounts=2, years=2, symbols=4, splits_per_year=1.0, end="2026-03-31")
+    second = generate_history(tmp_path / "b", accounts=2, years=2, symbols=4, splits_per_year=1.0, end="2026-03-31")
+
+    assert first["events"] == second["events"]
+    for account_id in first["accounts"]:
+        statements = sorted((tmp_path / "a" / "data" / account_id / "statements").glob("*.csv"))
+        assert len(statements) == 3
+        assert [path.read_text() for path in statements] == [
+            path.read_text() for path in sorted((tmp_path / "b" / "data" / account_id / "statements").glob("*.csv"))
+        ]
+
+        combined = pd.read_csv(merge_statements(tmp_path / "a" / "data" / account_id))
+        combined["Run Date"] = pd.to_datetime(combined["Run Date"])
+        # Overlapping yearly exports collapse back to one row per event.
+        assert len(combined) == first["events"][account_id]
+        trades, reinvestment_count, _ = _build_position_trade_frame(combined)
+        assert reinvestment_count > 0
+        assert (trades["side"] == "SELL").any()
+
+
+def test_market_fixture_serves_split_adjusted_prices(tmp_path):
+    summary = generate_history(tmp_path, accounts=1, years=3, symbols=3, splits_per_year=2.0, end="2026-03-31")
+    fixture = MarketFixture.load(summary["fixture"])
+    splits = fixture.get_polygon_splits(fixture.prices.columns.tolist(), "2023-01-01", "2026-03-31")
+    symbol, events = next((symbol, events) for symbol, events in splits.items() if events)
+
+    split_day = pd.Timestamp(events[0]["execution_date"])
+    prices = fixture.get_polygon_prices([symbol], "2023-01-01", "2026-03-31")[symbol]
+    previous_close = prices[prices.index < split_day].iloc[-1]
+    assert np.isclose(prices.loc[split_day] / previous_close, 1.0, atol=0.2)
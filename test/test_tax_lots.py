@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reports.analyze_fidelity import SHARE_EPSILON, build_remaining_lot_book
+from src.reports.tax_lots import SymbolLotBook
+
+
+# The original list-of-dicts implementation, kept as the oracle for the heap engine.
+
+def _lot_holding_start(lot: dict) -> pd.Timestamp:
+    return pd.Timestamp(lot.get("tax_date", lot["date"])).normalize()
+
+
+def _is_long_term_lot(lot: dict, sale_date: pd.Timestamp) -> bool:
+    sale_day = pd.Timestamp(sale_date).normalize()
+    return sale_day > _lot_holding_start(lot) + pd.DateOffset(years=1)
+
+
+def _lot_sale_priority(lot: dict, sale_date: pd.Timestamp, sale_price: float) -> tuple[int, float, pd.Timestamp]:
+    realized_gain_per_share = sale_price - float(lot["price"])
+    return (
+        0 if _is_long_term_lot(lot, sale_date) else 1,
+        realized_gain_per_share,
+        lot["date"],
+    )
+
+
+def _apply_wash_adjustment_to_existing_lots(
+    lots: list[dict],
+    sale_date: pd.Timestamp,
+    loss_qty: float,
+    loss_per_share: float,
+    sold_tax_date: pd.Timestamp,
+    eps: float,
+) -> float:
+    if loss_qty <= eps or loss_per_share <= eps:
+        return 0.0
+
+    remaining = loss_qty
+    window_start = pd.Timestamp(sale_date).normalize() - pd.Timedelta(days=30)
+    sale_day = pd.Timestamp(sale_date).normalize()
+    updated_lots = []
+
+    for lot in lots:
+        lot_day = pd.Timestamp(lot["date"]).normalize()
+        if (
+            remaining > eps
+            and lot["qty"] > eps
+            and window_start <= lot_day <= sale_day
+        ):
+            matched = min(remaining, lot["qty"])
+            adjusted_lot = lot.copy()
+            adjusted_lot["qty"] = matched
+            adjusted_lot["price"] = float(lot["price"]) + loss_per_share
+            adjusted_lot["tax_date"] = min(_lot_holding_start(lot), pd.Timestamp(sold_tax_date).normalize())
+            updated_lots.append(adjusted_lot)
+
+            leftover_qty = lot["qty"] - matched
+            if leftover_qty > eps:
+                remaining_lot = lot.copy()
+                remaining_lot["qty"] = leftover_qty
+                updated_lots.append(remaining_lot)
+
+            remaining -= matched
+            continue
+
+        updated_lots.append(lot)
+
+    lots[:] = updated_lots
+    return remaining
+
+
+def _reference_lot_book(trades: pd.DataFrame, symbols: list[str]) -> dict[str, list[dict]]:
+    lot_book = {sym: [] for sym in symbols}
+    pending_washes = {sym: [] for sym in symbols}
+    eps = 1e-6
+    ordered_trades = (
+        trades.reset_index()
+        .rename(columns={"index": "_trade_order"})
+        .sort_values(["Run Date", "_trade_order"], kind="stable")
+    )
+
+    for _, row in ordered_trades.iterrows():
+        sym = row["symbol"]
+        trade_date = row["Run Date"]
+        qty = float(row["quantity"])
+        price = float(row["price"])
+
+        if sym not in lot_book or abs(qty) <= eps:
+            continue
+
+        pending_washes[sym] = [
+            pending
+            for pending in pending_washes[sym]
+            if pending["qty"] > eps and pd.Timestamp(trade_date).normalize() <= pending["expires"]
+        ]
+
+        if qty > 0:
+            remaining_qty = qty
+            buy_lots = []
+
+            for pending in pending_washes[sym]:
+                if remaining_qty <= eps:
+                    break
+
+                matched = min(remaining_qty, pending["qty"])
+                if matched <= eps:
+                    continue
+
+                buy_lots.append({
+                    "date": trade_date,
+                    "tax_date": min(pd.Timestamp(trade_date).normalize(), pending["tax_date"]),
+                    "qty": matched,
+                    "price": price + pending["loss_per_share"],
+                })
+                pending["qty"] -= matched
+                remaining_qty -= matched
+
+            if remaining_qty > eps:
+                buy_lots.append({
+                    "date": trade_date,
+                    "tax_date": pd.Timestamp(trade_date).normalize(),
+                    "qty": remaining_qty,
+                    "price": price,
+                })
+
+            lot_book[sym].extend(buy_lots)
+            pending_washes[sym] = [pending for pending in pending_washes[sym] if pending["qty"] > eps]
+            continue
+
+        sell_qty = -qty
+        lots = lot_book[sym]
+        prioritized_lots = sorted(
+            lots,
+            key=lambda lot: _lot_sale_priority(lot, trade_date, price),
+        )
+        sold_lots = []
+
+        for lot in prioritized_lots:
+            if sell_qty <= eps:
+                break
+            matched = min(sell_qty, lot["qty"])
+            lot["qty"] -= matched
+            sell_qty -= matched
+            sold_lots.append({
+                "qty": matched,
+                "price": float(lot["price"]),
+                "tax_date": _lot_holding_start(lot),
+            })
+
+        lot_book[sym] = [lot for lot in lots if lot["qty"] > eps]
+        lots = lot_book[sym]
+
+        for sold_lot in sold_lots:
+            if sold_lot["price"] <= price + eps:
+                continue
+
+            unmatched_loss_qty = _apply_wash_adjustment_to_existing_lots(
+                lots,
+                trade_date,
+                sold_lot["qty"],
+                sold_lot["price"] - price,
+                sold_lot["tax_date"],
+                eps,
+            )
+            if unmatched_loss_qty > eps:
+                pending_washes[sym].append({
+                    "expires": pd.Timestamp(trade_date).normalize() + pd.Timedelta(days=30),
+                    "loss_per_share": sold_lot["price"] - price,
+                    "qty": unmatched_loss_qty,
+                    "tax_date": sold_lot["tax_date"],
+                })
+
+    return lot_book
+
+
+
+def _random_trades(seed: int, count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    symbols = ["AAA", "BBB"]
+    days = np.sort(rng.integers(0, 1100, count))
+    rows = []
+    holdings = {symbol: 0.0 for symbol in symbols}
+    for day in days:
+        symbol = symbols[int(rng.integers(0, len(symbols)))]
+        price = float(np.round(rng.uniform(20.0, 80.0), 2))
+        if holdings[symbol] > 1 and rng.random() < 0.45:
+            qty = -float(np.round(rng.uniform(0.2, 1.1) * holdings[symbol], 4))
+        else:
+            qty = float(np.round(rng.uniform(0.5, 30.0), 4))
+        holdings[symbol] = max(0.0, holdings[symbol] + qty)
+        rows.append({
+            "Run Date": pd.Timestamp("2019-02-27") + pd.Timedelta(days=int(day)),
+            "symbol": symbol,
+            "quantity": qty,
+            "price": price,
+        })
+    rows.append({"Run Date": pd.Timestamp("2020-03-01"), "symbol": "ZZZ", "quantity": 5.0, "price": 1.0})
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=seed)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_build_remaining_lot_book_matches_list_based_engine(seed):
+    trades = _random_trades(seed, 400)
+
+    assert build_remaining_lot_book(trades, ["AAA", "BBB"]) == _reference_lot_book(trades, ["AAA", "BBB"])
+
+
+def test_lot_book_sells_long_term_lots_first_even_at_a_larger_gain():
+    book = SymbolLotBook(SHARE_EPSILON)
+    first_day = pd.Timestamp("2024-02-29")
+    book.buy(first_day, first_day.value, first_day.value // 86_400_000_000_000, 10.0, 10.0)
+    later_day = pd.Timestamp("2024-12-02")
+    book.buy(later_day, later_day.value, later_day.value // 86_400_000_000_000, 10.0, 50.0)
+
+    still_short = pd.Timestamp("2025-02-28").value // 86_400_000_000_000
+    assert book.sell(1.0, still_short, 40.0) == [(1.0, 50.0, later_day.value // 86_400_000_000_000)]
+    assert book.sell(1.0, still_short + 1, 40.0)[0][1] == 10.0
+
+
+def test_pending_washes_are_consumed_in_order_and_expire_after_the_window():
+    book = SymbolLotBook(SHARE_EPSILON)
+    sale_day = pd.Timestamp("2024-03-01").value // 86_400_000_000_000
+    book.add_pending_wash(sale_day, 2.0, 3.0, sale_day - 100)
+    book.add_pending_wash(sale_day + 5, 4.0, 3.0, sale_day - 50)
+
+    buy_day = sale_day + 10
+    book.buy(pd.Timestamp(buy_day, unit="D"), buy_day * 86_400_000_000_000, buy_day, 4.0, 10.0)
+    assert [(lot.qty, lot.price, lot.tax_day) for lot in book.lots] == [
+        (3.0, 12.0, sale_day - 100),
+        (1.0, 14.0, sale_day - 50),
+    ]
+
+    book.expire_pending_washes(sale_day + 35)
+    assert len(book.pending_washes) == 1
+    book.expire_pending_washes(sale_day + 36)
+    assert not book.pending_washes
@@ -0,0 +1,70 @@
+import threading
+
+from src import server, telemetry
+
+
+def test_counter_and_histogram_sum_across_threads():
+    counter = telemetry.Counter("test_events_total", "Test events.", ("kind",))
+    histogram = telemetry.Histogram("test_latency_seconds", "Test latency.", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(100):
+            counter.inc("a")
+            histogram.observe(0.05)
+        counter.inc("b", amount=2)
+        histogram.observe(5.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.values() == {("a",): 400, ("b",): 8}
+    entry = histogram.snapshot()[()]
+    assert entry["counts"] == [400, 400, 404]
+    assert entry["count"] == 404
+    assert abs(entry["sum"] - 40.0) < 1e-9
+
+    text = telemetry.render_metrics()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 400' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 400' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 404' in text
+    assert "test_latency_seconds_count 404" in text
+
+
+def test_polygon_endpoint_collapses_tickers_dates_and_query():
+    assert telemetry.polygon_endpoint(
+        "https://api.polygon.io/v2/aggs/ticker/AAPL/range/1/day/2024-01-01/2024-02-01?apiKey=x"
+    ) == "/v2/aggs/ticker/{ticker}/range/{multiplier}/day"
+    assert telemetry.polygon_endpoint("/v3/reference/tickers/MSFT") == "/v3/reference/tickers/{ticker}"
+    assert telemetry.polygon_endpoint(
+        "http://127.0.0.1:1234/v2/aggs/grouped/locale/us/market/stocks/2024-01-02"
+    ) == "/v2/aggs/grouped/locale/us/market/stocks/{date}"
+    assert telemetry.polygon_endpoint("https://api.polygon.io/v3/reference/splits?cursor=abc") == "/v3/reference/splits"
+
+
+def test_metrics_route_reports_requests_and_live_hub(monkeypatch):
+    monkeypatch.setattr(server, "ensure_live_services_started", lambda: None)
+    monkeypatch.setattr(server, "_load_accounts", lambda: [])
+    hub = server.LiveQuoteHub()
+    monkeypatch.setattr(hub, "start", lambda: None)
+    monkeypatch.setattr(server, "quote_hub", hub)
+    client_id, messages = hub.subscribe(["AAA"])
+    hub._broadcast({"type": "quote", "transport": "poll", "quotes": {"AAA": {"price": 10.0}}})
+
+    client = server.app.test_client()
+    assert client.get("/api/accounts").status_code == 200
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{route="/api/accounts",method="GET",status="200"}' in text
+    assert "live_sse_clients 1" in text
+    assert f'live_sse_client_queue_depth{{client="{client_id}"}} 1' in text
+    assert 'live_quote_messages_in_total{type="quote",transport="poll"}' in text
+    assert 'cache_lookups_total{cache="accounts_index",result="hit"}' in text
+    assert 'tool_jobs{state="running"}' in text
+    assert messages.qsize() == 1
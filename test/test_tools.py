@@ -1,4 +1,7 @@
 import csv
+import json
+import threading
+import time
 from types import SimpleNamespace
 
 import pandas as pd
@@ -399,7 +402,7 @@ def test_estimate_market_cap_weights_scales_current_market_caps_to_start_date(mo
     assert payload["missing"] == []
 
 
-def test_earnings_calendar_uses_yfinance(monkeypatch):
+def test_earnings_calendar_uses_yfinance(monkeypatch, tmp_path):
     calls = []
 
     class FakeTicker:
@@ -425,13 +428,298 @@ def test_earnings_calendar_uses_yfinance(monkeypatch):
             }
 
     monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=FakeTicker))
+    monkeypatch.setattr(tools, "EARNINGS_CACHE_DIR", tmp_path)
 
     payload = tools.earnings_calendar(["AAPL", "MSFT"], "2026-04-15", "2026-05-15", api_key="key")
 
-    assert calls == [("AAPL", 100), ("MSFT", 100)]
+    assert sorted(calls) == [("AAPL", 100), ("MSFT", 100)]
     assert payload["provider"] == "Yahoo Finance"
     assert payload["events"][0]["ticker"] == "AAPL"
     assert payload["events"][0]["time"] == "07:00:00"
     assert payload["events"][0]["provider"] == "Yahoo Finance"
     assert payload["events"][0]["estimated_revenue"] == pytest.approx(123000000)
     assert payload["events"][1]["ticker"] == "MSFT"
+
+
+def test_fetch_ticker_overviews_caches_reference_data_on_disk(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_polygon_get(path, params=None, api_key=None):
+        calls.append(path)
+        ticker = path.rsplit("/", 1)[-1]
+        return {"results": {"ticker": ticker, "name": f"{ticker} Inc", "market_cap": 100}}
+
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(tools, "_polygon_get", fake_polygon_get)
+
+    first = tools._fetch_ticker_overviews(["AAPL", "MSFT", "AAPL"], api_key="key")
+    second = tools._fetch_ticker_overviews(["MSFT", "AAPL"], api_key="key")
+
+    assert sorted(calls) == ["/v3/reference/tickers/AAPL", "/v3/reference/tickers/MSFT"]
+    assert first == second
+    assert first["AAPL"]["name"] == "AAPL Inc"
+    assert (tmp_path / "polygon" / "AAPL.json").exists()
+
+
+def test_fetch_ticker_overviews_falls_back_to_expired_entry_when_refresh_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(
+        tools,
+        "_polygon_get",
+        lambda path, params=None, api_key=None: {"results": {"name": "Apple Inc", "market_cap": 300}},
+    )
+    tools._fetch_ticker_overviews(["AAPL"], api_key="key")
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_TTL_SECONDS", -1)
+
+    def failing_polygon_get(path, params=None, api_key=None):
+        raise tools.ToolDataError("rate limited", 502)
+
+    monkeypatch.setattr(tools, "_polygon_get", failing_polygon_get)
+    details = tools._fetch_ticker_overviews(["AAPL", "MSFT"], api_key="key")
+
+    assert details["AAPL"] == {"name": "Apple Inc", "market_cap": 300}
+    assert details["MSFT"] == {"_polygon_error": "rate limited"}
+    assert not (tmp_path / "polygon" / "MSFT.json").exists()
+
+
+def test_fetch_yfinance_market_caps_does_not_cache_a_missing_market_cap(monkeypatch, tmp_path):
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(
+        tools,
+        "yf",
+        SimpleNamespace(Ticker=lambda ticker: SimpleNamespace(fast_info={"marketCap": 300.0}, info={"longName": "Apple Inc"})),
+    )
+    tools._fetch_yfinance_market_caps(["AAPL"])
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_TTL_SECONDS", -1)
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=lambda ticker: SimpleNamespace(fast_info={}, info={})))
+
+    details = tools._fetch_yfinance_market_caps(["AAPL", "MSFT"])
+
+    assert details["AAPL"]["market_cap"] == 300.0
+    assert details["MSFT"]["market_cap"] is None
+    assert not (tmp_path / "yfinance" / "MSFT.json").exists()
+
+
+def test_fetch_yfinance_market_caps_refreshes_caps_without_rescraping_profiles(monkeypatch, tmp_path):
+    info_calls = []
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.fast_info = {"marketCap": 300.0}
+
+        @property
+        def info(self):
+            info_calls.append(1)
+            return {"longName": "Apple Inc", "currency": "USD", "exchange": "NMS", "quoteType": "EQUITY"}
+
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=FakeTicker))
+    first = tools._fetch_yfinance_market_caps(["AAPL"])
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_TTL_SECONDS", -1)
+    second = tools._fetch_yfinance_market_caps(["AAPL"])
+
+    assert info_calls == [1]
+    assert first == second
+    assert second["AAPL"] == {"name": "Apple Inc", "currency": "USD", "exchange": "NMS", "type": "EQUITY", "market_cap": 300.0}
+
+
+def test_fetch_ticker_overviews_keeps_etf_overviews_for_the_profile_ttl(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_polygon_get(path, params=None, api_key=None):
+        ticker = path.rsplit("/", 1)[-1]
+        calls.append(ticker)
+        if ticker == "VT":
+            return {"results": {"ticker": ticker, "name": "Vanguard Total World Stock ETF", "type": "ETF"}}
+        return {"results": {"ticker": ticker, "name": "Apple Inc", "type": "CS", "market_cap": 300}}
+
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(tools, "_polygon_get", fake_polygon_get)
+    tools._fetch_ticker_overviews(["VT", "AAPL"], api_key="key")
+    monkeypatch.setattr(tools, "TICKER_REFERENCE_TTL_SECONDS", -1)
+    tools._fetch_ticker_overviews(["VT", "AAPL"], api_key="key")
+
+    assert sorted(calls) == ["AAPL", "AAPL", "VT"]
+
+
+def test_polygon_get_backs_off_and_retries_rate_limited_requests(monkeypatch):
+    responses = [
+        SimpleNamespace(status_code=429, headers={"Retry-After": "2"}),
+        SimpleNamespace(status_code=429, headers={}),
+        SimpleNamespace(status_code=200, headers={}, json=lambda: {"results": {"ticker": "AAPL"}}),
+    ]
+    sleeps = []
+    monkeypatch.setattr(tools.requests, "get", lambda url, params=None, timeout=None: responses.pop(0))
+    monkeypatch.setattr(tools.time, "sleep", sleeps.append)
+    monkeypatch.setattr(tools, "UPSTREAM_RETRY_BASE_SECONDS", 1.0)
+
+    payload = tools._polygon_get("/v3/reference/tickers/AAPL", api_key="key")
+
+    assert payload == {"results": {"ticker": "AAPL"}}
+    assert sleeps[0] == 2.0
+    assert 2.0 <= sleeps[1] <= 3.0
+
+    monkeypatch.setattr(tools, "UPSTREAM_MAX_RETRIES", 0)
+    monkeypatch.setattr(
+        tools.requests,
+        "get",
+        lambda url, params=None, timeout=None: SimpleNamespace(
+            status_code=429, headers={}, json=lambda: {"error": "rate limited"}, text=""
+        ),
+    )
+    with pytest.raises(tools.ToolDataError, match="rate limited"):
+        tools._polygon_get("/v3/reference/tickers/AAPL", api_key="key")
+
+
+def test_shared_fetch_runs_concurrent_lookups_for_a_ticker_once(monkeypatch):
+    follower_waiting = threading.Event()
+
+    class ObservedFuture(tools.Future):
+        def result(self, timeout=None):
+            follower_waiting.set()
+            return super().result(timeout)
+
+    monkeypatch.setattr(tools, "Future", ObservedFuture)
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        follower.start()
+        # Only the follower can be blocked on the future while the owner is still fetching.
+        assert follower_waiting.wait(5)
+        return {"market_cap": 1}
+
+    results = []
+    follower = threading.Thread(target=lambda: results.append(tools._shared_fetch(("polygon", "AAPL"), slow_fetch)))
+    owner_result = tools._shared_fetch(("polygon", "AAPL"), slow_fetch)
+    follower.join(5)
+
+    assert calls == [1]
+    assert owner_result == {"market_cap": 1}
+    assert results == [{"market_cap": 1}]
+
+
+def _fake_earnings_ticker(calls, frame_rows):
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def get_earnings_dates(self, limit=100):
+            calls.append(self.ticker)
+            return pd.DataFrame(
+                {
+                    "EPS Estimate": [row[1] for row in frame_rows],
+                    "Reported EPS": [row[2] for row in frame_rows],
+                    "Surprise(%)": [None for _ in frame_rows],
+                },
+                index=[pd.Timestamp(row[0], tz="America/New_York") for row in frame_rows],
+            )
+
+        @property
+        def calendar(self):
+            return {}
+
+    return FakeTicker
+
+
+def test_earnings_calendar_serves_repeat_requests_from_disk_cache(monkeypatch, tmp_path):
+    calls = []
+    fake_ticker = _fake_earnings_ticker(calls, [("2026-05-01", 1.25, None), ("2026-01-29", 1.1, 1.2)])
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=fake_ticker))
+    monkeypatch.setattr(tools, "EARNINGS_CACHE_DIR", tmp_path)
+
+    first = tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+    second = tools.earnings_calendar(["AAPL"], "2026-01-01", "2026-05-15")
+
+    assert calls == ["AAPL"]
+    assert [event["date"] for event in first["events"]] == ["2026-05-01"]
+    assert [(event["date"], event["date_status"]) for event in second["events"]] == [
+        ("2026-01-29", "reported"),
+        ("2026-05-01", "estimated"),
+    ]
+
+
+def test_earnings_calendar_refreshes_estimates_but_not_past_reported_windows(monkeypatch, tmp_path):
+    calls = []
+    fake_ticker = _fake_earnings_ticker(calls, [("2026-05-01", 1.25, None), ("2026-01-29", 1.1, 1.2)])
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=fake_ticker))
+    monkeypatch.setattr(tools, "EARNINGS_CACHE_DIR", tmp_path)
+    tools.earnings_calendar(["AAPL"], "2026-01-01", "2026-05-15")
+    cache_path = tmp_path / "AAPL.json"
+    cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    cached["fetched_at"] = pd.Timestamp("2026-03-01").timestamp()
+    cache_path.write_text(json.dumps(cached), encoding="utf-8")
+    monkeypatch.setattr(tools, "EARNINGS_REPORTED_TTL_SECONDS", 10 ** 10)
+
+    reported_only = tools.earnings_calendar(["AAPL"], "2026-01-01", "2026-02-15")
+    assert calls == ["AAPL"]
+    assert [event["actual_eps"] for event in reported_only["events"]] == [pytest.approx(1.2)]
+
+    tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+    assert calls == ["AAPL", "AAPL"]
+
+
+def test_earnings_calendar_retries_a_failed_refresh_only_after_the_retry_window(monkeypatch, tmp_path):
+    calls = []
+    fake_ticker = _fake_earnings_ticker(calls, [("2026-05-01", 1.25, None)])
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=fake_ticker))
+    monkeypatch.setattr(tools, "EARNINGS_CACHE_DIR", tmp_path)
+    tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+    monkeypatch.setattr(tools, "EARNINGS_ESTIMATED_TTL_SECONDS", -1)
+
+    def failing_earnings_dates(self, limit=100):
+        calls.append(self.ticker)
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setattr(fake_ticker, "get_earnings_dates", failing_earnings_dates)
+    first = tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+    second = tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+
+    assert calls == ["AAPL", "AAPL"]
+    assert [event["date"] for event in first["events"]] == ["2026-05-01"]
+    assert second == first
+    assert "rate limited" in second["warnings"][0]
+
+    cached = json.loads((tmp_path / "AAPL.json").read_text(encoding="utf-8"))
+    cached["retry_after"] = 0
+    (tmp_path / "AAPL.json").write_text(json.dumps(cached), encoding="utf-8")
+    tools.earnings_calendar(["AAPL"], "2026-04-15", "2026-05-15")
+    assert calls == ["AAPL", "AAPL", "AAPL"]
+
+
+def test_concurrent_earnings_requests_share_one_bounded_fetch_pool(monkeypatch, tmp_path):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    class SlowTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+            self.calendar = {}
+
+        def get_earnings_dates(self, limit=100):
+            with lock:
+                active.append(self.ticker)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(self.ticker)
+            return pd.DataFrame()
+
+    monkeypatch.setattr(tools, "yf", SimpleNamespace(Ticker=SlowTicker))
+    monkeypatch.setattr(tools, "EARNINGS_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(tools, "TICKER_FETCH_WORKERS", 2)
+    monkeypatch.setattr(tools, "_fetch_pool", None)
+
+    requests = [
+        threading.Thread(target=tools.earnings_calendar, args=([f"T{request}{number}" for number in range(6)],))
+        for request in range(3)
+    ]
+    for request in requests:
+        request.start()
+    for request in requests:
+        request.join()
+
+    assert len(peak) == 18
+    assert max(peak) <= 2
+    tools._fetch_pool.shutdown()
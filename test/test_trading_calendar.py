@@ -0,0 +1,47 @@
+import pandas as pd
+
+from src.reports import trading_calendar
+from src.reports.analyze_fidelity import add_missing_zeros
+
+
+def test_nyse_holidays_follow_observance_rules():
+    assert [day.isoformat() for day in trading_calendar.nyse_holidays(2022)] == [
+        "2022-01-17", "2022-02-21", "2022-04-15", "2022-05-30", "2022-06-20",
+        "2022-07-04", "2022-09-05", "2022-11-24", "2022-12-26",
+    ]
+    assert trading_calendar.count_sessions("2024-01-01", "2024-12-31") == 252
+    assert not trading_calendar.is_session("2025-01-09")
+    assert trading_calendar.previous_session("2024-07-05") == pd.Timestamp("2024-07-03")
+
+
+def test_calendar_days_after_uses_day_numbers():
+    assert trading_calendar.calendar_days_after("2024-02-27", "2024-03-01") == ["2024-02-28", "2024-02-29", "2024-03-01"]
+    assert trading_calendar.calendar_days_after("2024-03-01", "2024-03-01") == []
+    assert trading_calendar.day_number(pd.Timestamp("2024-03-01 23:30", tz="America/New_York")) == trading_calendar.day_number("2024-03-01")
+
+
+def test_add_missing_zeros_fills_sessions_only():
+    returns = pd.Series([0.01, 0.02], index=pd.to_datetime(["2024-12-23", "2024-12-27"]))
+
+    filled = add_missing_zeros(returns)
+
+    assert list(filled.index) == list(pd.to_datetime(["2024-12-23", "2024-12-24", "2024-12-26", "2024-12-27"]))
+    assert filled.tolist() == [0.01, 0.0, 0.0, 0.02]
+
+
+def test_add_missing_zeros_keeps_tz_aware_index():
+    index = pd.DatetimeIndex(["2024-12-23", "2024-12-27"]).tz_localize("America/New_York")
+    returns = pd.Series([0.01, 0.02], index=index)
+
+    filled = add_missing_zeros(returns)
+
+    expected = pd.DatetimeIndex(["2024-12-23", "2024-12-24", "2024-12-26", "2024-12-27"]).tz_localize("America/New_York")
+    assert filled.index.equals(expected)
+    assert filled.tolist() == [0.01, 0.0, 0.0, 0.02]
+
+
+def test_iso_dates_formats_wall_dates_and_out_of_range_days():
+    index = pd.DatetimeIndex(["2024-03-01 23:30", "2024-03-04"]).tz_localize("America/New_York")
+    assert trading_calendar.iso_dates(index) == ["2024-03-01", "2024-03-04"]
+    assert trading_calendar.iso_dates(pd.DatetimeIndex(["1975-06-02", "2024-03-04"])) == ["1975-06-02", "2024-03-04"]
+    assert trading_calendar.iso_dates(pd.DatetimeIndex([])) == []